@@ -0,0 +1,123 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from care.audit_log.sinks import get_audit_sink
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    Bounded ring buffer between request threads and the audit sink.
+
+    Requests only append their events, a background thread writes them to the sink in batches
+    of AUDIT_LOG_BATCH_SIZE, or whatever is pending every AUDIT_LOG_FLUSH_INTERVAL seconds.
+    If the sink falls behind by more than AUDIT_LOG_BUFFER_SIZE events the oldest ones are dropped
+    instead of holding up requests. A batch the sink fails to write is retried AUDIT_LOG_WRITE_RETRIES
+    times before it is dropped, lost events are counted in get_stats.
+    """
+
+    retry_delay = 0.5
+
+    def __init__(self, size=None, batch_size=None, interval=None, retries=None):
+        self.events = deque(maxlen=size or settings.AUDIT_LOG_BUFFER_SIZE)
+        self.batch_size = batch_size or settings.AUDIT_LOG_BATCH_SIZE
+        self.interval = interval or settings.AUDIT_LOG_FLUSH_INTERVAL
+        self.retries = settings.AUDIT_LOG_WRITE_RETRIES if retries is None else retries
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.thread = None
+
+    def extend(self, events):
+        with self.condition:
+            overflow = len(self.events) + len(events) - self.events.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+                logger.warning(
+                    "Audit buffer full, dropped %s events (%s in total)",
+                    overflow,
+                    self.dropped,
+                )
+            self.events.extend(events)
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="audit_log", daemon=True
+                )
+                self.thread.start()
+            if len(self.events) >= self.batch_size:
+                self.condition.notify()
+
+    def take(self):
+        with self.condition:
+            return [
+                self.events.popleft()
+                for _ in range(min(len(self.events), self.batch_size))
+            ]
+
+    def write(self, batch):
+        with self.write_lock:
+            for attempt in range(self.retries + 1):
+                try:
+                    get_audit_sink().write(batch)
+                except Exception:
+                    if attempt < self.retries:
+                        logger.warning(
+                            "Failed to write %s audit events, retrying",
+                            len(batch),
+                            exc_info=True,
+                        )
+                        time.sleep(self.retry_delay * 2**attempt)
+                        continue
+                    self.failed += len(batch)
+                    logger.exception(
+                        "Failed to write %s audit events, dropped them (%s in total)",
+                        len(batch),
+                        self.failed,
+                    )
+                else:
+                    self.written += len(batch)
+                return
+
+    def get_stats(self):
+        """
+        Counters of this process, events lost to a full buffer are dropped, events the sink
+        could not write are failed
+        """
+        with self.condition:
+            return {
+                "pending": len(self.events),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: len(self.events) >= self.batch_size, timeout=self.interval
+                )
+            # The thread outlives requests, drop its connection if it is broken or past CONN_MAX_AGE
+            close_old_connections()
+            while batch := self.take():
+                self.write(batch)
+
+    def flush(self):
+        """
+        Write everything that is pending from the calling thread
+        """
+        while batch := self.take():
+            self.write(batch)
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
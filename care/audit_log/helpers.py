@@ -1,4 +1,5 @@
 # ruff: noqa: SLF001
+import copy
 import re
 from fnmatch import fnmatch
 from functools import lru_cache
@@ -25,10 +26,36 @@ def seperate_hashable_dict(d: dict):
     return hashable, non_hashable
 
 
-def get_or_create_meta(instance):
-    if not hasattr(instance._meta, "dal"):
-        instance._meta.dal = MetaDataContainer()
-    return instance
+def snapshot_fields(instance):
+    """
+    Copy of the field values of an instance, mutable values (json fields, arrays) are deep copied
+    so that in place changes show up when diffing against the snapshot
+    """
+    return {
+        k: copy.deepcopy(v) if instance_finder(v) else v
+        for k, v in remove_non_member_fields(instance.__dict__).items()
+    }
+
+
+def diff_fields(old: dict, new: dict):
+    """
+    Values in new that are not present or different in old
+    """
+    try:
+        return dict(set(new.items()).difference(old.items()))
+    except TypeError:  # handle non-hashable types
+        old_hashable, old_non_hashable = seperate_hashable_dict(old)
+        new_hashable, new_non_hashable = seperate_hashable_dict(new)
+
+        changes = dict(set(new_hashable.items()).difference(old_hashable.items()))
+        changes.update(
+            {
+                k: copy.deepcopy(v)
+                for k, v in new_non_hashable.items()
+                if k not in old_non_hashable or v != old_non_hashable[k]
+            }
+        )
+        return changes
 
 
 def get_model_name(instance):
@@ -98,14 +125,6 @@ def exclude_model(model_name):
     )
 
 
-class MetaDataContainer(dict):
-    def __getattr__(self, item):
-        return self[item]
-
-    def __setattr__(self, key, value):
-        self[key] = value
-
-
 class LogJsonEncoder(JSONEncoder):
     def default(self, obj):
         try:
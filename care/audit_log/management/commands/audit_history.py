@@ -0,0 +1,24 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from care.audit_log.sinks import AuditHistoryUnavailableError, get_entity_history
+
+
+class Command(BaseCommand):
+    help = "Print the audit history of an entity from the configured audit sink"
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model as <app_label>.<ModelName>")
+        parser.add_argument("entity_id", help="Primary key of the entity")
+        parser.add_argument("--limit", default=100, type=int)
+
+    def handle(self, *args, **options):
+        try:
+            history = get_entity_history(
+                options["model"], options["entity_id"], limit=options["limit"]
+            )
+        except AuditHistoryUnavailableError as e:
+            raise CommandError(str(e)) from e
+        for record in history:
+            self.stdout.write(json.dumps(record))
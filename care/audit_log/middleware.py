@@ -1,6 +1,7 @@
 import logging
 import threading
 import uuid
+from datetime import datetime
 from hashlib import md5
 from typing import NamedTuple
 
@@ -8,6 +9,8 @@ from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.http import HttpRequest, HttpResponse
 
+from care.audit_log.buffer import audit_buffer
+
 
 class RequestInformation(NamedTuple):
     request_id: str
@@ -16,6 +19,16 @@ class RequestInformation(NamedTuple):
     exception: Exception | None
 
 
+class AuditEvent(NamedTuple):
+    timestamp: datetime
+    request_id: str
+    actor: str | None
+    operation: str
+    model: str
+    entity_id: int | str
+    changes: dict
+
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +38,7 @@ class AuditLogMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
         AuditLogMiddleware.thread.__dal__ = None
+        AuditLogMiddleware.thread.events = []
 
     @staticmethod
     def is_request():
@@ -77,13 +91,32 @@ class AuditLogMiddleware:
         environ = RequestInformation(*AuditLogMiddleware.thread.__dal__)
         return environ.request
 
+    @staticmethod
+    def add_event(event: AuditEvent):
+        """
+        Queue an audit event, the events of a request are handed to the audit buffer once it is done
+        """
+        AuditLogMiddleware.thread.events.append(event)
+
+    @staticmethod
+    def flush():
+        events = getattr(AuditLogMiddleware.thread, "events", None)
+        AuditLogMiddleware.thread.events = []
+        if events:
+            audit_buffer.extend(events)
+
     def __call__(self, request: HttpRequest):
         if request.method.lower() == "get":
             return self.get_response(request)
 
         self.save(request)
-        response: HttpResponse = self.get_response(request)
-        self.save(request, response)
+        AuditLogMiddleware.thread.events = []
+        try:
+            response: HttpResponse = self.get_response(request)
+            self.save(request, response)
+        finally:
+            self.flush()
+            self.cleanup()
 
         if getattr(request.user, "is_alternative_login", False):
             current_user_str = f"patient|{request.user.phone_number[-4:]}"
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2025-01-12 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditLogEntry",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("timestamp", models.DateTimeField()),
+                ("request_id", models.CharField(max_length=255)),
+                ("actor", models.CharField(blank=True, max_length=255, null=True)),
+                ("operation", models.CharField(max_length=16)),
+                ("model", models.CharField(max_length=255)),
+                ("entity_id", models.CharField(max_length=255)),
+                ("changes", models.JSONField(default=dict)),
+            ],
+            options={
+                "db_table": "audit_log_entry",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(
+            sql=[
+                """
+                CREATE TABLE audit_log_entry (
+                    id bigint GENERATED BY DEFAULT AS IDENTITY,
+                    timestamp timestamp with time zone NOT NULL,
+                    request_id varchar(255) NOT NULL,
+                    actor varchar(255) NULL,
+                    operation varchar(16) NOT NULL,
+                    model varchar(255) NOT NULL,
+                    entity_id varchar(255) NOT NULL,
+                    changes jsonb NOT NULL,
+                    PRIMARY KEY (id, timestamp)
+                ) PARTITION BY RANGE (timestamp)
+                """,
+                "CREATE TABLE audit_log_entry_default PARTITION OF audit_log_entry DEFAULT",
+                """
+                CREATE INDEX audit_log_entry_entity_idx
+                ON audit_log_entry (model, entity_id, timestamp DESC)
+                """,
+            ],
+            reverse_sql="DROP TABLE audit_log_entry",
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class AuditLogEntry(models.Model):
+    """
+    Append only audit trail written by the database audit sink.
+
+    The table is range partitioned by month on timestamp, which Django cannot manage,
+    so it is created by raw SQL in the migrations and monthly partitions are added by the sink.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    timestamp = models.DateTimeField()
+    request_id = models.CharField(max_length=255)
+    actor = models.CharField(max_length=255, null=True, blank=True)
+    operation = models.CharField(max_length=16)
+    model = models.CharField(max_length=255)
+    entity_id = models.CharField(max_length=255)
+    changes = models.JSONField(default=dict)
+
+    class Meta:
+        managed = False
+        db_table = "audit_log_entry"
+
+    def __str__(self):
+        return f"{self.operation} {self.model} {self.entity_id}"
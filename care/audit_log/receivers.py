@@ -1,87 +1,109 @@
 # ruff: noqa: SLF001
-import json
 import logging
+from contextlib import contextmanager
 from typing import NamedTuple
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import transaction
-from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from care.audit_log.enums import Operation
 from care.audit_log.helpers import (
-    LogJsonEncoder,
+    diff_fields,
     exclude_model,
     get_model_name,
-    get_or_create_meta,
-    remove_non_member_fields,
-    seperate_hashable_dict,
+    snapshot_fields,
 )
-from care.audit_log.middleware import AuditLogMiddleware
+from care.audit_log.middleware import AuditEvent, AuditLogMiddleware
 
 logger = logging.getLogger(__name__)
 
 
 class Event(NamedTuple):
     model: str
-    actor: AbstractUser
+    actor: AbstractUser | None
     entity_id: int | str
     changes: dict
 
 
-@receiver(pre_delete, weak=False)
-@receiver(pre_save, weak=False)
-@transaction.atomic
-def pre_save_signal(sender, instance, **kwargs) -> None:
+def is_audited(instance) -> bool:
     if not settings.AUDIT_LOG_ENABLED:
-        return
+        return False
 
     if not AuditLogMiddleware.is_request():
         logger.debug("Not a request")
-        return
+        return False
 
     model_name = get_model_name(instance)
     if exclude_model(model_name):
         logger.debug("%s ignored as per settings", model_name)
-        return
+        return False
+    return True
 
-    get_or_create_meta(instance)
-    instance._meta.dal.event = None
 
-    operation = Operation.UPDATE
-    try:
-        pre = sender.objects.get(pk=instance.pk)
-    except ObjectDoesNotExist:
-        # __dict__ is used on pre, therefore we need to create a function
-        # that uses __dict__ too, but returns nothing.
+@receiver(post_init, weak=False)
+def post_init_signal(sender, instance, **kwargs) -> None:
+    """
+    Snapshot the field values of instances loaded during a request,
+    saves are diffed against the snapshot instead of fetching the row again
+    """
+    if instance.pk is None or not is_audited(instance):
+        return
+    instance._audit_snapshot = snapshot_fields(instance)
+
+
+def get_previous_fields(sender, instance):
+    """
+    Stored field values of the instance, fields that are still deferred are not saved and are skipped
+    """
+    deferred = instance.get_deferred_fields()
+    snapshot = instance.__dict__.get("_audit_snapshot")
+    if snapshot is not None:
+        # Fields deferred when the instance was loaded and read or assigned since are not in the snapshot
+        missing = [
+            field.attname
+            for field in sender._meta.concrete_fields
+            if field.attname not in snapshot and field.attname not in deferred
+        ]
+        if missing:
+            stored = sender._base_manager.filter(pk=instance.pk).values(*missing)
+            snapshot = {**snapshot, **(stored.first() or {})}
+        return snapshot
+    # Instances loaded before the request started or created with an explicit primary key
+    pre = (
+        sender._base_manager.filter(pk=instance.pk)
+        .defer(
+            *[
+                field.name
+                for field in sender._meta.concrete_fields
+                if field.attname in deferred
+            ]
+        )
+        .first()
+    )
+    return snapshot_fields(pre) if pre else None
 
-        pre = lambda _: None  # noqa: E731
-        operation = Operation.INSERT
 
-    changes = {}
+@receiver(pre_save, weak=False)
+def pre_save_signal(sender, instance, update_fields=None, **kwargs) -> None:
+    if not is_audited(instance):
+        return
 
-    if operation not in {Operation.INSERT, Operation.DELETE}:
-        old, new = (
-            remove_non_member_fields(pre.__dict__),
-            remove_non_member_fields(instance.__dict__),
-        )
+    model_name = get_model_name(instance)
+    instance._audit_event = None
 
-        try:
-            changes = dict(set(new.items()).difference(old.items()))
-        except TypeError:  # handle non-hashable types
-            old_hashable, old_non_hashable = seperate_hashable_dict(old)
-            new_hashable, new_non_hashable = seperate_hashable_dict(new)
-
-            changes = dict(set(new_hashable.items()).difference(old_hashable.items()))
-            changes.update(
-                {
-                    k: v
-                    for k, v in new_non_hashable.items()
-                    if v != old_non_hashable.get(k)
-                }
-            )
+    changes = {}
+    old = None if instance._state.adding else get_previous_fields(sender, instance)
+    if old is not None:
+        new = snapshot_fields(instance)
+        if update_fields:
+            attnames = {
+                sender._meta.get_field(field).attname for field in update_fields
+            }
+            new = {k: v for k, v in new.items() if k in attnames}
+        changes = diff_fields(old, new)
 
         excluded_fields = settings.AUDIT_LOG["models"]["exclude"]["fields"].get(
             model_name, []
@@ -94,81 +116,77 @@ def pre_save_signal(sender, instance, **kwargs) -> None:
             logger.debug("No changes for model. Ignoring.")
             return
 
-    current_user = AuditLogMiddleware.get_current_user()
-
-    instance._meta.dal.event = Event(
+    instance._audit_event = Event(
         model=model_name,
-        actor=current_user,
+        actor=AuditLogMiddleware.get_current_user(),
         entity_id=instance.pk,
         changes=changes,
     )
 
 
 def _post_processor(instance, event: Event | None, operation: Operation):
-    request_id = AuditLogMiddleware.get_current_request_id()
-    actor = AuditLogMiddleware.get_current_user()
-    model_name = get_model_name(instance)
-
     if not event and operation != Operation.DELETE:
         logger.debug("Event not received for %s. Ignoring.", operation)
         return
 
-    try:
-        if operation == Operation.DELETE:
-            changes = instance.__dict__
-            if "_state" in changes:
-                del changes["_state"]
-        else:
-            changes = json.dumps(event.changes if event else {}, cls=LogJsonEncoder)
-    except Exception:
-        logger.warning("Failed to log %s", event, exc_info=True)
-        return
+    if operation == Operation.DELETE:
+        changes = snapshot_fields(instance)
+    else:
+        changes = event.changes
 
-    logger.info(
-        "AUDIT_LOG::%s|%s|%s|%s|ID:%s|%s",
-        request_id,
-        actor,
-        operation.value,
-        model_name,
-        instance.pk,
-        changes,
+    actor = AuditLogMiddleware.get_current_user()
+    AuditLogMiddleware.add_event(
+        AuditEvent(
+            timestamp=timezone.now(),
+            request_id=AuditLogMiddleware.get_current_request_id(),
+            actor=str(actor) if actor else None,
+            operation=operation.value,
+            model=get_model_name(instance),
+            entity_id=instance.pk,
+            changes=changes,
+        )
     )
 
 
 @receiver(post_save, weak=False)
 def post_save_signal(sender, instance, created, update_fields: frozenset, **kwargs):
-    if not settings.AUDIT_LOG_ENABLED:
-        return
-
-    if not AuditLogMiddleware.is_request():
-        logger.debug("Not a request")
-        return
-
-    model_name = get_model_name(instance)
-    if exclude_model(model_name):
-        logger.debug("Ignoring %s.", model_name)
+    if not is_audited(instance):
         return
 
     operation = Operation.INSERT if created else Operation.UPDATE
-    get_or_create_meta(instance)
-
-    event = instance._meta.dal.event
+    event = instance.__dict__.pop("_audit_event", None)
     _post_processor(instance, event, operation)
+    # Later saves of the same instance are diffed against what was just written
+    snapshot = instance.__dict__.get("_audit_snapshot")
+    if update_fields and snapshot is not None:
+        current = snapshot_fields(instance)
+        for field in update_fields:
+            attname = sender._meta.get_field(field).attname
+            snapshot[attname] = current.get(attname)
+    else:
+        instance._audit_snapshot = snapshot_fields(instance)
+
+
+@contextmanager
+def audit_bulk_save(sender, creates, updates, update_fields=None):
+    """
+    bulk_create and bulk_update send no save signals, wrap them to record the same audit events
+    as saving each instance would
+    """
+    for instance in creates:
+        pre_save_signal(sender, instance)
+    for instance in updates:
+        pre_save_signal(sender, instance, update_fields=update_fields)
+    yield
+    for instance in creates:
+        post_save_signal(sender, instance, created=True, update_fields=None)
+    for instance in updates:
+        post_save_signal(sender, instance, created=False, update_fields=update_fields)
 
 
 @receiver(post_delete, weak=False)
 def post_delete_signal(sender, instance, **kwargs) -> None:
-    if not settings.AUDIT_LOG_ENABLED:
-        return
-
-    if not AuditLogMiddleware.is_request():
-        logger.debug("Not a request")
-        return
-
-    model_name = get_model_name(instance)
-    if exclude_model(model_name):
-        logger.debug("Ignoring %s.", model_name)
+    if not is_audited(instance):
         return
 
-    event = instance._meta.dal.event
-    _post_processor(instance, event, Operation.DELETE)
+    _post_processor(instance, None, Operation.DELETE)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import UTC
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from care.audit_log.helpers import LogJsonEncoder
+from care.audit_log.models import AuditLogEntry
+
+logger = logging.getLogger(__name__)
+
+
+class AuditHistoryUnavailableError(Exception):
+    """
+    Raised by sinks whose events cannot be read back
+    """
+
+
+class AuditSink(ABC):
+    """
+    Destination of audit events, events are written in batches by the audit buffer
+    from a background thread
+    """
+
+    @abstractmethod
+    def write(self, events):
+        pass
+
+    @abstractmethod
+    def history(self, model, entity_id, limit=100):
+        """
+        Changes of an entity, newest first
+        """
+
+    def serialize(self, event):
+        return {
+            "timestamp": event.timestamp.isoformat(),
+            "request_id": event.request_id,
+            "actor": event.actor,
+            "operation": event.operation,
+            "model": event.model,
+            "entity_id": str(event.entity_id),
+            "changes": json.loads(json.dumps(event.changes, cls=LogJsonEncoder)),
+        }
+
+
+class LoggerAuditSink(AuditSink):
+    """
+    Writes events as AUDIT_LOG:: lines to the application log, it cannot be queried
+    """
+
+    def write(self, events):
+        for event in events:
+            logger.info(
+                "AUDIT_LOG::%s|%s|%s|%s|ID:%s|%s",
+                event.request_id,
+                event.actor,
+                event.operation,
+                event.model,
+                event.entity_id,
+                json.dumps(event.changes, cls=LogJsonEncoder),
+            )
+
+    def history(self, model, entity_id, limit=100):
+        msg = "The logger audit sink cannot be queried"
+        raise AuditHistoryUnavailableError(msg)
+
+
+class JSONLAuditSink(AuditSink):
+    """
+    Writes one JSON document per event to a file that is rotated once it reaches max_bytes.
+
+    Rotating a file shared by several processes loses events, so every process writes to its own file,
+    the configured path with the process id added before the extension (audit_log.<pid>.jsonl).
+    History is read from the files of all processes.
+    """
+
+    def __init__(self, path=None, max_bytes=None, backup_count=None):
+        self.path = Path(path or settings.AUDIT_LOG_JSONL_PATH)
+        self.max_bytes = max_bytes or settings.AUDIT_LOG_JSONL_MAX_BYTES
+        self.backup_count = (
+            settings.AUDIT_LOG_JSONL_BACKUP_COUNT
+            if backup_count is None
+            else backup_count
+        )
+        self.handler = None
+        self.pid = None
+
+    def get_process_path(self, pid):
+        return self.path.with_name(f"{self.path.stem}.{pid}{self.path.suffix}")
+
+    def get_handler(self):
+        # Forked workers open their own file instead of inheriting the parent's
+        pid = os.getpid()
+        if self.pid != pid:
+            handler = RotatingFileHandler(
+                self.get_process_path(pid),
+                maxBytes=self.max_bytes,
+                backupCount=self.backup_count,
+                encoding="utf-8",
+                delay=True,
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.handler = handler
+            self.pid = pid
+        return self.handler
+
+    def write(self, events):
+        handler = self.get_handler()
+        for event in events:
+            handler.emit(
+                logging.makeLogRecord({"msg": json.dumps(self.serialize(event))})
+            )
+        handler.flush()
+
+    def history(self, model, entity_id, limit=100):
+        entity_id = str(entity_id)
+        paths = self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}*")
+        results = []
+        for path in paths:
+            with path.open(encoding="utf-8") as f:
+                results.extend(
+                    record
+                    for record in map(json.loads, f)
+                    if record["model"] == model and record["entity_id"] == entity_id
+                )
+        results.sort(key=lambda record: record["timestamp"], reverse=True)
+        return results[:limit]
+
+
+class DatabaseAuditSink(AuditSink):
+    """
+    Appends events to the monthly partitioned audit_log_entry table
+    """
+
+    def __init__(self):
+        self.partitions = set()
+
+    def ensure_partition(self, timestamp):
+        month = timestamp.astimezone(UTC).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        if month in self.partitions:
+            return
+        next_month = month.replace(
+            year=month.year + month.month // 12, month=month.month % 12 + 1
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Concurrent CREATE TABLE ... PARTITION OF for the same month fails even with IF NOT EXISTS,
+            # processes creating partitions are serialized for the rest of the transaction
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext('audit_log_entry'))")
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS audit_log_entry_{month:%Y_%m}
+                PARTITION OF audit_log_entry
+                FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')
+                """
+            )
+        self.partitions.add(month)
+
+    def write(self, events):
+        entries = []
+        for event in events:
+            self.ensure_partition(event.timestamp)
+            record = self.serialize(event)
+            record["timestamp"] = event.timestamp
+            entries.append(AuditLogEntry(**record))
+        AuditLogEntry.objects.bulk_create(
+            entries, batch_size=settings.AUDIT_LOG_BATCH_SIZE
+        )
+
+    def history(self, model, entity_id, limit=100):
+        entries = AuditLogEntry.objects.filter(
+            model=model, entity_id=str(entity_id)
+        ).order_by("-timestamp")[:limit]
+        return [
+            {
+                "timestamp": entry.timestamp.isoformat(),
+                "request_id": entry.request_id,
+                "actor": entry.actor,
+                "operation": entry.operation,
+                "model": entry.model,
+                "entity_id": entry.entity_id,
+                "changes": entry.changes,
+            }
+            for entry in entries
+        ]
+
+
+AUDIT_SINKS = {
+    "logger": LoggerAuditSink,
+    "jsonl": JSONLAuditSink,
+    "database": DatabaseAuditSink,
+}
+
+
+@lru_cache
+def get_audit_sink() -> AuditSink:
+    """
+    The sink configured by AUDIT_LOG_SINK, either one of the builtin sinks or a dotted path to an AuditSink
+    """
+    backend = settings.AUDIT_LOG_SINK
+    sink_class = AUDIT_SINKS.get(backend) or import_string(backend)
+    return sink_class()
+
+
+def get_entity_history(model: str, entity_id, limit=100):
+    """
+    Change history of an entity from the configured sink, model is "<app_label>.<ModelName>"
+    """
+    return get_audit_sink().history(model, entity_id, limit=limit)
@@ -0,0 +1,81 @@
+from datetime import UTC, datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from care.audit_log.buffer import AuditBuffer
+from care.audit_log.middleware import AuditEvent
+
+
+def make_events(count):
+    return [
+        AuditEvent(
+            timestamp=datetime.now(UTC),
+            request_id="post::test",
+            actor=None,
+            operation="insert",
+            model="emr.Patient",
+            entity_id=i,
+            changes={},
+        )
+        for i in range(count)
+    ]
+
+
+class AuditBufferTest(SimpleTestCase):
+    def setUp(self):
+        self.sink = mock.Mock()
+        patcher = mock.patch(
+            "care.audit_log.buffer.get_audit_sink", return_value=self.sink
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.buffer = AuditBuffer(size=5, batch_size=2, interval=1, retries=2)
+        self.buffer.retry_delay = 0
+        # Events are written by flush() in the tests instead of the background thread
+        self.buffer.thread = mock.Mock()
+
+    def written_ids(self):
+        return [
+            event.entity_id
+            for call in self.sink.write.call_args_list
+            for event in call.args[0]
+        ]
+
+    def test_events_written_in_batches(self):
+        self.buffer.extend(make_events(3))
+        self.buffer.flush()
+        self.assertEqual(
+            [len(call.args[0]) for call in self.sink.write.call_args_list], [2, 1]
+        )
+        self.assertEqual(self.written_ids(), [0, 1, 2])
+        self.assertEqual(
+            self.buffer.get_stats(),
+            {"pending": 0, "written": 3, "dropped": 0, "failed": 0},
+        )
+
+    def test_oldest_events_dropped_when_full(self):
+        self.buffer.extend(make_events(4))
+        self.buffer.extend(make_events(3))
+        self.assertEqual(self.buffer.get_stats()["dropped"], 2)
+        self.buffer.flush()
+        self.assertEqual(self.written_ids(), [2, 3, 0, 1, 2])
+
+    def test_failed_batch_is_retried(self):
+        self.sink.write.side_effect = [Exception("unavailable"), None]
+        self.buffer.extend(make_events(2))
+        self.buffer.flush()
+        self.assertEqual(self.sink.write.call_count, 2)
+        self.assertEqual(self.buffer.get_stats()["written"], 2)
+        self.assertEqual(self.buffer.get_stats()["failed"], 0)
+
+    def test_batch_dropped_after_retries(self):
+        self.sink.write.side_effect = Exception("unavailable")
+        self.buffer.extend(make_events(2))
+        with self.assertLogs("care.audit_log.buffer", level="ERROR"):
+            self.buffer.flush()
+        self.assertEqual(self.sink.write.call_count, 3)
+        self.assertEqual(
+            self.buffer.get_stats(),
+            {"pending": 0, "written": 0, "dropped": 0, "failed": 2},
+        )
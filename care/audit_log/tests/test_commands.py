@@ -0,0 +1,33 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from care.audit_log.sinks import LoggerAuditSink
+
+
+class AuditHistoryCommandTest(SimpleTestCase):
+    def test_prints_history(self):
+        sink = mock.Mock()
+        sink.history.return_value = [{"operation": "update", "changes": {"name": "a"}}]
+        out = StringIO()
+        with mock.patch("care.audit_log.sinks.get_audit_sink", return_value=sink):
+            call_command(
+                "audit_history", "emr.Patient", "1", "--limit", "5", stdout=out
+            )
+        sink.history.assert_called_once_with("emr.Patient", "1", limit=5)
+        self.assertEqual(
+            json.loads(out.getvalue()),
+            {"operation": "update", "changes": {"name": "a"}},
+        )
+
+    def test_sink_without_history(self):
+        with (
+            mock.patch(
+                "care.audit_log.sinks.get_audit_sink", return_value=LoggerAuditSink()
+            ),
+            self.assertRaisesMessage(CommandError, "cannot be queried"),
+        ):
+            call_command("audit_history", "emr.Patient", "1")
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from care.audit_log.middleware import AuditLogMiddleware
+from care.emr.models.organization import Organization
+
+
+@override_settings(AUDIT_LOG_ENABLED=True)
+class AuditReceiverTest(TestCase):
+    def setUp(self):
+        for name, value in [
+            ("is_request", True),
+            ("get_current_user", None),
+            ("get_current_request_id", "post::test"),
+        ]:
+            patcher = mock.patch.object(AuditLogMiddleware, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(AuditLogMiddleware, "add_event")
+        self.add_event = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.organization = Organization.objects.create(
+            name="State", org_type="govt", description="Old"
+        )
+
+    def last_event(self):
+        return self.add_event.call_args.args[0]
+
+    def test_anonymous_actor_is_none(self):
+        self.assertEqual(self.last_event().operation, "insert")
+        self.assertIsNone(self.last_event().actor)
+
+    def test_deferred_fields_read_after_loading_are_not_changes(self):
+        organization = Organization.objects.only("id", "name").get(
+            id=self.organization.id
+        )
+        self.assertEqual(organization.description, "Old")
+        organization.name = "New State"
+        organization.save()
+        changes = self.last_event().changes
+        self.assertEqual(changes["name"], "New State")
+        self.assertNotIn("description", changes)
+
+    def test_assigned_deferred_fields_are_changes(self):
+        organization = Organization.objects.only("id", "name").get(
+            id=self.organization.id
+        )
+        organization.description = "New"
+        organization.save()
+        self.assertEqual(self.last_event().changes["description"], "New")
@@ -0,0 +1,100 @@
+import tempfile
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from care.audit_log.middleware import AuditEvent
+from care.audit_log.sinks import (
+    AuditHistoryUnavailableError,
+    AuditSink,
+    DatabaseAuditSink,
+    JSONLAuditSink,
+    LoggerAuditSink,
+)
+
+
+def make_event(entity_id, operation="update", minutes=0, **changes):
+    return AuditEvent(
+        timestamp=datetime(2025, 1, 15, tzinfo=UTC) + timedelta(minutes=minutes),
+        request_id="post::test",
+        actor="1|admin",
+        operation=operation,
+        model="emr.Patient",
+        entity_id=entity_id,
+        changes=changes,
+    )
+
+
+class AuditSinkTest(SimpleTestCase):
+    def test_sinks_must_implement_write_and_history(self):
+        class IncompleteSink(AuditSink):
+            def write(self, events):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+    def test_logger_sink(self):
+        sink = LoggerAuditSink()
+        with self.assertLogs("care.audit_log.sinks", level="INFO") as logs:
+            sink.write([make_event(1, name="new")])
+        self.assertIn(
+            "AUDIT_LOG::post::test|1|admin|update|emr.Patient|ID:1", logs.output[0]
+        )
+        with self.assertRaises(AuditHistoryUnavailableError):
+            sink.history("emr.Patient", 1)
+
+
+class JSONLAuditSinkTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "audit_log.jsonl"
+
+    def test_history_newest_first(self):
+        sink = JSONLAuditSink(path=self.path, max_bytes=1024 * 1024, backup_count=2)
+        sink.write([make_event(1, minutes=0, name="a"), make_event(2, minutes=1)])
+        sink.write([make_event(1, minutes=2, name="b")])
+        history = sink.history("emr.Patient", 1)
+        self.assertEqual(
+            [record["changes"] for record in history], [{"name": "b"}, {"name": "a"}]
+        )
+        self.assertEqual(len(sink.history("emr.Patient", 1, limit=1)), 1)
+
+    def test_each_process_writes_its_own_file(self):
+        sink = JSONLAuditSink(path=self.path, max_bytes=1024 * 1024, backup_count=2)
+        with mock.patch("care.audit_log.sinks.os.getpid", return_value=100):
+            sink.write([make_event(1, minutes=0)])
+        with mock.patch("care.audit_log.sinks.os.getpid", return_value=200):
+            sink.write([make_event(1, minutes=1)])
+        self.assertEqual(
+            sorted(path.name for path in self.path.parent.iterdir()),
+            ["audit_log.100.jsonl", "audit_log.200.jsonl"],
+        )
+        history = sink.history("emr.Patient", 1)
+        self.assertEqual(len(history), 2)
+        self.assertGreater(history[0]["timestamp"], history[1]["timestamp"])
+
+    def test_history_includes_rotated_files(self):
+        sink = JSONLAuditSink(path=self.path, max_bytes=300, backup_count=5)
+        for minute in range(5):
+            sink.write([make_event(1, minutes=minute, note="x" * 50)])
+        self.assertGreater(len(list(self.path.parent.iterdir())), 1)
+        self.assertEqual(len(sink.history("emr.Patient", 1)), 5)
+
+
+class DatabaseAuditSinkTest(TestCase):
+    def test_write_and_history(self):
+        sink = DatabaseAuditSink()
+        sink.write(
+            [make_event(1, minutes=0, name="a"), make_event(1, minutes=1, name="b")]
+        )
+        # Partitions are created once per month
+        sink.write([make_event(1, minutes=2, name="c")])
+        history = sink.history("emr.Patient", 1)
+        self.assertEqual(
+            [record["changes"]["name"] for record in history], ["c", "b", "a"]
+        )
+        self.assertEqual(history[0]["actor"], "1|admin")
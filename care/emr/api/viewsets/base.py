@@ -1,7 +1,9 @@
 import json
+import uuid
 
 from django.db import transaction
 from django.http.response import Http404
+from django.utils import timezone
 from pydantic import ValidationError
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError as RestFrameworkValidationError
@@ -10,8 +12,13 @@ from rest_framework.response import Response
 from rest_framework.views import exception_handler as drf_exception_handler
 from rest_framework.viewsets import GenericViewSet
 
+from care.audit_log.receivers import audit_bulk_save
 from care.emr.models import QuestionnaireResponse
 from care.emr.models.base import EMRBaseModel
+from care.emr.registries.care_valueset.care_valueset import (
+    get_valueset_lookups,
+    lookup_valuesets,
+)
 from care.emr.resources.base import EMRResource
 
 
@@ -73,20 +80,7 @@ class EMRCreateMixin:
         with transaction.atomic():
             instance.save()
             if getattr(self, "CREATE_QUESTIONNAIRE_RESPONSE", False):
-                QuestionnaireResponse.objects.create(
-                    subject_id=self.fetch_patient_from_instance(instance).external_id,
-                    patient=self.fetch_patient_from_instance(instance),
-                    encounter=self.fetch_encounter_from_instance(instance),
-                    structured_responses={
-                        self.questionnaire_type: {
-                            "submit_type": "CREATE",
-                            "id": str(instance.external_id),
-                        }
-                    },
-                    structured_response_type=self.questionnaire_type,
-                    created_by=self.request.user,
-                    updated_by=self.request.user,
-                )
+                self.build_questionnaire_response(instance, "CREATE").save()
 
     def clean_create_data(self, request_data):
         return request_data
@@ -97,12 +91,18 @@ class EMRCreateMixin:
     def create(self, request, *args, **kwargs):
         return Response(self.handle_create(request.data))
 
-    def handle_create(self, request_data):
+    def prepare_create(self, request_data):
+        """
+        Validates and authorizes the request, returns the database object to be created
+        """
         clean_data = self.clean_create_data(request_data)
         instance = self.pydantic_model(**clean_data)
         self.validate_data(instance, None)
         self.authorize_create(instance)
-        model_instance = instance.de_serialize()
+        return instance.de_serialize()
+
+    def handle_create(self, request_data):
+        model_instance = self.prepare_create(request_data)
         self.perform_create(model_instance)
         return self.get_retrieve_pydantic_model().serialize(model_instance).to_json()
 
@@ -113,13 +113,9 @@ class EMRListMixin:
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(queryset, request)
         if page is not None:
-            data = [
-                self.get_read_pydantic_model().serialize(obj).to_json() for obj in page
-            ]
+            data = self.get_read_pydantic_model().serialize_many(page)
             return paginator.get_paginated_response(data)
-        data = [
-            self.get_read_pydantic_model().serialize(obj).to_json() for obj in queryset
-        ]
+        data = self.get_read_pydantic_model().serialize_many(queryset)
         return Response(data)
 
 
@@ -130,20 +126,7 @@ class EMRUpdateMixin:
         with transaction.atomic():
             instance.save()
             if getattr(self, "CREATE_QUESTIONNAIRE_RESPONSE", False):
-                QuestionnaireResponse.objects.create(
-                    subject_id=self.fetch_patient_from_instance(instance).external_id,
-                    patient=self.fetch_patient_from_instance(instance),
-                    encounter=self.fetch_encounter_from_instance(instance),
-                    structured_responses={
-                        self.questionnaire_type: {
-                            "submit_type": "UPDATE",
-                            "id": str(instance.external_id),
-                        }
-                    },
-                    structured_response_type=self.questionnaire_type,
-                    created_by=self.request.user,
-                    updated_by=self.request.user,
-                )
+                self.build_questionnaire_response(instance, "UPDATE").save()
 
     def clean_update_data(self, request_data):
         if type(request_data) is list:
@@ -161,7 +144,10 @@ class EMRUpdateMixin:
     def authorize_update(self, request_obj, model_instance):
         pass
 
-    def handle_update(self, instance, request_data):
+    def prepare_update(self, instance, request_data):
+        """
+        Validates and authorizes the request, returns the updated (unsaved) database object
+        """
         clean_data = self.clean_update_data(request_data)  # From Create
         pydantic_model = self.get_update_pydantic_model()
         serializer_obj = pydantic_model.model_validate(
@@ -169,7 +155,10 @@ class EMRUpdateMixin:
         )
         self.validate_data(serializer_obj, instance)
         self.authorize_update(serializer_obj, instance)
-        model_instance = serializer_obj.de_serialize(obj=instance)
+        return serializer_obj.de_serialize(obj=instance)
+
+    def handle_update(self, instance, request_data):
+        model_instance = self.prepare_update(instance, request_data)
         self.perform_update(model_instance)
         return self.get_retrieve_pydantic_model().serialize(model_instance).to_json()
 
@@ -190,19 +179,78 @@ class EMRDeleteMixin:
 
 
 class EMRUpsertMixin:
+    """
+    Creates and updates a list of datapoints in a single request.
+
+    Viewsets that set BULK_UPSERT validate and authorize every datapoint first and then persist them
+    with bulk_create/bulk_update, along with the questionnaire responses in a single insert.
+    Audit events are recorded for the bulk writes, other save signals are not sent, so only enable it
+    for models that do not rely on save() overrides or save signals.
+    """
+
+    BULK_UPSERT = False
+
+    def get_upsert_instances(self, datapoints):
+        """
+        Fetch all the existing instances referenced in the datapoints with a single query
+        """
+        external_ids = []
+        for datapoint in datapoints:
+            if "id" not in datapoint:
+                continue
+            try:
+                external_ids.append(uuid.UUID(str(datapoint["id"])))
+            except ValueError:
+                continue
+        if not external_ids:
+            return {}
+        return {
+            str(instance.external_id): instance
+            for instance in self.database_model.objects.filter(
+                external_id__in=external_ids
+            ).select_related("created_by", "updated_by")
+        }
+
+    def preload_upsert_authorization(self, instances, datapoints):
+        """
+        Hook to authorize all datapoints of an upsert at once,
+        decisions are memoized so the per datapoint authorization checks are answered from memory
+        """
+
+    def preload_upsert_valuesets(self, datapoints):
+        """
+        Validate the codings of all datapoints in one batch,
+        the valueset checks of the spec validators are then answered from memory
+        """
+        lookups = []
+        for datapoint in datapoints:
+            if "id" in datapoint:
+                pydantic_model = self.get_update_pydantic_model()
+            else:
+                pydantic_model = self.pydantic_model
+            lookups.extend(get_valueset_lookups(pydantic_model, datapoint))
+        lookup_valuesets(lookups)
+
     @action(detail=False, methods=["POST"])
     def upsert(self, request, *args, **kwargs):
         datapoints = request.data.get("datapoints", [])
         results = []
         errored = False
+        instances = self.get_upsert_instances(datapoints)
+        self.preload_upsert_authorization(list(instances.values()), datapoints)
+        self.preload_upsert_valuesets(datapoints)
+        if self.BULK_UPSERT:
+            return self.bulk_upsert(datapoints, instances)
         try:
             with transaction.atomic():
                 for datapoint in datapoints:
                     try:
                         if "id" in datapoint:
-                            instance = get_object_or_404(
-                                self.database_model, external_id=datapoint["id"]
-                            )
+                            instance = instances.get(str(datapoint["id"]))
+                            if not instance:
+                                instance = get_object_or_404(
+                                    self.database_model, external_id=datapoint["id"]
+                                )
                             result = self.handle_update(instance, datapoint)
                         else:
                             result = self.handle_create(datapoint)
@@ -216,6 +264,78 @@ class EMRUpsertMixin:
             return Response(results, status=400)
         return Response(results)
 
+    def bulk_upsert(self, datapoints, instances):
+        results = []
+        creates = []
+        updates = []
+        errored = False
+        for datapoint in datapoints:
+            try:
+                if "id" in datapoint:
+                    instance = instances.get(str(datapoint["id"]))
+                    if not instance:
+                        instance = get_object_or_404(
+                            self.database_model, external_id=datapoint["id"]
+                        )
+                    model_instance = self.prepare_update(instance, datapoint)
+                    updates.append(model_instance)
+                else:
+                    model_instance = self.prepare_create(datapoint)
+                    creates.append(model_instance)
+                results.append(model_instance)
+            except Exception as e:
+                errored = True
+                results.append(emr_exception_handler(e, {}).data)
+        if not errored:
+            self.perform_bulk_upsert(creates, updates)
+        pydantic_model = self.get_retrieve_pydantic_model()
+        data = [
+            pydantic_model.serialize(result).to_json()
+            if isinstance(result, EMRBaseModel)
+            else result
+            for result in results
+        ]
+        return Response(data, status=400 if errored else 200)
+
+    def get_bulk_update_fields(self):
+        return [
+            field.name
+            for field in self.database_model._meta.concrete_fields  # noqa SLF001
+            if not field.primary_key
+            and field.name not in ["external_id", "created_date", "created_by"]
+        ]
+
+    def perform_bulk_upsert(self, creates, updates):
+        now = timezone.now()
+        for instance in creates:
+            instance.created_by = self.request.user
+            instance.updated_by = self.request.user
+        for instance in updates:
+            instance.updated_by = self.request.user
+            # bulk_update does not run auto_now
+            instance.modified_date = now
+        questionnaire_responses = []
+        if getattr(self, "CREATE_QUESTIONNAIRE_RESPONSE", False):
+            questionnaire_responses = [
+                self.build_questionnaire_response(instance, "CREATE")
+                for instance in creates
+            ] + [
+                self.build_questionnaire_response(instance, "UPDATE")
+                for instance in updates
+            ]
+        update_fields = self.get_bulk_update_fields()
+        with transaction.atomic():
+            with audit_bulk_save(self.database_model, creates, updates, update_fields):
+                if creates:
+                    self.database_model.objects.bulk_create(creates)
+                if updates:
+                    self.database_model.objects.bulk_update(updates, update_fields)
+            if questionnaire_responses:
+                with audit_bulk_save(
+                    QuestionnaireResponse, questionnaire_responses, []
+                ):
+                    QuestionnaireResponse.objects.bulk_create(questionnaire_responses)
+
 
 class EMRBaseViewSet(GenericViewSet):
     pydantic_model: EMRResource = None
@@ -261,6 +381,26 @@ class EMRBaseViewSet(GenericViewSet):
     def fetch_patient_from_instance(self, instance):
         return instance.patient
 
+    def build_questionnaire_response(self, instance, submit_type):
+        """
+        Unsaved questionnaire response recording a create or update of the instance
+        """
+        patient = self.fetch_patient_from_instance(instance)
+        return QuestionnaireResponse(
+            subject_id=patient.external_id,
+            patient=patient,
+            encounter=self.fetch_encounter_from_instance(instance),
+            structured_responses={
+                self.questionnaire_type: {
+                    "submit_type": submit_type,
+                    "id": str(instance.external_id),
+                }
+            },
+            structured_response_type=self.questionnaire_type,
+            created_by=self.request.user,
+            updated_by=self.request.user,
+        )
+
 
 class EMRQuestionnaireResponseMixin:
     CREATE_QUESTIONNAIRE_RESPONSE = True
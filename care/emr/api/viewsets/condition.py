@@ -13,8 +13,10 @@ from care.emr.resources.condition.spec import (
     CategoryChoices,
     ConditionSpec,
     ConditionSpecRead,
+    ConditionUpdateSpec,
 )
 from care.emr.resources.questionnaire.spec import SubjectType
+from care.emr.utils.preload import get_preloaded_object
 
 
 class ConditionFilters(FilterSet):
@@ -32,6 +34,8 @@ class SymptomViewSet(
     database_model = Condition
     pydantic_model = ConditionSpec
     pydantic_read_model = ConditionSpecRead
+    pydantic_update_model = ConditionUpdateSpec
+    BULK_UPSERT = True
     # Filters
     filterset_class = ConditionFilters
     filter_backends = [DjangoFilterBackend]
@@ -41,12 +45,15 @@ class SymptomViewSet(
     questionnaire_description = "Symptom"
     questionnaire_subject_type = SubjectType.patient.value
 
-    def perform_create(self, instance):
+    def prepare_create(self, request_data):
+        instance = super().prepare_create(request_data)
         instance.category = CategoryChoices.problem_list_item.value
-        super().perform_create(instance)
+        return instance
 
     def authorize_create(self, instance: ConditionSpec):
-        encounter = Encounter.objects.get(external_id=instance.encounter)
+        encounter = get_preloaded_object(
+            Encounter, instance.encounter
+        ) or Encounter.objects.get(external_id=instance.encounter)
         if str(encounter.patient.external_id) != self.kwargs["patient_external_id"]:
             err = "Malformed request"
             raise PermissionDenied(err)
@@ -75,6 +82,8 @@ class DiagnosisViewSet(
     database_model = Condition
     pydantic_model = ConditionSpec
     pydantic_read_model = ConditionSpecRead
+    pydantic_update_model = ConditionUpdateSpec
+    BULK_UPSERT = True
     # Filters
     filterset_class = ConditionFilters
     filter_backends = [DjangoFilterBackend]
@@ -84,12 +93,15 @@ class DiagnosisViewSet(
     questionnaire_description = "Diagnosis"
     questionnaire_subject_type = SubjectType.patient.value
 
-    def perform_create(self, instance):
+    def prepare_create(self, request_data):
+        instance = super().prepare_create(request_data)
         instance.category = CategoryChoices.encounter_diagnosis.value
-        super().perform_create(instance)
+        return instance
 
     def authorize_create(self, instance: ConditionSpec):
-        encounter = Encounter.objects.get(external_id=instance.encounter)
+        encounter = get_preloaded_object(
+            Encounter, instance.encounter
+        ) or Encounter.objects.get(external_id=instance.encounter)
         if str(encounter.patient.external_id) != self.kwargs["patient_external_id"]:
             err = "Malformed request"
             raise PermissionDenied(err)
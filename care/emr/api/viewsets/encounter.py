@@ -45,11 +45,13 @@ from care.emr.tasks.discharge_summary import (
     email_discharge_summary_task,
     generate_discharge_summary_task,
 )
+from care.emr.utils.patient_search import filter_phone_number
 from care.facility.api.serializers.patient_consultation import (
     EmailDischargeSummarySerializer,
 )
 from care.facility.models import Facility
 from care.security.authorization import AuthorizationController
+from care.utils.pagination.care_pagination import CareCursorPagination
 
 
 class LiveFilter(filters.CharFilter):
@@ -64,6 +66,13 @@ class LiveFilter(filters.CharFilter):
         return queryset
 
 
+class PhoneNumberFilter(filters.CharFilter):
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return filter_phone_number(qs, value, field=self.field_name)
+
+
 class EncounterFilters(filters.FilterSet):
     facility = filters.UUIDFilter(field_name="facility__external_id")
     status = filters.CharFilter(field_name="status", lookup_expr="iexact")
@@ -74,9 +83,7 @@ class EncounterFilters(filters.FilterSet):
     external_identifier = filters.CharFilter(
         field_name="external_identifier", lookup_expr="icontains"
     )
-    phone_number = filters.CharFilter(
-        field_name="patient__phone_number", lookup_expr="icontains"
-    )
+    phone_number = PhoneNumberFilter(field_name="patient__phone_number_normalized")
     name = filters.CharFilter(field_name="patient__name", lookup_expr="icontains")
     live = LiveFilter()
 
@@ -91,6 +98,7 @@ class EncounterViewSet(
     pydantic_retrieve_model = EncounterRetrieveSpec
     filterset_class = EncounterFilters
     filter_backends = [filters.DjangoFilterBackend]
+    pagination_class = CareCursorPagination
 
     def perform_create(self, instance):
         with transaction.atomic():
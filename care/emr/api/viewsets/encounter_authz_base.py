@@ -1,7 +1,11 @@
+import uuid
+
+from django.db.models import Q
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.generics import get_object_or_404
 
 from care.emr.models import Encounter, Patient
+from care.emr.utils.preload import get_preloaded_object, preload_objects
 from care.security.authorization import AuthorizationController
 
 
@@ -11,6 +15,36 @@ class EncounterBasedAuthorizationBase:
             Patient, external_id=self.kwargs["patient_external_id"]
         )
 
+    def preload_upsert_authorization(self, instances, datapoints):
+        """
+        Fetch every encounter referenced by the upsert in one query and authorize them as a batch
+        """
+        encounter_ids = {instance.encounter_id for instance in instances}
+        encounter_external_ids = set()
+        for datapoint in datapoints:
+            if "id" not in datapoint and datapoint.get("encounter"):
+                try:
+                    encounter_external_ids.add(uuid.UUID(str(datapoint["encounter"])))
+                except ValueError:
+                    continue
+        if not encounter_ids and not encounter_external_ids:
+            return
+        encounters = {
+            encounter.id: encounter
+            for encounter in Encounter.objects.filter(
+                Q(id__in=encounter_ids) | Q(external_id__in=encounter_external_ids)
+            ).select_related("patient")
+        }
+        preload_objects(encounters.values())
+        for instance in instances:
+            if instance.encounter_id in encounters:
+                instance.encounter = encounters[instance.encounter_id]
+        AuthorizationController.call(
+            "can_update_encounter_obj_many",
+            self.request.user,
+            list(encounters.values()),
+        )
+
     def authorize_update(self, request_obj, model_instance):
         if not AuthorizationController.call(
             "can_update_encounter_obj", self.request.user, model_instance.encounter
@@ -18,7 +52,9 @@ class EncounterBasedAuthorizationBase:
             raise PermissionDenied("You do not have permission to update encounter")
 
     def authorize_create(self, instance):
-        encounter = get_object_or_404(Encounter, external_id=instance.encounter)
+        encounter = get_preloaded_object(
+            Encounter, instance.encounter
+        ) or get_object_or_404(Encounter, external_id=instance.encounter)
         if not AuthorizationController.call(
             "can_update_encounter_obj", self.request.user, encounter
         ):
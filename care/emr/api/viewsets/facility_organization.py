@@ -143,10 +143,9 @@ class FacilityOrganizationViewSet(EMRModelViewSet):
         orgusers = FacilityOrganizationUser.objects.filter(
             user=request.user, organization__facility=self.get_facility_obj()
         ).select_related("organization")
-        data = [
-            self.get_read_pydantic_model().serialize(orguser.organization).to_json()
-            for orguser in orgusers
-        ]
+        data = self.get_read_pydantic_model().serialize_many(
+            [orguser.organization for orguser in orgusers]
+        )
         return Response({"count": len(data), "results": data})
 
 
@@ -1,8 +1,13 @@
+import re
+
+from botocore.exceptions import ClientError
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import content_disposition_header
 from django_filters import rest_framework as filters
 from pydantic import BaseModel
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
@@ -51,6 +56,9 @@ def file_authorizer(user, file_type, associating_id, permission):
         raise PermissionDenied("Cannot View File")
 
 
+SINGLE_BYTE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+
 class FileUploadFilter(filters.FilterSet):
     is_archived = filters.BooleanFilter(field_name="is_archived")
 
@@ -115,6 +123,39 @@ class FileUploadViewSet(
         obj.save(update_fields=["upload_completed"])
         return Response(FileUploadListSpec.serialize(obj).to_json())
 
+    @action(detail=True, methods=["GET"])
+    def download(self, request, *args, **kwargs):
+        """
+        Streams the file through the server for clients that cannot reach the bucket directly,
+        single range requests are passed through to the bucket
+        """
+        obj = self.get_object()
+        if not obj.upload_completed:
+            raise ValidationError("File upload is not completed")
+        byte_range = request.headers.get("Range")
+        if byte_range and not SINGLE_BYTE_RANGE.match(byte_range):
+            # Multiple ranges are not supported, serve the whole file
+            byte_range = None
+        try:
+            s3_response, chunks = obj.files_manager.open_stream(obj, byte_range)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                return HttpResponse(status=416)
+            raise
+        response = StreamingHttpResponse(
+            chunks,
+            content_type=s3_response.get("ContentType") or "application/octet-stream",
+            status=206 if s3_response.get("ContentRange") else 200,
+        )
+        response["Content-Length"] = s3_response["ContentLength"]
+        if s3_response.get("ContentRange"):
+            response["Content-Range"] = s3_response["ContentRange"]
+        response["Accept-Ranges"] = "bytes"
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment=True, filename=f"{obj.name}{obj.get_extension()}"
+        )
+        return response
+
     class ArchiveRequestSpec(BaseModel):
         archive_reason: str
 
@@ -49,6 +49,7 @@ class MedicationRequestViewSet(
     database_model = MedicationRequest
     pydantic_model = MedicationRequestSpec
     pydantic_read_model = MedicationRequestReadSpec
+    BULK_UPSERT = True
     questionnaire_type = "medication_request"
     questionnaire_title = "Medication Request"
     questionnaire_description = "Medication Request"
@@ -23,6 +23,7 @@ class MedicationStatementViewSet(
     database_model = MedicationStatement
     pydantic_model = MedicationStatementSpec
     pydantic_read_model = MedicationStatementReadSpec
+    BULK_UPSERT = True
     questionnaire_type = "medication_statement"
     questionnaire_title = "Medication Statement"
     questionnaire_description = "Medication Statement"
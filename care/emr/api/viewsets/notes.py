@@ -22,6 +22,7 @@ from care.emr.resources.notes.thread_spec import (
     NoteThreadUpdateSpec,
 )
 from care.security.authorization import AuthorizationController
+from care.utils.pagination.care_pagination import CareCursorPagination
 
 
 class NoteThreadViewSet(
@@ -35,6 +36,7 @@ class NoteThreadViewSet(
     pydantic_model = NoteThreadCreateSpec
     pydantic_read_model = NoteThreadUpdateSpec
     pydantic_update_model = NoteThreadReadSpec
+    pagination_class = CareCursorPagination
 
     def get_patient(self):
         return get_object_or_404(
@@ -103,6 +105,7 @@ class NoteMessageViewSet(
     pydantic_model = NoteMessageCreateSpec
     pydantic_read_model = NoteMessageReadSpec
     pydantic_update_model = NoteMessageUpdateSpec
+    pagination_class = CareCursorPagination
 
     def get_patient_obj(self):
         return get_object_or_404(
@@ -1,3 +1,9 @@
+from collections import defaultdict
+from datetime import datetime
+from enum import StrEnum
+
+from django.db.models import Avg, Count, F, Max, Min, Q, Window
+from django.db.models.functions import RowNumber, Trunc
 from django_filters import rest_framework as filters
 from pydantic import BaseModel, Field
 from rest_framework.decorators import action
@@ -9,6 +15,7 @@ from care.emr.models.observation import Observation
 from care.emr.resources.common.coding import Coding
 from care.emr.resources.observation.spec import ObservationReadSpec
 from care.emr.resources.questionnaire.spec import QuestionType
+from care.utils.pagination.care_pagination import CareCursorPagination
 
 
 class MultipleCodeFilter(filters.CharFilter):
@@ -32,9 +39,36 @@ class ObservationFilter(filters.FilterSet):
     ignore_group = IgnoreGroupFilter()
 
 
+class ObservationAggregateInterval(StrEnum):
+    minute = "minute"
+    hour = "hour"
+    day = "day"
+    week = "week"
+    month = "month"
+
+
 class ObservationAnalyseRequest(BaseModel):
     codes: list[Coding] = Field(min_length=1, max_length=20)
     page_size: int = Field(10, le=30)
+    aggregate: ObservationAggregateInterval | None = Field(
+        None,
+        description="Return min/max/avg of numeric values per bucket of this size instead of observations",
+    )
+    start: datetime | None = None
+    end: datetime | None = None
+
+
+def get_codes_filter(codes):
+    """
+    Filter on the generated code columns matching any of the codes
+    """
+    query = Q()
+    for code in codes:
+        if code.system is None:
+            query |= Q(code=code.code, code_system__isnull=True)
+        else:
+            query |= Q(code=code.code, code_system=code.system)
+    return query
 
 
 class ObservationViewSet(EncounterBasedAuthorizationBase, EMRModelReadOnlyViewSet):
@@ -42,6 +76,7 @@ class ObservationViewSet(EncounterBasedAuthorizationBase, EMRModelReadOnlyViewSe
     pydantic_model = ObservationReadSpec
     filterset_class = ObservationFilter
     filter_backends = [filters.DjangoFilterBackend]
+    pagination_class = CareCursorPagination
 
     def get_queryset(self):
         self.authorize_read_encounter()
@@ -58,23 +93,73 @@ class ObservationViewSet(EncounterBasedAuthorizationBase, EMRModelReadOnlyViewSe
     @action(methods=["POST"], detail=False)
     def analyse(self, request, **kwargs):
         request_params = ObservationAnalyseRequest(**request.data)
-        queryset = self.get_queryset()
-        page_size = request_params.page_size
-        results = []
-        for code in request_params.codes:
-            code_queryset = queryset.filter(
-                main_code__code=code.code, main_code__system=code.system
-            )[:page_size]
-            code_results = [
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            get_codes_filter(request_params.codes)
+        )
+        if request_params.start:
+            queryset = queryset.filter(effective_datetime__gte=request_params.start)
+        if request_params.end:
+            queryset = queryset.filter(effective_datetime__lt=request_params.end)
+        if request_params.aggregate:
+            grouped = self.get_buckets(queryset, request_params.aggregate.value)
+        else:
+            grouped = self.get_latest(queryset, request_params.page_size)
+        results = [
+            {
+                "code": code.model_dump(exclude_defaults=True),
+                "results": grouped.get((code.system, code.code), []),
+            }
+            for code in request_params.codes
+        ]
+        return Response({"results": results})
+
+    def get_latest(self, queryset, page_size):
+        """
+        Latest page_size observations of every code, fetched in one query
+        """
+        queryset = queryset.annotate(
+            code_rank=Window(
+                RowNumber(),
+                partition_by=[F("code_system"), F("code")],
+                order_by=F("modified_date").desc(),
+            )
+        ).filter(code_rank__lte=page_size)
+        grouped = defaultdict(list)
+        for obj in queryset:
+            grouped[(obj.code_system, obj.code)].append(
                 self.get_read_pydantic_model()
                 .serialize(obj)
                 .model_dump(exclude=["meta"])
-                for obj in code_queryset
-            ]
-            results.append(
+            )
+        return grouped
+
+    def get_buckets(self, queryset, interval):
+        """
+        Numeric values of every code aggregated into time buckets in one query,
+        the database does the aggregation so only the buckets are transferred
+        """
+        buckets = (
+            queryset.filter(value_numeric__isnull=False)
+            .annotate(bucket=Trunc("effective_datetime", interval))
+            .order_by()
+            .values("code_system", "code", "bucket")
+            .annotate(
+                min=Min("value_numeric"),
+                max=Max("value_numeric"),
+                avg=Avg("value_numeric"),
+                count=Count("id"),
+            )
+            .order_by("code_system", "code", "bucket")
+        )
+        grouped = defaultdict(list)
+        for bucket in buckets:
+            grouped[(bucket["code_system"], bucket["code"])].append(
                 {
-                    "code": code.model_dump(exclude_defaults=True),
-                    "results": code_results,
+                    "start": bucket["bucket"],
+                    "min": bucket["min"],
+                    "max": bucket["max"],
+                    "avg": bucket["avg"],
+                    "count": bucket["count"],
                 }
             )
-        return Response({"results": results})
+        return grouped
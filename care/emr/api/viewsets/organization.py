@@ -191,10 +191,9 @@ class OrganizationViewSet(EMRModelViewSet):
         orgusers = OrganizationUser.objects.filter(user=request.user).select_related(
             "organization"
         )
-        data = [
-            self.get_read_pydantic_model().serialize(orguser.organization).to_json()
-            for orguser in orgusers
-        ]
+        data = self.get_read_pydantic_model().serialize_many(
+            [orguser.organization for orguser in orgusers]
+        )
         return Response({"count": len(data), "results": data})
 
 
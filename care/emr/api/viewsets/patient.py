@@ -2,7 +2,7 @@ import datetime
 
 from django_filters import CharFilter, FilterSet
 from django_filters.rest_framework import DjangoFilterBackend
-from pydantic import UUID4, BaseModel
+from pydantic import UUID4, BaseModel, Field, model_validator
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.generics import get_object_or_404
@@ -14,18 +14,35 @@ from care.emr.models.patient import Patient
 from care.emr.resources.patient.spec import (
     PatientCreateSpec,
     PatientListSpec,
+    PatientMaskedPartialSpec,
     PatientPartialSpec,
     PatientRetrieveSpec,
 )
 from care.emr.resources.user.spec import UserSpec
+from care.emr.utils.patient_search import normalize_phone_number, search_patients
 from care.security.authorization import AuthorizationController
 from care.security.models import RoleModel
 from care.users.models import User
+from care.utils.pagination.care_pagination import CareCursorPagination
+
+
+class PhoneNumberFilter(CharFilter):
+    """
+    Matches complete phone numbers by their digits regardless of formatting and country code
+    """
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        digits = normalize_phone_number(value)
+        if not digits:
+            return qs.none()
+        return qs.filter(**{self.field_name: digits})
 
 
 class PatientFilters(FilterSet):
     name = CharFilter(field_name="name", lookup_expr="icontains")
-    phone_number = CharFilter(field_name="phone_number", lookup_expr="iexact")
+    phone_number = PhoneNumberFilter(field_name="phone_number_normalized")
 
 
 class PatientViewSet(EMRModelViewSet):
@@ -35,6 +52,7 @@ class PatientViewSet(EMRModelViewSet):
     pydantic_retrieve_model = PatientRetrieveSpec
     filterset_class = PatientFilters
     filter_backends = [DjangoFilterBackend]
+    pagination_class = CareCursorPagination
 
     def authorize_update(self, request_obj, model_instance):
         if not AuthorizationController.call(
@@ -85,7 +103,9 @@ class PatientViewSet(EMRModelViewSet):
     def search(self, request, *args, **kwargs):
         max_page_size = 200
         request_data = self.SearchRequestSpec(**request.data)
-        queryset = Patient.objects.filter(phone_number=request_data.phone_number)
+        queryset = Patient.objects.filter(
+            phone_number_normalized=normalize_phone_number(request_data.phone_number)
+        )
         if request_data.date_of_birth:
             queryset = queryset.filter(date_of_birth=request_data.date_of_birth)
         if request_data.year_of_birth:
@@ -97,6 +117,44 @@ class PatientViewSet(EMRModelViewSet):
         data = [PatientPartialSpec.serialize(obj).to_json() for obj in queryset]
         return Response({"results": data})
 
+    class RankedSearchRequestSpec(BaseModel):
+        name: str = ""
+        phone_number: str = ""
+        year_of_birth: int | None = None
+        limit: int = Field(20, ge=1, le=50)
+
+        @model_validator(mode="after")
+        def validate_terms(self):
+            min_phone_digits = 3
+            if not self.name.strip() and (
+                len(normalize_phone_number(self.phone_number)) < min_phone_digits
+            ):
+                raise ValueError(
+                    "Either a name or at least 3 digits of the phone number is required"
+                )
+            return self
+
+    @action(detail=False, methods=["POST"])
+    def search_ranked(self, request, *args, **kwargs):
+        """
+        Patients ranked by how closely their name matches, including transliteration variants,
+        narrowed down by phone number and year of birth. Only patients the user can list are
+        searched, phone numbers are masked as partial numbers are accepted.
+        """
+        request_data = self.RankedSearchRequestSpec(**request.data)
+        queryset = AuthorizationController.call(
+            "get_filtered_patients", Patient.objects.all(), request.user
+        )
+        patients = search_patients(
+            queryset,
+            name=request_data.name,
+            phone_number=request_data.phone_number,
+            year_of_birth=request_data.year_of_birth,
+            limit=request_data.limit,
+        )
+        data = [PatientMaskedPartialSpec.serialize(obj).to_json() for obj in patients]
+        return Response({"results": data})
+
     class SearchRetrieveRequestSpec(BaseModel):
         phone_number: str
         year_of_birth: int
@@ -105,8 +163,10 @@ class PatientViewSet(EMRModelViewSet):
     @action(detail=False, methods=["POST"])
     def search_retrieve(self, request, *args, **kwargs):
         request_data = self.SearchRetrieveRequestSpec(**request.data)
-        queryset = Patient.objects.filter(phone_number=request_data.phone_number)
-        queryset = queryset.filter(year_of_birth=request_data.year_of_birth)
+        queryset = Patient.objects.filter(
+            phone_number_normalized=normalize_phone_number(request_data.phone_number),
+            year_of_birth=request_data.year_of_birth,
+        )
         for patient in queryset:
             if str(patient.external_id)[:5] == request_data.partial_id:
                 return Response(PatientRetrieveSpec.serialize(patient).to_json())
@@ -108,9 +108,19 @@ class QuestionnaireViewSet(EMRModelViewSet):
                 raise PermissionDenied(
                     "Permission Denied to submit patient questionnaire"
                 )
+        timings = {}
         with transaction.atomic():
-            response = handle_response(questionnaire, request_params, request.user)
-        return Response(QuestionnaireResponseReadSpec.serialize(response).to_json())
+            response = handle_response(
+                questionnaire, request_params, request.user, timings=timings
+            )
+        return Response(
+            QuestionnaireResponseReadSpec.serialize(response).to_json(),
+            headers={
+                "Server-Timing": ", ".join(
+                    f"{stage};dur={duration}" for stage, duration in timings.items()
+                )
+            },
+        )
 
     @action(detail=True, methods=["GET"])
     def get_organizations(self, request, *args, **kwargs):
@@ -121,10 +131,9 @@ class QuestionnaireViewSet(EMRModelViewSet):
         questionnaire_organizations = QuestionnaireOrganization.objects.filter(
             questionnaire=questionnaire
         ).select_related("organization")
-        organizations_serialized = [
-            OrganizationReadSpec.serialize(obj.organization).to_json()
-            for obj in questionnaire_organizations
-        ]
+        organizations_serialized = OrganizationReadSpec.serialize_many(
+            [obj.organization for obj in questionnaire_organizations]
+        )
         return Response(
             {
                 "count": len(organizations_serialized),
@@ -160,12 +169,14 @@ class QuestionnaireViewSet(EMRModelViewSet):
                 QuestionnaireOrganization.objects.create(
                     questionnaire=questionnaire, organization=organization
                 )
-        organizations_serialized = [
-            OrganizationReadSpec.serialize(obj.organization).to_json()
-            for obj in QuestionnaireOrganization.objects.filter(
-                questionnaire=questionnaire
-            ).select_related("organization")
-        ]
+        organizations_serialized = OrganizationReadSpec.serialize_many(
+            [
+                obj.organization
+                for obj in QuestionnaireOrganization.objects.filter(
+                    questionnaire=questionnaire
+                ).select_related("organization")
+            ]
+        )
         return Response(
             {
                 "count": len(organizations_serialized),
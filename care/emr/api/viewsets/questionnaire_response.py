@@ -7,6 +7,7 @@ from care.emr.models import Encounter, Patient
 from care.emr.models.questionnaire import QuestionnaireResponse
 from care.emr.resources.questionnaire_response.spec import QuestionnaireResponseReadSpec
 from care.security.authorization import AuthorizationController
+from care.utils.pagination.care_pagination import CareCursorPagination
 
 
 class QuestionnaireResponseFilters(filters.FilterSet):
@@ -22,6 +23,7 @@ class QuestionnaireResponseViewSet(EMRModelReadOnlyViewSet):
     pydantic_read_model = QuestionnaireResponseReadSpec
     filterset_class = QuestionnaireResponseFilters
     filter_backends = [filters.DjangoFilterBackend]
+    pagination_class = CareCursorPagination
 
     def get_queryset(self):
         queryset = (
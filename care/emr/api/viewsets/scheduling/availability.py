@@ -1,10 +1,10 @@
 import datetime
-from datetime import time, timedelta
+import random
+import time
 
-from dateutil.parser import parse
-from django.db import transaction
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
 from django.db.models import Sum
-from django.utils import timezone
 from pydantic import UUID4, BaseModel, model_validator
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError
@@ -12,18 +12,26 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 
 from care.emr.api.viewsets.base import EMRBaseViewSet, EMRRetrieveMixin
-from care.emr.models import AvailabilityException, Schedule, TokenBooking
+from care.emr.models import AvailabilityException, TokenBooking
 from care.emr.models.patient import Patient
 from care.emr.models.scheduling.booking import TokenSlot
 from care.emr.models.scheduling.schedule import Availability, SchedulableUserResource
-from care.emr.resources.scheduling.schedule.spec import SlotTypeOptions
 from care.emr.resources.scheduling.slot.spec import (
     TokenBookingReadSpec,
     TokenSlotBaseSpec,
 )
+from care.emr.utils.scheduling import (
+    ensure_slots,
+    get_slot_calculator,
+    merge_intervals,
+    to_minutes,
+)
 from care.security.authorization import AuthorizationController
 from care.users.models import User
-from care.utils.lock import Lock
+from care.utils.lock import ObjectLocked
+
+# Postgres error code raised when lock_timeout is exceeded
+LOCK_NOT_AVAILABLE = "55P03"
 
 
 class SlotsForDayRequestSpec(BaseModel):
@@ -50,47 +58,67 @@ class AvailabilityStatsRequestSpec(BaseModel):
             raise ValidationError("Period cannot be be greater than max days")
 
 
-def convert_availability_to_slots(availabilities):
-    slots = {}
-    for availability in availabilities:
-        start_time = parse(availability["availability"]["start_time"])
-        end_time = parse(availability["availability"]["end_time"])
-        slot_size_in_minutes = availability["slot_size_in_minutes"]
-        availability_id = availability["availability_id"]
-        current_time = start_time
-        i = 0
-        while current_time < end_time:
-            i += 1
-            if i == 30:  # noqa PLR2004
-                # Failsafe to prevent infinite loop
-                break
-            slots[
-                f"{current_time.time()}-{(current_time + datetime.timedelta(minutes=slot_size_in_minutes)).time()}"
-            ] = {
-                "start_time": current_time.time(),
-                "end_time": (
-                    current_time + datetime.timedelta(minutes=slot_size_in_minutes)
-                ).time(),
-                "availability_id": availability_id,
-            }
+def allocate_slot(token_slot):
+    """
+    Take a token from the slot with a single conditional update, returns the new allocation or None if
+    the slot is full. Concurrent bookings of the same slot wait on its row lock, bookings of other slots
+    are not affected. The wait is bounded by BOOKING_LOCK_TIMEOUT.
+    """
+    table = connection.ops.quote_name(TokenSlot._meta.db_table)  # noqa SLF001
+    availability_table = connection.ops.quote_name(Availability._meta.db_table)  # noqa SLF001
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('lock_timeout', %s, true)",
+            [f"{settings.BOOKING_LOCK_TIMEOUT}ms"],
+        )
+        cursor.execute(
+            f"""
+            UPDATE {table} s
+            SET allocated = s.allocated + 1
+            FROM {availability_table} a
+            WHERE s.id = %s AND a.id = s.availability_id AND s.allocated < a.tokens_per_slot
+            RETURNING s.allocated
+            """,  # noqa S608
+            [token_slot.id],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
 
-            current_time += datetime.timedelta(minutes=slot_size_in_minutes)
-    return slots
+def is_lock_timeout(error):
+    return getattr(error.__cause__, "sqlstate", None) == LOCK_NOT_AVAILABLE
 
 
 def lock_create_appointment(token_slot, patient, created_by, reason_for_visit):
-    with Lock(f"booking:resource:{token_slot.resource.id}"), transaction.atomic():
-        if token_slot.allocated >= token_slot.availability.tokens_per_slot:
-            raise ValidationError("Slot is already full")
-        token_slot.allocated += 1
-        token_slot.save()
-        return TokenBooking.objects.create(
-            token_slot=token_slot,
-            patient=patient,
-            booked_by=created_by,
-            reason_for_visit=reason_for_visit,
-            status="booked",
-        )
+    for attempt in range(settings.BOOKING_MAX_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                allocated = allocate_slot(token_slot)
+                if allocated is None:
+                    raise ValidationError("Slot is already full")
+                token_slot.allocated = allocated
+                return TokenBooking.objects.create(
+                    token_slot=token_slot,
+                    patient=patient,
+                    booked_by=created_by,
+                    reason_for_visit=reason_for_visit,
+                    status="booked",
+                )
+        except OperationalError as e:
+            if not is_lock_timeout(e):
+                raise
+            # Backoff with jitter so that retries of waiting bookings do not line up
+            time.sleep(random.uniform(0, 0.05 * 2**attempt))  # noqa S311
+    raise ObjectLocked
+
+
+def overlaps(slot, exceptions):
+    start = to_minutes(slot.start_datetime.time())
+    end = start + int((slot.end_datetime - slot.start_datetime).total_seconds() // 60)
+    return any(
+        start < exception_end and exception_start < end
+        for exception_start, exception_end in exceptions
+    )
 
 
 class SlotViewSet(EMRRetrieveMixin, EMRBaseViewSet):
@@ -113,71 +141,31 @@ class SlotViewSet(EMRRetrieveMixin, EMRBaseViewSet):
         ).first()
         if not schedulable_resource_obj:
             raise ValidationError("Resource is not schedulable")
-        # Find all relevant schedules
-        availabilities = Availability.objects.filter(
-            slot_type=SlotTypeOptions.appointment.value,
-            schedule__valid_from__lte=request_data.day,
-            schedule__valid_to__gte=request_data.day,
-            schedule__resource=schedulable_resource_obj,
+        # Slots are usually created ahead of time by the background job
+        ensure_slots(schedulable_resource_obj, request_data.day)
+        exceptions = merge_intervals(
+            (to_minutes(exception["start_time"]), to_minutes(exception["end_time"]))
+            for exception in AvailabilityException.objects.filter(
+                valid_from__lte=request_data.day,
+                valid_to__gte=request_data.day,
+                resource=schedulable_resource_obj,
+            ).values("start_time", "end_time")
         )
-        # Fetch all availabilities for that day of week
-        calculated_dow_availabilities = []
-        for schedule_availability in availabilities:
-            for day_availability in schedule_availability.availability:
-                if day_availability["day_of_week"] == request_data.day.weekday():
-                    calculated_dow_availabilities.append(
-                        {
-                            "availability": day_availability,
-                            "slot_size_in_minutes": schedule_availability.slot_size_in_minutes,
-                            "availability_id": schedule_availability.id,
-                        }
-                    )
-        # Remove anything that has an availability exception
-        # Generate all slots already created for that day
-        slots = convert_availability_to_slots(calculated_dow_availabilities)
-        # Fetch all existing slots in that day
-        created_slots = TokenSlot.objects.filter(
+        slots = TokenSlot.objects.filter(
             start_datetime__date=request_data.day,
             end_datetime__date=request_data.day,
             resource=schedulable_resource_obj,
-        )
-        for slot in created_slots:
-            slot_key = f"{slot.start_datetime.time()}-{slot.end_datetime.time()}"
-            if (
-                slot_key in slots
-                and slots[slot_key]["availability_id"] == slot.availability.id
-            ):
-                slots.pop(slot_key)
-
-        # Create everything else
-        for _slot in slots:
-            slot = slots[_slot]
-            TokenSlot.objects.create(
-                resource=schedulable_resource_obj,
-                start_datetime=datetime.datetime.combine(
-                    request_data.day, slot["start_time"], tzinfo=timezone.now().tzinfo
-                ),
-                end_datetime=datetime.datetime.combine(
-                    request_data.day, slot["end_time"], tzinfo=timezone.now().tzinfo
-                ),
-                availability_id=slot["availability_id"],
-            )
-        # Compare and figure out what needs to be created
+        ).select_related("availability")
         return Response(
             {
                 "results": [
                     TokenSlotBaseSpec.serialize(slot).model_dump(exclude=["meta"])
-                    for slot in TokenSlot.objects.filter(
-                        start_datetime__date=request_data.day,
-                        end_datetime__date=request_data.day,
-                        resource=schedulable_resource_obj,
-                    ).select_related("availability")
+                    for slot in slots
+                    # Slots created before an exception was added are hidden unless they have bookings
+                    if slot.allocated or not overlaps(slot, exceptions)
                 ]
             }
         )
-        # Find all existing Slot objects for that period
-        # Get list of all slots, create if missed
-        # Return slots
 
     @classmethod
     def create_appointment_handler(cls, obj, request_data, user):
@@ -217,54 +205,17 @@ class SlotViewSet(EMRRetrieveMixin, EMRBaseViewSet):
         if not resource:
             raise ValidationError("Resource is not schedulable")
 
-        schedules = Schedule.objects.filter(
-            valid_from__lte=request_data.to_date,
-            valid_to__gte=request_data.from_date,
-            resource=resource,
-        ).values()
-
-        # Cache availabilities
-        availabilities = {}
-        for schedule in schedules:
-            availabilities[schedule["id"]] = Availability.objects.filter(
-                schedule_id=schedule["id"],
-                slot_type=SlotTypeOptions.appointment.value,
-            ).values()
-
-        availability_exceptions = AvailabilityException.objects.filter(
-            valid_from__lte=request_data.to_date,
-            valid_to__gte=request_data.from_date,
-            resource=resource,
-        ).values()
-
-        # Generate a list of all available days as a dict
-
-        days = {}
-        response_days = {}
-        day = request_data.from_date
-        while day < request_data.to_date:
-            days[day] = {"total_slots": 0, "booked_slots": 0}
-            response_days[str(day)] = {"total_slots": 0, "booked_slots": 0}
-            day += timedelta(days=1)
-
-        for day in days:
-            # Calculate all matching schedules
-            current_schedules = []
-            for schedule in schedules:
-                if schedule["valid_from"].date() <= day <= schedule["valid_to"].date():
-                    current_schedules.append(schedule)
-            # Calculate availability exception for that day
-            exceptions = []
-            for exception in availability_exceptions:
-                if exception["valid_from"] <= day <= exception["valid_to"]:
-                    exceptions.append(exception)
-            # Calculate slots based on these data
+        # Calculate total slots available for each day in one pass over the period
+        calculator = get_slot_calculator(
+            resource, request_data.from_date, request_data.to_date
+        )
+        response_days = {
+            str(day): {"total_slots": total_slots, "booked_slots": 0}
+            for day, total_slots in calculator.daily_totals(
+                request_data.from_date, request_data.to_date
+            ).items()
+        }
 
-            slots_count = calculate_slots(
-                day, availabilities, current_schedules, exceptions
-            )
-            days[day]["total_slots"] = slots_count
-            response_days[str(day)]["total_slots"] = slots_count
         # Query slots data for these dates, group by date and sum up count
 
         booked_slots = (
@@ -285,37 +236,3 @@ class SlotViewSet(EMRRetrieveMixin, EMRBaseViewSet):
         # Query all the booked slots for the given days and get the total booked
 
         return Response(response_days)
-
-
-def calculate_slots(
-    date: datetime.date,
-    availabilities: list[Availability],
-    schedules,
-    exceptions: list[AvailabilityException],
-):
-    # We don't care about duplicate slots because they won't exist because of our validations
-    day_of_week = date.weekday()
-    slots = 0
-    for schedule in schedules:
-        for availability in availabilities[schedule["id"]]:
-            for available_slot in availability["availability"]:
-                if available_slot["day_of_week"] != day_of_week:
-                    continue
-                start_time = time.fromisoformat(available_slot["start_time"])
-                end_time = time.fromisoformat(available_slot["end_time"])
-                while start_time <= end_time:
-                    conflicting = False
-                    for exception in exceptions:
-                        if (
-                            exception["start_time"] <= end_time
-                            and exception["end_time"] >= start_time
-                        ):
-                            conflicting = True
-                    start_time = (
-                        datetime.datetime.combine(date.today(), start_time)
-                        + timedelta(minutes=availability["slot_size_in_minutes"])
-                    ).time()
-                    if conflicting:
-                        continue
-                    slots += availability["tokens_per_slot"]
-    return slots
@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class EMRConfig(AppConfig):
     name = "care.emr"
     verbose_name = _("Electronic Medical Record")
+
+    def ready(self):
+        import care.emr.signals  # noqa F401
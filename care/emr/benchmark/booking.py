@@ -0,0 +1,103 @@
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from care.emr.api.viewsets.scheduling.availability import lock_create_appointment
+from care.emr.benchmark.runner import percentile
+from care.emr.models.scheduling.booking import TokenBooking, TokenSlot
+from care.emr.models.scheduling.schedule import (
+    Availability,
+    SchedulableUserResource,
+    Schedule,
+)
+
+
+class BookingBenchmark:
+    """
+    Concurrent appointment booking throughput.
+
+    `clients` threads, each with its own database connection, book `bookings` appointments
+    on the same slot, like receptionists booking against one doctor. Every booking runs in its own
+    transaction, so the data used has to be committed, the slot and availability are created
+    for the run and deleted afterwards.
+    """
+
+    def __init__(self, dataset, clients=8, bookings=25):
+        self.dataset = dataset
+        self.clients = clients
+        self.bookings = bookings
+
+    def setup(self):
+        resource = SchedulableUserResource.objects.get(
+            facility=self.dataset.facility, user=self.dataset.user
+        )
+        schedule = Schedule.objects.filter(resource=resource).first()
+        self.availability = Availability.objects.create(
+            schedule=schedule,
+            name=f"{self.dataset.name}-booking",
+            slot_type="appointment",
+            slot_size_in_minutes=10,
+            tokens_per_slot=self.clients * self.bookings,
+        )
+        start = timezone.now() + timedelta(days=1)
+        self.slot = TokenSlot.objects.create(
+            resource=resource,
+            availability=self.availability,
+            start_datetime=start,
+            end_datetime=start + timedelta(minutes=10),
+        )
+
+    def teardown(self):
+        TokenBooking.objects.filter(token_slot=self.slot).delete()
+        TokenSlot.objects.filter(id=self.slot.id).delete()
+        Availability.objects.filter(id=self.availability.id).delete()
+
+    def client(self, timings, failures):
+        try:
+            slot = TokenSlot.objects.get(id=self.slot.id)
+            for _ in range(self.bookings):
+                start = time.perf_counter()
+                try:
+                    lock_create_appointment(
+                        slot, self.dataset.patient, self.dataset.user, "benchmark"
+                    )
+                except Exception as e:
+                    failures.append(type(e).__name__)
+                    continue
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+
+    def run(self):
+        self.setup()
+        timings = []
+        failures = []
+        try:
+            threads = [
+                threading.Thread(target=self.client, args=(timings, failures))
+                for _ in range(self.clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            allocated = TokenSlot.objects.get(id=self.slot.id).allocated
+        finally:
+            self.teardown()
+        return {
+            "clients": self.clients,
+            "bookings": len(timings),
+            "failed": len(failures),
+            "allocated": allocated,
+            "elapsed_s": round(elapsed, 3),
+            "bookings_per_sec": round(len(timings) / elapsed, 1) if elapsed else None,
+            "p50_ms": round(percentile(timings, 50), 3) if timings else None,
+            "p99_ms": round(percentile(timings, 99), 3) if timings else None,
+            "mean_ms": round(statistics.fmean(timings), 3) if timings else None,
+        }
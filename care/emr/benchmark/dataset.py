@@ -0,0 +1,223 @@
+import random
+import uuid
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from care.emr.models import Encounter, Observation, Patient, Questionnaire
+from care.emr.models.scheduling.booking import TokenSlot
+from care.emr.models.scheduling.schedule import (
+    Availability,
+    SchedulableUserResource,
+    Schedule,
+)
+from care.facility.models import Facility
+from care.facility.models.facility import FACILITY_TYPES
+from care.security.models import RoleModel
+from care.security.roles.role import FACILITY_ADMIN_ROLE
+from care.users.models import User
+
+BENCHMARK_SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BENCHMARK_BATCH_SIZE = 5000
+BENCHMARK_CODE_SYSTEM = "http://loinc.org"
+BENCHMARK_CODES = ["8867-4", "8310-5", "9279-1", "2708-6", "8480-6", "8462-4"]
+
+
+class BenchmarkDataset:
+    """
+    Synthetic EMR data used by the benchmark suite.
+
+    `scale` is the number of observations generated, every other table is sized relative to it
+    - one patient (and encounter) for every 100 observations
+    - one token slot for every 10 observations
+    The first patient is the "hot" patient targeted by the patient scoped endpoints,
+    it holds 10% of all observations so that list and analyse endpoints run against a large partition.
+    Data is generated with a fixed seed, so two runs at the same scale produce the same shape.
+    """
+
+    def __init__(self, scale, seed=0):
+        self.scale = scale
+        self.seed = seed
+        self.random = random.Random(seed)  # noqa S311
+        self.name = f"benchmark-{scale}-{seed}"
+
+    @property
+    def patient_count(self):
+        return max(self.scale // 100, 10)
+
+    @property
+    def slot_count(self):
+        return max(self.scale // 10, 10)
+
+    def load(self):
+        """
+        Attach to a dataset generated by a previous run, returns False if there is none
+        """
+        self.facility = Facility.objects.filter(name=self.name).first()
+        if not self.facility:
+            return False
+        self.user = self.facility.created_by
+        self.encounter = (
+            Encounter.objects.filter(facility=self.facility).order_by("id").first()
+        )
+        self.patient = self.encounter.patient
+        self.observation = Observation.objects.filter(patient=self.patient).first()
+        self.questionnaire = Questionnaire.objects.get(slug=self.name)
+        return True
+
+    def build(self, stdout=None):
+        with transaction.atomic():
+            self.create_facility()
+            self.create_patients()
+            self.create_observations()
+            self.create_questionnaire()
+            self.create_schedule()
+        if stdout:
+            stdout.write(f"Generated dataset {self.name}")
+
+    def bulk_create(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=BENCHMARK_BATCH_SIZE)
+
+    def create_facility(self):
+        if not RoleModel.objects.filter(name=FACILITY_ADMIN_ROLE.name).exists():
+            raise ValueError("Roles are not synced, run sync_permissions_roles first")
+        self.user = User.objects.create_user(
+            username=self.name, password=uuid.uuid4().hex
+        )
+        self.facility = Facility.objects.create(
+            name=self.name,
+            facility_type=FACILITY_TYPES[0][0],
+            created_by=self.user,
+        )
+        self.root_organization_id = self.facility.default_internal_organization_id
+
+    def create_patients(self):
+        patients = [
+            Patient(
+                name=f"Benchmark Patient {i}",
+                gender=self.random.choice(["male", "female"]),
+                phone_number=f"+91{9000000000 + i}",
+                year_of_birth=self.random.randint(1940, 2020),
+                blood_group="unknown",
+                created_by=self.user,
+            )
+            for i in range(self.patient_count)
+        ]
+        self.patients = self.bulk_create(Patient, patients)
+        self.patient = self.patients[0]
+        encounters = [
+            Encounter(
+                status="in_progress",
+                encounter_class="amb",
+                priority="routine",
+                patient=patient,
+                facility=self.facility,
+                facility_organization_cache=[self.root_organization_id],
+                created_by=self.user,
+            )
+            for patient in self.patients
+        ]
+        self.encounters = self.bulk_create(Encounter, encounters)
+        self.encounter = self.encounters[0]
+
+    def observation_batches(self):
+        hot_count = self.scale // 10
+        now = timezone.now()
+        for start in range(0, self.scale, BENCHMARK_BATCH_SIZE):
+            batch = []
+            for i in range(start, min(start + BENCHMARK_BATCH_SIZE, self.scale)):
+                encounter = (
+                    self.encounter
+                    if i < hot_count
+                    else self.encounters[i % len(self.encounters)]
+                )
+                batch.append(
+                    Observation(
+                        status="final",
+                        main_code={
+                            "system": BENCHMARK_CODE_SYSTEM,
+                            "code": self.random.choice(BENCHMARK_CODES),
+                        },
+                        subject_type="patient",
+                        subject_id=encounter.patient.external_id,
+                        patient=encounter.patient,
+                        encounter=encounter,
+                        effective_datetime=now
+                        - timedelta(minutes=self.random.randint(0, 525600)),
+                        data_entered_by=self.user,
+                        value_type="decimal",
+                        value={"value": str(round(self.random.uniform(30, 200), 1))},
+                        note="",
+                        interpretation="",
+                        created_by=self.user,
+                        updated_by=self.user,
+                    )
+                )
+            yield batch
+
+    def create_observations(self):
+        for batch in self.observation_batches():
+            Observation.objects.bulk_create(batch)
+        self.observation = Observation.objects.filter(patient=self.patient).first()
+
+    def create_questionnaire(self):
+        self.questionnaire = Questionnaire.objects.create(
+            slug=self.name,
+            version="1.0",
+            title=self.name,
+            subject_type="encounter",
+            status="active",
+            questions=[
+                {
+                    "id": str(uuid.uuid4()),
+                    "link_id": str(i),
+                    "text": f"Vital {code}",
+                    "type": "decimal",
+                    "code": {"system": BENCHMARK_CODE_SYSTEM, "code": code},
+                }
+                for i, code in enumerate(BENCHMARK_CODES)
+            ],
+            created_by=self.user,
+        )
+
+    def create_schedule(self):
+        resource = SchedulableUserResource.objects.create(
+            facility=self.facility, user=self.user
+        )
+        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        schedule = Schedule.objects.create(
+            resource=resource,
+            name=self.name,
+            valid_from=today - timedelta(days=365),
+            valid_to=today + timedelta(days=365),
+        )
+        availability = Availability.objects.create(
+            schedule=schedule,
+            name=self.name,
+            slot_type="appointment",
+            slot_size_in_minutes=10,
+            tokens_per_slot=1,
+            availability=[
+                {"day_of_week": day, "start_time": "09:00:00", "end_time": "17:00:00"}
+                for day in range(7)
+            ],
+        )
+        # 48 slots a day, spread backwards from today
+        slots = []
+        for i in range(self.slot_count):
+            start = (
+                today
+                - timedelta(days=i // 48)
+                + timedelta(hours=9, minutes=10 * (i % 48))
+            )
+            slots.append(
+                TokenSlot(
+                    resource=resource,
+                    availability=availability,
+                    start_datetime=start,
+                    end_datetime=start + timedelta(minutes=10),
+                    allocated=self.random.randint(0, 1),
+                )
+            )
+        self.bulk_create(TokenSlot, slots)
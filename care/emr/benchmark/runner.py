@@ -0,0 +1,111 @@
+import gc
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def percentile(values, percent):
+    """
+    Nearest rank percentile of a list of values
+    """
+    ordered = sorted(values)
+    rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class BenchmarkRunner:
+    """
+    Runs benchmark scenarios through the full request stack (middleware, routing, authentication)
+    and reports per endpoint latency, query counts and allocations.
+
+    Latency is measured over `iterations` requests after `warmup` discarded requests,
+    allocations are measured on one extra request with tracemalloc enabled so that tracing
+    does not distort the latency numbers.
+    """
+
+    def __init__(self, user, iterations=50, warmup=5):
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        self.iterations = iterations
+        self.warmup = warmup
+
+    def request(self, scenario):
+        method = getattr(self.client, scenario["method"])
+        response = method(scenario["path"], scenario.get("data"), format="json")
+        if response.status_code >= 400:  # noqa PLR2004
+            message = f"{scenario['name']} returned {response.status_code}: {response.content[:500]}"
+            raise RuntimeError(message)
+        return response
+
+    def measure_allocations(self, scenario):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            self.request(scenario)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"allocated_bytes": current, "peak_allocated_bytes": peak}
+
+    def run_scenario(self, scenario):
+        for _ in range(self.warmup):
+            self.request(scenario)
+        timings = []
+        queries = []
+        for _ in range(self.iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                self.request(scenario)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(context.captured_queries))
+        return {
+            "iterations": self.iterations,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "min_ms": round(min(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "queries": max(queries),
+            **self.measure_allocations(scenario),
+        }
+
+    def run(self, scenarios, stdout=None):
+        results = {}
+        for scenario in scenarios:
+            results[scenario["name"]] = self.run_scenario(scenario)
+            if stdout:
+                result = results[scenario["name"]]
+                stdout.write(
+                    f"{scenario['name']}: p50 {result['p50_ms']}ms p99 {result['p99_ms']}ms "
+                    f"{result['queries']} queries {result['peak_allocated_bytes']} bytes"
+                )
+        return results
+
+
+def compare(baseline, current):
+    """
+    Relative change of p50, p99 and query counts between two benchmark reports, per scale and endpoint
+    """
+    changes = {}
+    for scale, results in current["results"].items():
+        baseline_results = baseline.get("results", {}).get(scale, {})
+        for name, result in results.items():
+            previous = baseline_results.get(name)
+            if not previous:
+                continue
+            changes[f"{scale}/{name}"] = {
+                key: round(result[key] / previous[key], 3) if previous[key] else None
+                for key in [
+                    "p50_ms",
+                    "p99_ms",
+                    "queries",
+                    "peak_allocated_bytes",
+                    "bookings_per_sec",
+                ]
+                if key in result and key in previous
+            }
+    return changes
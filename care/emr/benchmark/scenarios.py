@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from care.emr.benchmark.dataset import BENCHMARK_CODE_SYSTEM, BENCHMARK_CODES
+
+
+def get_scenarios(dataset):
+    """
+    Endpoints covered by the benchmark suite, each scenario is a single API request
+    """
+    patient = dataset.patient.external_id
+    encounter = dataset.encounter.external_id
+    today = timezone.now().date()
+    return [
+        {
+            "name": "observation_list",
+            "method": "get",
+            "path": f"/api/v1/patient/{patient}/observation/?limit=200",
+        },
+        {
+            "name": "observation_retrieve",
+            "method": "get",
+            "path": f"/api/v1/patient/{patient}/observation/{dataset.observation.external_id}/",
+        },
+        {
+            "name": "observation_analyse",
+            "method": "post",
+            "path": f"/api/v1/patient/{patient}/observation/analyse/",
+            "data": {
+                "codes": [
+                    {"system": BENCHMARK_CODE_SYSTEM, "code": code}
+                    for code in BENCHMARK_CODES
+                ],
+                "page_size": 30,
+            },
+        },
+        {
+            "name": "encounter_create",
+            "method": "post",
+            "path": "/api/v1/encounter/",
+            "data": {
+                "status": "in_progress",
+                "encounter_class": "amb",
+                "priority": "routine",
+                "patient": str(patient),
+                "facility": str(dataset.facility.external_id),
+            },
+        },
+        {
+            "name": "questionnaire_submit",
+            "method": "post",
+            "path": f"/api/v1/questionnaire/{dataset.questionnaire.slug}/submit/",
+            "data": {
+                "resource_id": str(encounter),
+                "encounter": str(encounter),
+                "patient": str(patient),
+                "results": [
+                    {"question_id": question["id"], "values": [{"value": "98.6"}]}
+                    for question in dataset.questionnaire.questions
+                ],
+            },
+        },
+        {
+            "name": "slot_availability_stats",
+            "method": "post",
+            "path": f"/api/v1/facility/{dataset.facility.external_id}/slots/availability_stats/",
+            "data": {
+                "from_date": str(today - timedelta(days=30)),
+                "to_date": str(today),
+                "user": str(dataset.user.external_id),
+            },
+        },
+    ]
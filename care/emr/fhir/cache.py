@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from care.emr.fhir.client import get_executor
+from care.emr.fhir.metrics import FHIRMetrics
+
+logger = logging.getLogger(__name__)
+
+FHIR_CACHE_KEY_PREFIX = "fhir_resource:"
+FHIR_CACHE_LOCK_TIMEOUT = 30
+FHIR_CACHE_WAIT_TIMEOUT = 5
+FHIR_CACHE_WAIT_INTERVAL = 0.05
+
+
+def fingerprint(payload):
+    """
+    Canonical hash of a query payload, keys are sorted so equivalent payloads share a cache entry
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def get_operation(resource):
+    """
+    Extract the FHIR operation from a resource path, eg: ValueSet/$expand -> expand
+    """
+    _, _, operation = resource.rpartition("$")
+    return operation if operation in settings.FHIR_CACHE_TTL else "default"
+
+
+def is_cacheable(value):
+    """
+    Only FHIR resources are cached. Failed requests are answered with an OperationOutcome,
+    or with a body that is not a FHIR resource when they fail before reaching the server.
+    """
+    return isinstance(value, dict) and value.get("resourceType") not in (
+        None,
+        "OperationOutcome",
+    )
+
+
+class FHIRResponseCache:
+    """
+    Cache for terminology server responses.
+
+    - Entries are stored with the time they stop being fresh, TTLs are configured per operation
+    - Expired entries are served for FHIR_CACHE_STALE_TTL while one worker refreshes them in the background
+    - Concurrent misses for the same key are coalesced, one caller fetches while the others wait for its result,
+      in process with an event and across processes with a short lived cache lock
+    """
+
+    def __init__(self, prefix=FHIR_CACHE_KEY_PREFIX):
+        self.prefix = prefix
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def get_key(self, payload):
+        return f"{self.prefix}{fingerprint(payload)}"
+
+    def set(self, key, operation, value):
+        if not is_cacheable(value):
+            return
+        ttl = settings.FHIR_CACHE_TTL[operation]
+        cache.set(
+            key,
+            {"value": value, "fresh_until": time.time() + ttl},
+            ttl + settings.FHIR_CACHE_STALE_TTL,
+        )
+
+    def get_or_fetch(self, payload, fetch):
+        key = self.get_key(payload)
+        operation = get_operation(payload["resource"])
+        entry = cache.get(key)
+        if entry is not None:
+            FHIRMetrics.record_cache(hit=True)
+            if entry["fresh_until"] < time.time():
+                self.refresh(key, operation, fetch)
+            return entry["value"]
+        FHIRMetrics.record_cache(hit=False)
+        return self.fetch_once(key, operation, fetch)
+
+    def refresh(self, key, operation, fetch):
+        """
+        Refresh a stale entry in the background, only one process refreshes a key at a time
+        """
+        if not cache.add(f"{key}:refresh", 1, FHIR_CACHE_LOCK_TIMEOUT):
+            return
+
+        def run():
+            try:
+                self.set(key, operation, fetch())
+            except Exception:
+                # The stale entry keeps being served until it expires or a refresh succeeds
+                logger.exception("Failed to refresh FHIR response cache entry %s", key)
+            finally:
+                cache.delete(f"{key}:refresh")
+
+        get_executor().submit(run)
+
+    def fetch_once(self, key, operation, fetch):
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = {"event": threading.Event()}
+                self._inflight[key] = inflight
+        if not leader:
+            inflight["event"].wait(FHIR_CACHE_WAIT_TIMEOUT)
+            if "value" in inflight:
+                return inflight["value"]
+            # The leader failed or timed out, fetch independently
+            return fetch()
+        try:
+            value = self.fetch_across_processes(key, operation, fetch)
+            inflight["value"] = value
+            return value
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            inflight["event"].set()
+
+    def fetch_across_processes(self, key, operation, fetch):
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, FHIR_CACHE_LOCK_TIMEOUT):
+            # Another process is fetching the same key, wait for it to populate the cache.
+            # Errors are not cached, the lock is released without an entry then
+            deadline = time.monotonic() + FHIR_CACHE_WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(FHIR_CACHE_WAIT_INTERVAL)
+                entries = cache.get_many([key, lock_key])
+                if key in entries:
+                    return entries[key]["value"]
+                if lock_key not in entries:
+                    break
+            return fetch()
+        try:
+            value = fetch()
+            self.set(key, operation, value)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+
+fhir_response_cache = FHIRResponseCache()
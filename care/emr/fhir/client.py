@@ -1,16 +1,109 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from care.emr.fhir.metrics import FHIRMetrics
+from care.utils.request_cache import RequestCache
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def get_executor():
+    global _executor  # noqa PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SNOWSTORM_MAX_CONCURRENCY,
+                thread_name_prefix="fhir",
+            )
+    return _executor
+
+
+def fan_out(calls):
+    """
+    Run the given callables concurrently and return their results in order.
+    Exceptions raised by any call are re-raised.
+    The request cache of the calling thread is shared with the workers so metrics and memos stay per request.
+    Nested fan outs run serially inside the worker, waiting on the shared pool from a worker could deadlock it.
+    """
+    if len(calls) <= 1 or getattr(_worker, "active", False):
+        return [call() for call in calls]
+    store = RequestCache.get_store()
+
+    def run(call):
+        _worker.active = True
+        RequestCache.set_store(store)
+        try:
+            return call()
+        finally:
+            RequestCache.set_store(None)
+            _worker.active = False
+
+    futures = [get_executor().submit(run, call) for call in calls]
+    return [future.result() for future in futures]
 
 
 class FHIRClient:
     """
     This client will be used for all queries performed over the FHIR protocol
     This class is designed to perform FHIR based queries to some remote server and convert them into python objects
+
+    Queries go through a pooled keep-alive session with retries on transient failures,
+    use `query_many` to run independent queries concurrently.
     """
 
-    def __init__(self, server_url):
+    def __init__(
+        self,
+        server_url,
+        pool_size=None,
+        max_retries=None,
+        connect_timeout=None,
+        read_timeout=None,
+    ):
         self.server_url = server_url
+        self.pool_size = pool_size or settings.SNOWSTORM_POOL_SIZE
+        self.max_retries = (
+            settings.SNOWSTORM_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.timeout = (
+            connect_timeout or settings.SNOWSTORM_CONNECT_TIMEOUT,
+            read_timeout or settings.SNOWSTORM_READ_TIMEOUT,
+        )
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                retries = Retry(
+                    total=self.max_retries,
+                    backoff_factor=0.2,
+                    status_forcelist=[502, 503, 504],
+                    # Terminology operations are read only even when sent as POST
+                    allowed_methods=frozenset(["GET", "POST"]),
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size,
+                    pool_maxsize=self.pool_size,
+                    max_retries=retries,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+        return self._session
 
-    def query(self, *, method, resource, operation=None, parameters, detail=None):
+    def query(
+        self, *, method, resource, operation=None, parameters, detail=None, timeout=None
+    ):
         url = f"{self.server_url}/{resource}"
         if detail:
             url += f"/{detail}"
@@ -21,5 +114,23 @@ class FHIRClient:
             request_kwargs["params"] = parameters
         else:
             request_kwargs["json"] = parameters
-        response = requests.request(method, url, **request_kwargs, timeout=60)
-        return response.json()
+        start = time.monotonic()
+        error = True
+        try:
+            response = self.session.request(
+                method, url, **request_kwargs, timeout=timeout or self.timeout
+            )
+            result = response.json()
+            error = not response.ok
+            return result
+        finally:
+            FHIRMetrics.record_call(
+                operation or resource, time.monotonic() - start, error=error
+            )
+
+    def query_many(self, queries):
+        """
+        Run several queries concurrently, each query is a dict of `query` keyword arguments.
+        Returns the responses in the same order as the queries.
+        """
+        return fan_out([lambda query=query: self.query(**query) for query in queries])
@@ -0,0 +1,93 @@
+import logging
+import threading
+
+from care.utils.request_cache import RequestCache
+
+FHIR_METRICS_REQUEST_CACHE_NAMESPACE = "fhir_metrics"
+
+logger = logging.getLogger(__name__)
+
+
+class FHIRMetrics:
+    """
+    Counters for the cost of terminology server queries.
+    Counters are kept for the whole process and for the current request.
+    """
+
+    _lock = threading.Lock()
+    _totals = {}
+
+    @staticmethod
+    def _empty():
+        return {
+            "calls": 0,
+            "errors": 0,
+            "duration": 0.0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+            "operations": {},
+        }
+
+    @classmethod
+    def _request_metrics(cls):
+        namespace = RequestCache.get_namespace(FHIR_METRICS_REQUEST_CACHE_NAMESPACE)
+        if namespace is None:
+            return None
+        return namespace.setdefault("metrics", cls._empty())
+
+    @classmethod
+    def _update(cls, updater):
+        with cls._lock:
+            if not cls._totals:
+                cls._totals = cls._empty()
+            updater(cls._totals)
+            request_metrics = cls._request_metrics()
+            if request_metrics is not None:
+                updater(request_metrics)
+
+    @classmethod
+    def record_call(cls, operation, duration, error=False):
+        def updater(metrics):
+            metrics["calls"] += 1
+            metrics["errors"] += int(error)
+            metrics["duration"] += duration
+            operation_metrics = metrics["operations"].setdefault(
+                operation, {"calls": 0, "duration": 0.0}
+            )
+            operation_metrics["calls"] += 1
+            operation_metrics["duration"] += duration
+
+        cls._update(updater)
+
+    @classmethod
+    def record_cache(cls, hit):
+        def updater(metrics):
+            metrics["cache_hits" if hit else "cache_misses"] += 1
+
+        cls._update(updater)
+
+    @classmethod
+    def get_request_metrics(cls):
+        return cls._request_metrics()
+
+    @classmethod
+    def get_process_metrics(cls):
+        with cls._lock:
+            return cls._totals or cls._empty()
+
+
+def log_request_metrics(store):
+    metrics = store.get(FHIR_METRICS_REQUEST_CACHE_NAMESPACE, {}).get("metrics")
+    if not metrics:
+        return
+    logger.info(
+        "Terminology server: %s calls, %s errors, %.4f seconds, cache %s hits / %s misses",
+        metrics["calls"],
+        metrics["errors"],
+        metrics["duration"],
+        metrics["cache_hits"],
+        metrics["cache_misses"],
+    )
+
+
+RequestCache.register_teardown(log_request_metrics)
@@ -1,12 +1,9 @@
 # ruff : noqa : SLF001
 from copy import deepcopy
 
-import json_fingerprint
-import simplejson as json
 from django.conf import settings
-from django.core.cache import cache
-from json_fingerprint import hash_functions
 
+from care.emr.fhir.cache import fhir_response_cache
 from care.emr.fhir.client import FHIRClient
 
 default_fhir_client = FHIRClient(server_url=settings.SNOWSTORM_DEPLOYMENT_URL)
@@ -16,7 +13,7 @@ class ResourceManger:
     _fhir_client = default_fhir_client
     resource = ""
     allowed_properties = []
-    cache_prefix_key = "fhir_resource:"
+    response_cache = fhir_response_cache
 
     def __init__(self, fhir_client=None):
         self._filters = {}
@@ -27,15 +24,9 @@ class ResourceManger:
 
     def query(self, method, resource, parameters):
         payload = {"method": method, "resource": resource, "parameters": parameters}
-        fingerprint = json_fingerprint.create(
-            input=json.dumps(payload), hash_function=hash_functions.SHA256, version=1
+        return self.response_cache.get_or_fetch(
+            payload, lambda: self._fhir_client.query(**payload)
         )
-        cache_key = f"self.cache_prefix_key{fingerprint}"
-        if cached_data := cache.get(cache_key):
-            return cached_data
-        results = self._fhir_client.query(**payload)
-        cache.set(cache_key, results, 10)
-        return results
 
     def validate_filter(self):
         pass
@@ -11,10 +11,11 @@ class ValueSetFilterValidation(BaseModel):
     exclude: list[ValueSetInclude] = None
     search: str = None
     count: int = None
+    offset: int = None
 
 
 class ValueSetResource(ResourceManger):
-    allowed_properties = ["include", "exclude", "search", "count"]
+    allowed_properties = ["include", "exclude", "search", "count", "offset"]
 
     def serialize(self, result):
         return MinimalCodeConcept(
@@ -56,6 +57,10 @@ class ValueSetResource(ResourceManger):
                 parameters.append({"name": "filter", "valueString": self._filters[key]})
             if key == "count":
                 parameters.append({"name": "count", "valueInteger": self._filters[key]})
+            if key == "offset" and self._filters[key]:
+                parameters.append(
+                    {"name": "offset", "valueInteger": self._filters[key]}
+                )
         parameters.append(
             {
                 "name": "valueSet",
@@ -0,0 +1,138 @@
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from care.emr.benchmark.booking import BookingBenchmark
+from care.emr.benchmark.dataset import BENCHMARK_SCALES, BenchmarkDataset
+from care.emr.benchmark.runner import BenchmarkRunner, compare
+from care.emr.benchmark.scenarios import get_scenarios
+
+
+class Rollback(Exception):  # noqa N818
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the EMR API against synthetic data.
+
+    Generated data is rolled back at the end of each scale unless --keep is passed,
+    kept datasets are reused by later runs with the same scale and seed.
+    """
+
+    help = "Benchmark EMR API endpoints and report latency, query counts and allocations as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            action="append",
+            choices=BENCHMARK_SCALES.keys(),
+            help="Dataset scale, can be repeated. Defaults to 10k",
+        )
+        parser.add_argument("--iterations", default=50, type=int)
+        parser.add_argument("--warmup", default=5, type=int)
+        parser.add_argument("--seed", default=0, type=int)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            help="Only run the named scenario, can be repeated",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument(
+            "--compare", help="Print the relative change against a previous report"
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep generated data so that later runs can reuse it",
+        )
+        parser.add_argument(
+            "--booking-clients",
+            default=0,
+            type=int,
+            help="Measure booking throughput with this many concurrent clients, requires --keep "
+            "as every client uses its own connection and only sees committed data",
+        )
+        parser.add_argument("--booking-iterations", default=25, type=int)
+
+    def handle(self, *args, **options):
+        report = {"meta": self.get_meta(options), "results": {}}
+        for scale in options["scale"] or ["10k"]:
+            report["results"][scale] = self.run_scale(scale, options)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with Path(options["output"]).open("w") as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with Path(options["compare"]).open() as f:
+                baseline = json.load(f)
+            self.stdout.write(json.dumps(compare(baseline, report), indent=2))
+
+    def run_scale(self, scale, options):
+        dataset = BenchmarkDataset(BENCHMARK_SCALES[scale], seed=options["seed"])
+        results = {}
+        try:
+            with transaction.atomic():
+                if not dataset.load():
+                    self.stderr.write(f"Generating dataset for {scale}")
+                    try:
+                        dataset.build(stdout=self.stderr)
+                    except ValueError as e:
+                        raise CommandError(str(e)) from e
+                scenarios = get_scenarios(dataset)
+                if options["scenario"]:
+                    scenarios = [
+                        scenario
+                        for scenario in scenarios
+                        if scenario["name"] in options["scenario"]
+                    ]
+                runner = BenchmarkRunner(
+                    dataset.user,
+                    iterations=options["iterations"],
+                    warmup=options["warmup"],
+                )
+                results = runner.run(scenarios, stdout=self.stderr)
+                if not options["keep"]:
+                    raise Rollback
+        except Rollback:
+            pass
+        if options["booking_clients"]:
+            if options["keep"]:
+                results["appointment_booking"] = BookingBenchmark(
+                    dataset,
+                    clients=options["booking_clients"],
+                    bookings=options["booking_iterations"],
+                ).run()
+            else:
+                self.stderr.write("Skipping the booking benchmark, it requires --keep")
+        return results
+
+    def get_meta(self, options):
+        try:
+            commit = subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],  # noqa: S607
+                text=True,
+                stderr=subprocess.DEVNULL,
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": options["iterations"],
+            "warmup": options["warmup"],
+            "seed": options["seed"],
+            "booking_clients": options["booking_clients"],
+        }
@@ -1,5 +1,6 @@
 import json
 import logging
+import time
 from collections import defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
@@ -102,6 +103,44 @@ def get_local_body_name(local_body):
     return local_body["name"].replace("  ", " ").replace("\n", "")  # noqa: RUF001
 
 
+def get_local_body_metadata(local_body):
+    body_type = local_body.get("localbody_code", " ")[0]
+    return {
+        "country": "india",
+        "govt_org_type": local_body_choice_map.get(body_type, "other_local_body"),
+        "lsg_code": local_body.get("lsg_code", local_body.get("localbody_code")),
+    }
+
+
+def get_ward_metadata(ward):
+    return {
+        "country": "india",
+        "govt_org_type": "ward",
+        "ward_number": get_ward_number(ward),
+    }
+
+
+def get_natural_key(parent_key, name, metadata):
+    """
+    Identifies an organization by its ancestry and name, wards also include the ward number
+    as names are not unique within a local body
+    """
+    key = (*parent_key, name.strip().lower())
+    if metadata.get("govt_org_type") == "ward":
+        key = (*key, str(metadata.get("ward_number")))
+    return key
+
+
+BULK_BATCH_SIZE = 2000
+BULK_UPDATE_FIELDS = [
+    "parent_cache",
+    "level_cache",
+    "root_org",
+    "has_children",
+    "cached_parent_json",
+]
+
+
 class Command(BaseCommand):
     """ """
 
@@ -135,6 +174,13 @@ class Command(BaseCommand):
             action="store_true",
             help="Load ward data",
         )
+        parser.add_argument(
+            "--bulk",
+            default=False,
+            action="store_true",
+            help="Build the whole hierarchy in memory and write it level by level with bulk queries, "
+            "organizations that already exist are matched by name under the same parent and updated",
+        )
 
     def load_state_and_district_data(self):
         with self.json_file_path.open() as json_file:
@@ -205,7 +251,7 @@ class Command(BaseCommand):
                     },
                 )
                 districts_cache[state_name][d] = district
-                district.get_parent_json()
+                district.refresh_parent_json()
                 if not created:
                     logger.debug(
                         "District already exists: %s (%s)", district.name, district.id
@@ -232,7 +278,6 @@ class Command(BaseCommand):
                 )
                 if not dist_obj:
                     continue
-                body_type = local_body.get("localbody_code", " ")[0]
                 local_body_objs.append(
                     Organization(
                         root_org=dist_obj.parent,
@@ -241,15 +286,7 @@ class Command(BaseCommand):
                         org_type="govt",
                         level_cache=2,
                         system_generated=True,
-                        metadata={
-                            "country": "india",
-                            "govt_org_type": local_body_choice_map.get(
-                                body_type, "other_local_body"
-                            ),
-                            "lsg_code": local_body.get(
-                                "lsg_code", local_body.get("localbody_code")
-                            ),
-                        },
+                        metadata=get_local_body_metadata(local_body),
                         meta={
                             "migration_id": self.migration_id,
                         },
@@ -298,11 +335,7 @@ class Command(BaseCommand):
                                     org_type="govt",
                                     system_generated=True,
                                     level_cache=3,
-                                    metadata={
-                                        "country": "india",
-                                        "govt_org_type": "ward",
-                                        "ward_number": get_ward_number(ward),
-                                    },
+                                    metadata=get_ward_metadata(ward),
                                     meta={
                                         "migration_id": self.migration_id,
                                     },
@@ -311,6 +344,213 @@ class Command(BaseCommand):
                         count = Organization.objects.bulk_create(ward_objs)
                         logger.debug("Created %s wards", len(count))
 
+    def read_bulk_data(self, state_dirs: list[Path]):
+        """
+        Reads the selected levels of the hierarchy as (natural key, parent key, name, metadata) rows per level
+        """
+        levels = {"state": {}, "district": {}, "local_body": {}, "ward": {}}
+
+        def add(level, parent_key, name, metadata):
+            key = get_natural_key(parent_key, name, metadata)
+            levels[level].setdefault(key, (key, parent_key, name, metadata))
+            return key
+
+        with self.json_file_path.open() as json_file:
+            data = json.load(json_file)
+        if self.state != "all":
+            data = [d for d in data if d["slug"] == self.state]
+        state_keys = {}
+        for item in data:
+            state_name = item["state"].strip()
+            state_keys[state_name] = add(
+                "state",
+                (),
+                state_name,
+                {"country": "india", "govt_org_type": "state"},
+            )
+            if not self.load_districts:
+                continue
+            for district_name in item["districts"].split(","):
+                add(
+                    "district",
+                    state_keys[state_name],
+                    district_name.strip(),
+                    {"country": "india", "govt_org_type": "district"},
+                )
+
+        if not (self.load_districts and (self.load_local_bodies or self.load_wards)):
+            return levels
+        for state_dir in state_dirs:
+            for f in sorted((state_dir / "lsg").glob("*.json")):
+                with f.open() as data_f:
+                    local_body = json.load(data_f)
+                if (
+                    not local_body.get("district")
+                    or local_body["state"] not in state_keys
+                ):
+                    continue
+                district_key = get_natural_key(
+                    state_keys[local_body["state"]], local_body["district"], {}
+                )
+                if district_key not in levels["district"]:
+                    logger.error(
+                        "District not found: %s, '%s'",
+                        local_body["state"],
+                        local_body["district"],
+                    )
+                    continue
+                local_body_key = add(
+                    "local_body",
+                    district_key,
+                    get_local_body_name(local_body),
+                    get_local_body_metadata(local_body),
+                )
+                if not self.load_wards:
+                    continue
+                for ward in local_body.get("wards") or []:
+                    add(
+                        "ward",
+                        local_body_key,
+                        get_ward_name(ward),
+                        get_ward_metadata(ward),
+                    )
+        return levels
+
+    def fetch_existing(self, organizations, rows):
+        """
+        Existing organizations for the rows keyed by natural key, organizations maps the natural key
+        of every parent that has already been loaded to the organization, rows without a parent are states
+        """
+        if not rows:
+            return {}
+        parents = {
+            organizations[parent_key].id: parent_key
+            for _, parent_key, _, _ in rows
+            if parent_key in organizations
+        }
+        if parents:
+            queryset = Organization.objects.filter(parent_id__in=parents)
+        else:
+            queryset = Organization.objects.filter(
+                parent__isnull=True, metadata__govt_org_type="state"
+            )
+        existing = {}
+        for organization in queryset:
+            parent_key = parents.get(organization.parent_id, ())
+            key = get_natural_key(parent_key, organization.name, organization.metadata)
+            existing.setdefault(key, organization)
+        return existing
+
+    def bulk_load_level(  # noqa PLR0913
+        self, level, rows, organizations, ancestors, has_children, create=True
+    ):
+        """
+        Creates the organizations of a level that do not exist yet and fixes the caches of the ones that do,
+        parent_cache, level_cache, root_org, has_children and cached_parent_json are computed in memory
+        from the parents loaded before
+        """
+        start = time.perf_counter()
+        rows = [row for row in rows if not row[1] or row[1] in organizations]
+        existing = self.fetch_existing(organizations, rows)
+        if not create:
+            rows = [row for row in rows if row[0] in existing]
+        creates = []
+        updates = []
+        for key, parent_key, name, metadata in rows:
+            parent = organizations.get(parent_key)
+            parent_cache = [*parent.parent_cache, parent.id] if parent else []
+            values = {
+                "parent_cache": parent_cache,
+                "level_cache": parent.level_cache + 1 if parent else 0,
+                "root_org_id": (parent.root_org_id or parent.id) if parent else None,
+                "cached_parent_json": Organization.build_parent_json(
+                    parent_cache, ancestors
+                ),
+            }
+            organization = existing.get(key)
+            if organization is None:
+                organization = Organization(
+                    parent=parent,
+                    name=name,
+                    org_type="govt",
+                    description="",
+                    active=True,
+                    system_generated=True,
+                    has_children=key in has_children,
+                    metadata=metadata,
+                    meta={"migration_id": self.migration_id},
+                    **values,
+                )
+                creates.append(organization)
+            else:
+                values["has_children"] = (
+                    organization.has_children or key in has_children
+                )
+                if any(getattr(organization, k) != v for k, v in values.items()):
+                    for k, v in values.items():
+                        setattr(organization, k, v)
+                    updates.append(organization)
+            organizations[key] = organization
+        Organization.objects.bulk_create(creates, batch_size=BULK_BATCH_SIZE)
+        Organization.objects.bulk_update(
+            updates, BULK_UPDATE_FIELDS, batch_size=BULK_BATCH_SIZE
+        )
+        for key, *_ in rows:
+            organization = organizations[key]
+            ancestors[organization.id] = {
+                "external_id": organization.external_id,
+                "name": organization.name,
+                "description": organization.description,
+                "org_type": organization.org_type,
+                "metadata": organization.metadata,
+                "level_cache": organization.level_cache,
+            }
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Loaded %s %s organizations (%s created, %s updated) in %.2fs, %.0f rows/s",
+            len(rows),
+            level,
+            len(creates),
+            len(updates),
+            elapsed,
+            len(rows) / elapsed if elapsed else 0,
+        )
+        return len(creates), len(updates)
+
+    def load_bulk(self, state_dirs: list[Path]):
+        start = time.perf_counter()
+        levels = self.read_bulk_data(state_dirs)
+        has_children = {
+            parent_key
+            for rows in levels.values()
+            for _, parent_key, _, _ in rows.values()
+        }
+        organizations = {}
+        ancestors = {}
+        created = updated = 0
+        for level, rows in levels.items():
+            if not rows:
+                continue
+            level_created, level_updated = self.bulk_load_level(
+                level,
+                list(rows.values()),
+                organizations,
+                ancestors,
+                has_children,
+                # Wards can be loaded into local bodies that were loaded earlier
+                create=level != "local_body" or self.load_local_bodies,
+            )
+            created += level_created
+            updated += level_updated
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Bulk load done, %s created, %s updated in %.2fs, %.0f rows/s",
+            created,
+            updated,
+            elapsed,
+            (created + updated) / elapsed if elapsed else 0,
+        )
+
     def handle(self, *args, **options):
         if options["verbosity"] == 0:
             logger.setLevel(logging.ERROR)
@@ -326,21 +566,27 @@ class Command(BaseCommand):
         self.load_districts = options["load_districts"]
         self.load_local_bodies = options["load_local_bodies"]
         self.load_wards = options["load_wards"]
+        self.bulk = options["bulk"]
 
         logger.info("Loading Govt Organization Data")
         logger.info("Migration ID: %s", self.migration_id)
 
+        root_dir: Path = settings.BASE_DIR / "data/india"
+        if self.state != "all":
+            state_dirs = [root_dir / self.state]
+        else:
+            state_dirs = [d for d in root_dir.iterdir() if d.is_dir()]
+
+        if self.bulk:
+            with transaction.atomic():
+                self.load_bulk(state_dirs)
+            logger.info("Data Loaded")
+            return
+
         logger.info("Loading State and District Data")
         with transaction.atomic():
             self.load_state_and_district_data()
 
-            root_dir: Path = settings.BASE_DIR / "data/india"
-
-            if self.state != "all":
-                state_dirs = [root_dir / self.state]
-            else:
-                state_dirs = [d for d in root_dir.iterdir() if d.is_dir()]
-
             if self.load_districts:
                 if self.load_local_bodies:
                     logger.info("Loading Local Body Data")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from care.emr.models.organization import FacilityOrganization, Organization
+
+
+class Command(BaseCommand):
+    help = "Move an organization and everything below it under a new parent"
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization", help="External id of the organization")
+        parser.add_argument(
+            "--parent",
+            default=None,
+            help="External id of the new parent, the organization becomes a root if omitted",
+        )
+        parser.add_argument(
+            "--facility",
+            action="store_true",
+            help="Move a facility organization instead of an organization",
+        )
+
+    def handle(self, *args, **options):
+        model = FacilityOrganization if options["facility"] else Organization
+        try:
+            organization = model.objects.get(external_id=options["organization"])
+            parent = (
+                model.objects.get(external_id=options["parent"])
+                if options["parent"]
+                else None
+            )
+            organization.move(parent)
+        except model.DoesNotExist as e:
+            raise CommandError(str(e)) from e
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        self.stdout.write(
+            f"Moved {organization.name}, dependent caches are rebuilt in the background"
+        )
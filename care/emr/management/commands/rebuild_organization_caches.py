@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from care.emr.models.organization import FacilityOrganization, Organization
+from care.emr.utils.organization_hierarchy import rebuild_all_dependent_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the cached parent JSON of every organization and facility organization, and the "
+        "organization arrays of patients, facilities, encounters and questionnaires. "
+        "Replaces caches written before they were kept up to date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-dependent",
+            action="store_true",
+            help="Only rebuild the parent JSON of organizations",
+        )
+
+    def handle(self, *args, **options):
+        for model in [Organization, FacilityOrganization]:
+            roots = model.objects.filter(parent__isnull=True).values_list(
+                "id", flat=True
+            )
+            for root_id in list(roots):
+                model.refresh_descendants_parent_json(root_id)
+            self.stdout.write(f"Rebuilt the parent JSON of {model.__name__} objects")
+        if options["skip_dependent"]:
+            return
+        for cache, count in rebuild_all_dependent_caches().items():
+            self.stdout.write(f"Rebuilt {cache} of {count} rows")
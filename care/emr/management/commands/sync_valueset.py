@@ -3,6 +3,7 @@
 from django.core.management.base import BaseCommand
 
 from care.emr.models import ValueSet
+from care.emr.models.valueset import LOCAL_CONCEPT_SYNC_MAX_CONCEPTS
 from care.emr.registries.care_valueset.care_valueset import SystemValueSet
 
 
@@ -18,6 +19,17 @@ class Command(BaseCommand):
             type=bool,
             help="Overwrite the valueset if already present",
         )
+        parser.add_argument(
+            "--materialize",
+            action="store_true",
+            help="Expand valuesets on the terminology server and store their concepts locally",
+        )
+        parser.add_argument(
+            "--max-concepts",
+            default=LOCAL_CONCEPT_SYNC_MAX_CONCEPTS,
+            type=int,
+            help="Skip materializing valuesets that expand to more concepts than this",
+        )
 
     def handle(self, *args, **options):
         valuesets = SystemValueSet.get_all_valuesets()
@@ -33,3 +45,16 @@ class Command(BaseCommand):
             obj.compose = valueset.composition.model_dump(exclude_defaults=True)
             obj.is_system_defined = True
             obj.save()
+        if options["materialize"]:
+            self.materialize(options["max_concepts"])
+
+    def materialize(self, max_concepts):
+        for obj in ValueSet.objects.all():
+            if obj.has_local_concepts:
+                continue
+            try:
+                count = obj.sync_local_concepts(max_concepts=max_concepts)
+            except Exception as e:
+                self.stderr.write(f"Skipped materializing {obj.slug}: {e}")
+                continue
+            self.stdout.write(f"Materialized {count} concepts for {obj.slug}")
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2025-01-08 10:12
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emr', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='valueset',
+            name='local_compose_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ValueSetConcept',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('system', models.CharField(max_length=255)),
+                ('code', models.CharField(max_length=255)),
+                ('display', models.TextField(default='')),
+                ('valueset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='emr.valueset')),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['display'], name='valueset_concept_display_trgm', opclasses=['gin_trgm_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('valueset', 'system', 'code'), name='unique_valueset_concept')],
+            },
+        ),
+    ]
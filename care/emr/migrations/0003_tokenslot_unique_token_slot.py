@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2025-01-10 09:30
+
+from django.db import migrations, models
+
+# Slots created concurrently for the same period are merged into the oldest one before
+# the constraint is added, bookings are moved over and allocations are summed up
+DUPLICATE_TOKEN_SLOTS = """
+SELECT id, first_value(id) OVER (
+    PARTITION BY resource_id, availability_id, start_datetime, end_datetime ORDER BY id
+) AS keep_id
+FROM emr_tokenslot
+WHERE availability_id IS NOT NULL
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("emr", "0002_valueset_local_compose_hash_valuesetconcept"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                f"""
+                UPDATE emr_tokenbooking b SET token_slot_id = d.keep_id
+                FROM ({DUPLICATE_TOKEN_SLOTS}) d
+                WHERE b.token_slot_id = d.id AND d.id <> d.keep_id
+                """,
+                f"""
+                UPDATE emr_tokenslot s SET allocated = g.allocated
+                FROM (
+                    SELECT d.keep_id, SUM(t.allocated) AS allocated
+                    FROM ({DUPLICATE_TOKEN_SLOTS}) d
+                    JOIN emr_tokenslot t ON t.id = d.id
+                    GROUP BY d.keep_id
+                    HAVING COUNT(*) > 1
+                ) g
+                WHERE s.id = g.keep_id
+                """,
+                f"""
+                DELETE FROM emr_tokenslot WHERE id IN (
+                    SELECT id FROM ({DUPLICATE_TOKEN_SLOTS}) d WHERE d.id <> d.keep_id
+                )
+                """,
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="tokenslot",
+            constraint=models.UniqueConstraint(
+                fields=("resource", "availability", "start_datetime", "end_datetime"),
+                name="unique_token_slot",
+            ),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.3 on 2025-01-14 11:20
+
+import django.db.models.fields.json
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("emr", "0003_tokenslot_unique_token_slot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="observation",
+            name="code_system",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.fields.json.KT("main_code__system"),
+                output_field=models.CharField(max_length=255, null=True),
+            ),
+        ),
+        migrations.AddField(
+            model_name="observation",
+            name="code",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.fields.json.KT("main_code__code"),
+                output_field=models.CharField(max_length=255, null=True),
+            ),
+        ),
+        migrations.AddField(
+            model_name="observation",
+            name="value_numeric",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        value__value_quantity__value__regex="^\\s*[-+]?[0-9]+(\\.[0-9]+)?\\s*$",
+                        then=django.db.models.functions.comparison.Cast(
+                            django.db.models.fields.json.KT(
+                                "value__value_quantity__value"
+                            ),
+                            models.FloatField(),
+                        ),
+                    ),
+                    models.When(
+                        value__value__regex="^\\s*[-+]?[0-9]+(\\.[0-9]+)?\\s*$",
+                        then=django.db.models.functions.comparison.Cast(
+                            django.db.models.fields.json.KT("value__value"),
+                            models.FloatField(),
+                        ),
+                    ),
+                    default=None,
+                    output_field=models.FloatField(),
+                ),
+                output_field=models.FloatField(null=True),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="observation",
+            index=models.Index(
+                fields=["patient", "encounter", "code", "effective_datetime"],
+                name="observation_series_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.1.3 on 2025-01-16 10:05
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+# Snapshot of care.emr.utils.patient_search.PHONETIC_RULES at the time of this migration
+PHONETIC_RULES = [
+    ("[^a-z ]", ""),
+    ("ee|ea|ie", "i"),
+    ("oo|ou", "u"),
+    ("w", "v"),
+    ("z", "j"),
+    ("x", "ks"),
+    ("ck|q", "k"),
+    ("ph", "f"),
+    ("([bcdgkpst])h", "\\1"),
+    ("y( |$)", "i\\1"),
+    ("([a-z])\\1+", "\\1"),
+    ("a( |$)", "\\1"),
+    (" +", " "),
+    ("^ | $", ""),
+]
+
+
+def regexp_replace(expression, pattern, replacement):
+    return models.Func(
+        expression,
+        models.Value(pattern),
+        models.Value(replacement),
+        models.Value("g"),
+        function="REGEXP_REPLACE",
+        output_field=models.CharField(),
+    )
+
+
+def phonetic_key_expression():
+    expression = django.db.models.functions.text.Lower("name")
+    for pattern, replacement in PHONETIC_RULES:
+        expression = regexp_replace(expression, pattern, replacement)
+    return expression
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("emr", "0004_observation_code_system_observation_code_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patient",
+            name="phone_number_normalized",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.text.Right(
+                    regexp_replace("phone_number", "[^0-9]", ""), 10
+                ),
+                output_field=models.CharField(max_length=10),
+            ),
+        ),
+        migrations.AddField(
+            model_name="patient",
+            name="name_phonetic",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=phonetic_key_expression(),
+                output_field=models.CharField(max_length=255),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="gin_trgm_ops",
+                ),
+                name="patient_name_upper_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name_phonetic"],
+                name="patient_name_phonetic_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["phone_number_normalized"],
+                name="patient_phone_number_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patient",
+            index=models.Index(
+                fields=["phone_number_normalized"], name="patient_phone_number_idx"
+            ),
+        ),
+    ]
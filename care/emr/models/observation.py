@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
 
 from care.emr.models import EMRBaseModel
 
+NUMERIC_VALUE_REGEX = r"^\s*[-+]?[0-9]+(\.[0-9]+)?\s*$"
+
 
 class Observation(EMRBaseModel):
     status = models.CharField(max_length=255)
@@ -29,5 +33,38 @@ class Observation(EMRBaseModel):
     questionnaire_response = models.ForeignKey(
         "emr.QuestionnaireResponse", on_delete=models.CASCADE, null=True
     )
+    # Columns computed by the database from main_code and value for time series queries
+    code_system = models.GeneratedField(
+        expression=KT("main_code__system"),
+        output_field=models.CharField(max_length=255, null=True),
+        db_persist=True,
+    )
+    code = models.GeneratedField(
+        expression=KT("main_code__code"),
+        output_field=models.CharField(max_length=255, null=True),
+        db_persist=True,
+    )
+    value_numeric = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                value__value_quantity__value__regex=NUMERIC_VALUE_REGEX,
+                then=Cast(KT("value__value_quantity__value"), models.FloatField()),
+            ),
+            models.When(
+                value__value__regex=NUMERIC_VALUE_REGEX,
+                then=Cast(KT("value__value"), models.FloatField()),
+            ),
+            default=None,
+            output_field=models.FloatField(),
+        ),
+        output_field=models.FloatField(null=True),
+        db_persist=True,
+    )
 
-    # TODO Add index for patient -> encounter -> system -> code
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["patient", "encounter", "code", "effective_datetime"],
+                name="observation_series_idx",
+            ),
+        ]
@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta
-
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
-from django.utils import timezone
+from django.db import connection, models, transaction
+from django.db.models import Q
 
 from care.emr.models import EMRBaseModel
+from care.utils.request_cache import RequestCache
+
+ORGANIZATION_ANCESTORS_REQUEST_CACHE_NAMESPACE = "organization_ancestors"
+
+# Fields that appear in the parent JSON of the organizations below an organization
+PARENT_JSON_FIELDS = ("parent_id", "name", "description", "org_type", "metadata")
 
 
 class OrganizationCommonBase(EMRBaseModel):
@@ -24,7 +28,6 @@ class OrganizationCommonBase(EMRBaseModel):
     parent_cache = ArrayField(models.IntegerField(), default=list)
     metadata = models.JSONField(default=dict)
     cached_parent_json = models.JSONField(default=dict)
-    cache_expiry_days = 15
     # Storing parent data within the organization to save joins each time
 
     def set_organization_cache(self):
@@ -38,31 +41,226 @@ class OrganizationCommonBase(EMRBaseModel):
             if not self.parent.has_children:
                 self.parent.has_children = True
                 self.parent.save(update_fields=["has_children"])
-        super().save()
-
-    def get_parent_json(self):
-        if self.parent_id:
-            if self.cached_parent_json and timezone.now() < datetime.fromisoformat(
-                self.cached_parent_json["cache_expiry"]
-            ):
-                return self.cached_parent_json
-            if self.parent:
-                self.parent.get_parent_json()
             self.cached_parent_json = {
                 "id": str(self.parent.external_id),
                 "name": self.parent.name,
                 "description": self.parent.description,
                 "org_type": self.parent.org_type,
                 "metadata": self.parent.metadata,
-                "parent": self.parent.cached_parent_json,
+                "parent": self.parent.get_parent_json(),
                 "level_cache": self.parent.level_cache,
-                "cache_expiry": str(
-                    timezone.now() + timedelta(days=self.cache_expiry_days)
-                ),
             }
-            self.save(update_fields=["cached_parent_json"])
+        super().save()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.mark_parent_json_fields_saved()
+        return instance
+
+    def mark_parent_json_fields_saved(self):
+        self._saved_parent_json_fields = {
+            field: self.__dict__[field]
+            for field in PARENT_JSON_FIELDS
+            if field in self.__dict__
+        }
+
+    def get_changed_parent_json_fields(self):
+        """
+        Fields shown in the parent JSON of descendants that changed since the organization was loaded
+        or last saved, deferred fields that were never assigned are unchanged
+        """
+        saved = getattr(self, "_saved_parent_json_fields", None)
+        if saved is None:
+            return set(PARENT_JSON_FIELDS)
+        return {
+            field
+            for field in PARENT_JSON_FIELDS
+            if field in self.__dict__
+            and (field not in saved or saved[field] != self.__dict__[field])
+        }
+
+    def move(self, parent):
+        """
+        Re-parent the organization along with everything below it, the ancestry caches of the subtree
+        are recomputed in the database, caches that depend on them are rebuilt by a background job
+        """
+        if parent and (parent.id == self.id or self.id in parent.parent_cache):
+            err = "Organization cannot be moved below itself"
+            raise ValueError(err)
+        old_parent_id = self.parent_id
+        with transaction.atomic():
+            self.parent = parent
+            self.save(update_fields=["parent"])
+            self.recompute_subtree_cache(self.id)
+            if parent and not parent.has_children:
+                parent.has_children = True
+                parent.save(update_fields=["has_children"])
+            if (
+                old_parent_id
+                and not self.__class__.objects.filter(parent_id=old_parent_id).exists()
+            ):
+                self.__class__.objects.filter(id=old_parent_id).update(
+                    has_children=False
+                )
+        self.refresh_from_db(fields=["parent_cache", "level_cache", "root_org"])
+
+    @classmethod
+    def recompute_subtree_cache(cls, organization_id):
+        """
+        Recompute parent_cache, level_cache and root_org of an organization and all of its descendants
+        from the current parent links with a single statement, returns the number of rows changed
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH RECURSIVE subtree AS (
+                    SELECT
+                        o.id,
+                        CASE WHEN p.id IS NULL THEN '{{}}'::integer[]
+                            ELSE p.parent_cache || p.id::integer
+                        END::integer[] AS parent_cache,
+                        COALESCE(p.level_cache + 1, 0) AS level_cache,
+                        COALESCE(p.root_org_id, p.id) AS root_org_id
+                    FROM {table} o
+                    LEFT JOIN {table} p ON p.id = o.parent_id
+                    WHERE o.id = %s
+                    UNION ALL
+                    SELECT
+                        c.id,
+                        s.parent_cache || s.id::integer,
+                        s.level_cache + 1,
+                        COALESCE(s.root_org_id, s.id)
+                    FROM {table} c
+                    JOIN subtree s ON c.parent_id = s.id
+                )
+                UPDATE {table} o
+                SET
+                    parent_cache = s.parent_cache,
+                    level_cache = s.level_cache,
+                    root_org_id = s.root_org_id
+                FROM subtree s
+                WHERE o.id = s.id
+                AND (
+                    o.parent_cache IS DISTINCT FROM s.parent_cache
+                    OR o.level_cache IS DISTINCT FROM s.level_cache
+                    OR o.root_org_id IS DISTINCT FROM s.root_org_id
+                )
+                """,  # noqa S608
+                [organization_id],
+            )
+            return cursor.rowcount
+
+    @classmethod
+    def get_ancestor_map(cls):
+        """
+        Map of organization id -> ancestry node, shared for the duration of a request
+        so that common ancestors are only fetched once
+        """
+        ancestors = RequestCache.get_namespace(
+            ORGANIZATION_ANCESTORS_REQUEST_CACHE_NAMESPACE
+        )
+        if ancestors is None:
+            return {}
+        return ancestors.setdefault(cls._meta.label, {})
+
+    @classmethod
+    def load_ancestors(cls, organizations, ancestors=None):
+        """
+        Bulk load the ancestors of all the given organizations with a single query,
+        ancestors that are already present in the map are not fetched again
+        """
+        if ancestors is None:
+            ancestors = cls.get_ancestor_map()
+        missing = {
+            parent_id
+            for organization in organizations
+            for parent_id in organization.parent_cache
+            if parent_id not in ancestors
+        }
+        if missing:
+            for row in cls.objects.filter(id__in=missing).values(
+                "id",
+                "external_id",
+                "name",
+                "description",
+                "org_type",
+                "metadata",
+                "level_cache",
+            ):
+                ancestors[row.pop("id")] = row
+        return ancestors
+
+    @staticmethod
+    def build_parent_json(parent_cache, ancestors):
+        """
+        Nested parent JSON built from the ancestry map, parent_cache is ordered from the root down
+        """
+        parent_json = {}
+        for parent_id in parent_cache:
+            ancestor = ancestors.get(parent_id)
+            if ancestor is None:
+                continue
+            parent_json = {
+                "id": str(ancestor["external_id"]),
+                "name": ancestor["name"],
+                "description": ancestor["description"],
+                "org_type": ancestor["org_type"],
+                "metadata": ancestor["metadata"],
+                "parent": parent_json,
+                "level_cache": ancestor["level_cache"],
+            }
+        return parent_json
+
+    def get_parent_json(self):
+        """
+        Read only, the ancestry is built from the request ancestry map when it is loaded,
+        otherwise from cached_parent_json which is kept up to date by a background job on changes
+        """
+        if not self.parent_id:
+            return {}
+        ancestors = self.get_ancestor_map()
+        if all(parent_id in ancestors for parent_id in self.parent_cache):
+            return self.build_parent_json(self.parent_cache, ancestors)
+        # Entries written before the parent JSON was kept up to date carry a cache_expiry and may be stale
+        if self.cached_parent_json and "cache_expiry" not in self.cached_parent_json:
             return self.cached_parent_json
-        return {}
+        ancestors = self.load_ancestors([self], ancestors)
+        return self.build_parent_json(self.parent_cache, ancestors)
+
+    def refresh_parent_json(self):
+        self.cached_parent_json = self.build_parent_json(
+            self.parent_cache, self.load_ancestors([self], {})
+        )
+        self.save(update_fields=["cached_parent_json"])
+
+    @classmethod
+    def refresh_descendants_parent_json(cls, organization_id, batch_size=1000):
+        """
+        Rebuild cached_parent_json of an organization and every organization below it
+        """
+        ancestors = {}
+        queryset = cls.objects.filter(
+            Q(id=organization_id) | Q(parent_cache__contains=[organization_id])
+        ).only("id", "parent_cache")
+        batch = []
+        for organization in queryset.iterator(chunk_size=batch_size):
+            batch.append(organization)
+            if len(batch) >= batch_size:
+                cls._refresh_parent_json_batch(batch, ancestors)
+                batch = []
+        if batch:
+            cls._refresh_parent_json_batch(batch, ancestors)
+
+    @classmethod
+    def _refresh_parent_json_batch(cls, organizations, ancestors):
+        cls.load_ancestors(organizations, ancestors)
+        for organization in organizations:
+            organization.cached_parent_json = cls.build_parent_json(
+                organization.parent_cache, ancestors
+            )
+        cls.objects.bulk_update(organizations, ["cached_parent_json"])
 
     class Meta:
         abstract = True
@@ -103,6 +301,12 @@ class OrganizationCommonBase(EMRBaseModel):
 class FacilityOrganization(OrganizationCommonBase):
     facility = models.ForeignKey("facility.Facility", on_delete=models.CASCADE)
 
+    def move(self, parent):
+        if parent and parent.facility_id != self.facility_id:
+            err = "Organization cannot be moved to another facility"
+            raise ValueError(err)
+        super().move(parent)
+
 
 class Organization(OrganizationCommonBase):
     pass
@@ -1,11 +1,17 @@
 from dateutil.relativedelta import relativedelta
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 from django.template.defaultfilters import pluralize
 from django.utils import timezone
 
 from care.emr.models import EMRBaseModel
+from care.emr.utils.patient_search import (
+    normalized_phone_number_expression,
+    phonetic_key_expression,
+)
 from care.users.models import User
 from care.utils.models.validators import mobile_or_landline_number_validator
 
@@ -42,6 +48,41 @@ class Patient(EMRBaseModel):
 
     users_cache = ArrayField(models.IntegerField(), default=list)
 
+    # Search keys computed by the database, see care.emr.utils.patient_search
+    phone_number_normalized = models.GeneratedField(
+        expression=normalized_phone_number_expression("phone_number"),
+        output_field=models.CharField(max_length=10),
+        db_persist=True,
+    )
+    name_phonetic = models.GeneratedField(
+        expression=phonetic_key_expression("name"),
+        output_field=models.CharField(max_length=255),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Used by the name icontains filters as well as the ranked search
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="patient_name_upper_trgm",
+            ),
+            GinIndex(
+                fields=["name_phonetic"],
+                name="patient_name_phonetic_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["phone_number_normalized"],
+                name="patient_phone_number_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            models.Index(
+                fields=["phone_number_normalized"],
+                name="patient_phone_number_idx",
+            ),
+        ]
+
     def get_age(self) -> str:
         start = self.date_of_birth or timezone.date(self.year_of_birth, 1, 1)
         end = (self.deceased_datetime or timezone.now()).date()
@@ -76,7 +117,7 @@ class Patient(EMRBaseModel):
                 organization_parents.extend(
                     patient_organization.organization.parent_cache
                 )
-                organization_parents.append(patient_organization.id)
+                organization_parents.append(patient_organization.organization_id)
 
         self.organization_cache = list(set(organization_parents))
 
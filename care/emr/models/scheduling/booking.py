@@ -17,6 +17,14 @@ class TokenSlot(EMRBaseModel):
     allocated = models.IntegerField(null=False, blank=False, default=0)
     # TODO propogate facility to this level or at the booking level to avoid joins
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["resource", "availability", "start_datetime", "end_datetime"],
+                name="unique_token_slot",
+            )
+        ]
+
 
 class TokenBooking(EMRBaseModel):
     token_slot = models.ForeignKey(
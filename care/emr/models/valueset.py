@@ -1,9 +1,34 @@
-from django.db import models
+import hashlib
+import json
+from functools import partial
 
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
+from django.db.models.functions import Length
+
+from care.emr.fhir.client import fan_out
+from care.emr.fhir.resources.code_concept import MinimalCodeConcept
 from care.emr.fhir.resources.valueset import ValueSetResource
 from care.emr.fhir.schema.valueset.valueset import ValueSetCompose
 from care.emr.models import EMRBaseModel
 
+LOCAL_CONCEPT_SYNC_PAGE_SIZE = 1000
+LOCAL_CONCEPT_SYNC_MAX_CONCEPTS = 100000
+
+
+class ValueSetTooLargeError(Exception):
+    pass
+
+
+def coding_key(code):
+    """
+    Returns the (system, code) tuple of a coding, FHIR schema codings wrap their values in root models
+    """
+    return (
+        getattr(code.system, "root", code.system),
+        getattr(code.code, "root", code.code),
+    )
+
 
 class ValueSet(EMRBaseModel):
     slug = models.SlugField(max_length=255, unique=True, db_index=True)
@@ -12,6 +37,24 @@ class ValueSet(EMRBaseModel):
     compose = models.JSONField(default=dict)
     status = models.CharField(max_length=255)
     is_system_defined = models.BooleanField(default=False)
+    # Hash of the compose the local concept store was last synced against,
+    # the local store is only used while it matches the current compose
+    local_compose_hash = models.CharField(max_length=64, default="", blank=True)
+
+    @property
+    def compose_hash(self):
+        compose = self.compose
+        if type(compose) is not dict:
+            compose = compose.model_dump(exclude_defaults=True)
+        return hashlib.sha256(
+            json.dumps(compose, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @property
+    def has_local_concepts(self):
+        return bool(self.local_compose_hash) and (
+            self.local_compose_hash == self.compose_hash
+        )
 
     def create_composition(self):
         systems = {}
@@ -23,27 +66,152 @@ class ValueSet(EMRBaseModel):
             if system not in systems:
                 systems[system] = {"include": []}
             systems[system]["include"].append(include.model_dump(exclude_defaults=True))
-        for exclude in compose.exclude:
+        for exclude in compose.exclude or []:
             system = exclude.system.root
             if system not in systems:
                 systems[system] = {"exclude": []}
-            systems[system]["exclude"].append(exclude.model_dump(exclude_defaults=True))
+            systems[system].setdefault("exclude", []).append(
+                exclude.model_dump(exclude_defaults=True)
+            )
         return systems
 
+    @staticmethod
+    def lookup_enumerated(composition, code_value):
+        """
+        Resolve a code against a system composition that only enumerates concepts,
+        returns None if the composition uses filters or other valuesets and needs the terminology server
+        """
+        for item in composition.get("include", []) + composition.get("exclude", []):
+            if not item.get("concept") or item.get("filter") or item.get("valueSet"):
+                return None
+        if any(
+            concept["code"] == code_value
+            for item in composition.get("exclude", [])
+            for concept in item["concept"]
+        ):
+            return False
+        return any(
+            concept["code"] == code_value
+            for item in composition.get("include", [])
+            for concept in item["concept"]
+        )
+
     def search(self, search="", count=10):
-        systems = self.create_composition()
-        results = []
-        for system in systems:
-            results.extend(
-                ValueSetResource()
-                .filter(search=search, count=count, **systems[system])
-                .search()
-            )
-        return results
+        if self.has_local_concepts:
+            return self.search_local(search, count)
+        searches = [
+            ValueSetResource().filter(search=search, count=count, **composition).search
+            for composition in self.create_composition().values()
+        ]
+        return [result for results in fan_out(searches) for result in results]
+
+    def search_local(self, search="", count=10):
+        queryset = ValueSetConcept.objects.filter(valueset=self)
+        if search:
+            queryset = queryset.filter(display__icontains=search)
+        return [
+            MinimalCodeConcept(system=system, code=code, display=display)
+            for system, code, display in queryset.order_by(
+                Length("display"), "display"
+            ).values_list("system", "code", "display")[:count]
+        ]
 
     def lookup(self, code):
+        system, code_value = coding_key(code)
+        if self.has_local_concepts:
+            return ValueSetConcept.objects.filter(
+                valueset=self, system=system, code=code_value
+            ).exists()
+        return self.lookup_remote(code)
+
+    def lookup_remote(self, code):
+        """
+        Validate the code against the terminology server, does not touch the database.
+        Returns None when no system composition contains the code and some gave no answer.
+        """
+        system, code_value = coding_key(code)
         systems = self.create_composition()
-        results = []
-        for system in systems:
-            results.append(ValueSetResource().filter(**systems[system]).lookup(code))
-        return any(results)
+        if system in systems:
+            result = self.lookup_enumerated(systems[system], code_value)
+            if result is not None:
+                return result
+        lookups = [
+            partial(ValueSetResource().filter(**composition).lookup, code)
+            for composition in systems.values()
+        ]
+        results = fan_out(lookups)
+        if any(results):
+            return True
+        if all(result is False for result in results):
+            return False
+        return None
+
+    def sync_local_concepts(
+        self,
+        page_size=LOCAL_CONCEPT_SYNC_PAGE_SIZE,
+        max_concepts=LOCAL_CONCEPT_SYNC_MAX_CONCEPTS,
+    ):
+        """
+        Expand the valueset on the terminology server and store every concept locally,
+        lookups and searches are then resolved against the local store until the compose changes
+        """
+        concepts = {}
+        for composition in self.create_composition().values():
+            offset = 0
+            while True:
+                page = (
+                    ValueSetResource()
+                    .filter(count=page_size, offset=offset, **composition)
+                    .search()
+                )
+                for concept in page:
+                    concepts[(concept.system, concept.code)] = concept.display
+                if len(concepts) > max_concepts:
+                    err = f"Valueset {self.slug} has more than {max_concepts} concepts"
+                    raise ValueSetTooLargeError(err)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        with transaction.atomic():
+            ValueSetConcept.objects.filter(valueset=self).delete()
+            ValueSetConcept.objects.bulk_create(
+                [
+                    ValueSetConcept(
+                        valueset=self, system=system, code=code, display=display
+                    )
+                    for (system, code), display in concepts.items()
+                ],
+                batch_size=page_size,
+            )
+            self.local_compose_hash = self.compose_hash
+            self.save(update_fields=["local_compose_hash"])
+        return len(concepts)
+
+
+class ValueSetConcept(models.Model):
+    """
+    Local expansion of a valueset, populated by the sync_valueset command
+    """
+
+    valueset = models.ForeignKey(ValueSet, on_delete=models.CASCADE)
+    system = models.CharField(max_length=255)
+    code = models.CharField(max_length=255)
+    display = models.TextField(default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["valueset", "system", "code"],
+                name="unique_valueset_concept",
+            )
+        ]
+        indexes = [
+            GinIndex(
+                fields=["display"],
+                name="valueset_concept_display_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.system}|{self.code}"
@@ -1,9 +1,19 @@
+from functools import partial
+from typing import get_args
+
+from django.core.cache import cache
+from pydantic import BaseModel, ValidationError
+
+from care.emr.fhir.client import fan_out
 from care.emr.fhir.resources.valueset import ValueSetResource
+from care.emr.fhir.schema.base import Coding
 from care.emr.fhir.schema.valueset.valueset import (
     ValueSet,
     ValueSetCompose,
 )
 from care.emr.models.valueset import ValueSet as ValuesetDatabaseModel
+from care.emr.models.valueset import ValueSetConcept, coding_key
+from care.utils.request_cache import RequestCache
 
 
 class CareValueset:
@@ -67,16 +77,11 @@ class CareValueset:
         # Query each system
         # Combine and return
         systems = self.create_composition()
-
-        results = []
-
-        for system in systems:
-            results.extend(
-                ValueSetResource()
-                .filter(search=filter, count=10, **systems[system])
-                .search()
-            )
-        return results
+        searches = [
+            ValueSetResource().filter(search=filter, count=10, **composition).search
+            for composition in systems.values()
+        ]
+        return [result for results in fan_out(searches) for result in results]
 
 
 class SystemValueSet:
@@ -91,13 +96,150 @@ class SystemValueSet:
         return cls._valuesets
 
 
+VALUESET_LOOKUP_CACHE_KEY = "valueset_lookup:{}:{}:{}"
+VALUESET_LOOKUP_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # 7 Days
+VALUESET_LOOKUP_REQUEST_CACHE_NAMESPACE = "valueset_lookups"
+
+
+def lookup_remote_codings(valuesets, codings, keys):
+    """
+    Validate codings on the terminology server concurrently, returns a dict of key -> bool or None
+    """
+    if not keys:
+        return {}
+    remote_results = fan_out(
+        [partial(valuesets[key[0]].lookup_remote, codings[key]) for key in keys]
+    )
+    return dict(zip(keys, remote_results, strict=True))
+
+
+def lookup_valuesets(lookups):
+    """
+    Validate many (valueset slug, coding) pairs in one pass.
+
+    Lookups are deduplicated, all referenced valuesets are fetched in one query and results are cached
+    against the valueset's compose hash, so an edited valueset is never served stale results.
+    Cache misses are resolved from the local concept store in one query, the remaining ones
+    are validated on the terminology server concurrently.
+
+    Results are also kept for the rest of the request, so codings validated in a batch
+    are not looked up again by validate_valueset.
+
+    Returns a dict of (slug, system, code) -> bool, or None when the valueset does not exist
+    """
+    memo = RequestCache.get_namespace(VALUESET_LOOKUP_REQUEST_CACHE_NAMESPACE)
+    codings = {}
+    for slug, coding in lookups:
+        codings.setdefault((slug, *coding_key(coding)), coding)
+    memoized = {key: memo[key] for key in codings if key in memo} if memo else {}
+    codings = {key: coding for key, coding in codings.items() if key not in memoized}
+    if not codings:
+        return memoized
+    valuesets = {
+        valueset.slug: valueset
+        for valueset in ValuesetDatabaseModel.objects.filter(
+            slug__in={slug for slug, _, _ in codings}
+        )
+    }
+    compose_hashes = {
+        slug: valueset.compose_hash for slug, valueset in valuesets.items()
+    }
+    results = {}
+    cache_keys = {}
+    for key in codings:
+        slug, system, code = key
+        if slug not in valuesets:
+            results[key] = None
+            continue
+        cache_keys[
+            VALUESET_LOOKUP_CACHE_KEY.format(compose_hashes[slug], system, code)
+        ] = key
+    cached = cache.get_many(list(cache_keys))
+    misses = {}
+    for cache_key, key in cache_keys.items():
+        if cache_key in cached:
+            results[key] = cached[cache_key]
+        else:
+            misses[cache_key] = key
+
+    local_misses = {
+        cache_key: key
+        for cache_key, key in misses.items()
+        if valuesets[key[0]].local_compose_hash == compose_hashes[key[0]]
+    }
+    if local_misses:
+        found = set(
+            ValueSetConcept.objects.filter(
+                valueset_id__in={valuesets[key[0]].id for key in local_misses.values()},
+                code__in={key[2] for key in local_misses.values()},
+            ).values_list("valueset_id", "system", "code")
+        )
+        for key in local_misses.values():
+            results[key] = (valuesets[key[0]].id, key[1], key[2]) in found
+
+    remote_keys = [
+        key for cache_key, key in misses.items() if cache_key not in local_misses
+    ]
+    remote_results = lookup_remote_codings(valuesets, codings, remote_keys)
+    # Codes the terminology server gave no answer for are rejected without caching the result
+    undetermined = {key for key, result in remote_results.items() if result is None}
+    results.update({key: bool(result) for key, result in remote_results.items()})
+
+    cache.set_many(
+        {
+            cache_key: results[key]
+            for cache_key, key in misses.items()
+            if key not in undetermined
+        },
+        VALUESET_LOOKUP_CACHE_TIMEOUT,
+    )
+    if memo is not None:
+        memo.update(results)
+    results.update(memoized)
+    return results
+
+
+def get_model_types(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return [annotation]
+    return [model for arg in get_args(annotation) for model in get_model_types(arg)]
+
+
+def get_valueset_lookups(model, data):
+    """
+    (valueset slug, coding) pairs of the raw data that the model's validators will check,
+    found through the valueset slug declared on the fields of the model and its nested models.
+    Invalid codings are skipped and left to the validators to report.
+    """
+    lookups = []
+    if not isinstance(data, dict):
+        return lookups
+    for name, field in model.model_fields.items():
+        value = data.get(field.alias or name)
+        if not value:
+            continue
+        values = value if isinstance(value, list) else [value]
+        extra = field.json_schema_extra
+        slug = extra.get("slug") if isinstance(extra, dict) else None
+        if slug:
+            for item in values:
+                try:
+                    lookups.append((slug, Coding.model_validate(item)))
+                except ValidationError:
+                    continue
+            continue
+        for nested_model in get_model_types(field.annotation):
+            for item in values:
+                lookups.extend(get_valueset_lookups(nested_model, item))
+    return lookups
+
+
 def validate_valueset(field, slug, code):
-    valueset_obj = ValuesetDatabaseModel.objects.filter(slug=slug).first()
-    if not valueset_obj:
+    result = lookup_valuesets([(slug, code)]).get((slug, *coding_key(code)))
+    if result is None:
         err = "Valueset does not exist in care, Resync valuesets"
         raise ValueError(err)
-    exists = valueset_obj.lookup(code)
-    if not exists:
+    if not result:
         err = "Code does not exist in the valueset"
         raise ValueError(err)
     return code
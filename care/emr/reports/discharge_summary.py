@@ -212,7 +212,7 @@ def generate_and_upload_discharge_summary(encounter: Encounter):
         with tempfile.NamedTemporaryFile(suffix=".pdf") as file:
             generate_discharge_summary_pdf(data, file)
             logger.info("Uploading Discharge Summary for %s", encounter.external_id)
-            summary_file.files_manager.put_object(
+            summary_file.files_manager.upload_fileobj(
                 summary_file, file, ContentType="application/pdf"
             )
             summary_file.upload_completed = True
@@ -236,8 +236,16 @@ def email_discharge_summary(summary_file: FileUpload, emails: Iterable[str]):
         emails,
     )
     msg.content_subtype = "html"
-    _, data = summary_file.files_manager.file_contents(summary_file)
-    msg.attach(summary_file.name, data, "application/pdf")
+    size = summary_file.files_manager.head_object(summary_file)["ContentLength"]
+    if size > settings.FILE_MAX_EMAIL_ATTACHMENT_SIZE:
+        # Attachments are built in memory, send a download link for large files instead
+        url = summary_file.files_manager.read_signed_url(
+            summary_file, duration=settings.FILE_EMAIL_LINK_EXPIRY
+        )
+        msg.body = f'Please download the file from <a href="{url}">here</a>'
+    else:
+        _, data = summary_file.files_manager.file_contents(summary_file)
+        msg.attach(summary_file.name, data, "application/pdf")
     return msg.send()
 
 
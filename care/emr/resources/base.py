@@ -5,25 +5,68 @@ from types import UnionType
 from typing import get_origin
 
 from pydantic import BaseModel
+from pydantic_core import PydanticUndefined, to_jsonable_python
 
 from care.emr.fhir.schema.base import Coding
 
+JSON_NATIVE_TYPES = (str, int, bool, type(None))
+
+
+def to_json_value(value):
+    """
+    JSON encoder used by serialize_many, native values are passed through as is
+    """
+    if type(value) in JSON_NATIVE_TYPES:
+        return value
+    return to_jsonable_python(value)
+
 
 class EMRResource(BaseModel):
     __model__ = None
     __exclude__ = []
     meta: dict = {}
     __questionnaire_cache__ = {}
+    __serializer_plan__ = None
 
     @classmethod
     def get_database_mapping(cls):
         """
         Mapping of database fields to pydantic object
         """
+        return cls.get_serializer_plan()["database_fields"]
+
+    @classmethod
+    def get_serializer_plan(cls):
+        """
+        Field plan used to serialize database objects, computed once per resource class
+        """
+        # Checked on the class itself so that subclasses do not reuse the plan of their parent
+        plan = cls.__dict__.get("__serializer_plan__")
+        if plan is not None:
+            return plan
         database_fields = []
-        for field in cls.__model__._meta.fields:  # noqa SLF001
-            database_fields.append(field.name)
-        return database_fields
+        if cls.__model__:
+            database_fields = [field.name for field in cls.__model__._meta.fields]  # noqa SLF001
+        defaults = {}
+        for name, field in cls.model_fields.items():
+            if field.default_factory is not None:
+                defaults[name] = field.default_factory
+            elif field.default is not PydanticUndefined:
+                default = field.default
+                defaults[name] = lambda default=default: default
+        plan = {
+            "database_fields": database_fields,
+            "attributes": [
+                field
+                for field in database_fields
+                if field in cls.model_fields and field not in cls.__exclude__
+            ],
+            "meta_fields": set(cls.model_fields),
+            "output_fields": [field for field in cls.model_fields if field != "meta"],
+            "defaults": defaults,
+        }
+        cls.__serializer_plan__ = plan
+        return plan
 
     @classmethod
     def get_serializer_context(cls, info):
@@ -39,27 +82,62 @@ class EMRResource(BaseModel):
     def perform_extra_user_serialization(cls, mapping, obj, user):
         pass
 
+    @classmethod
+    def prefetch_serialization(cls, objs):
+        """
+        Called by serialize_many with all the objects before they are serialized,
+        used to bulk load data that perform_extra_serialization would otherwise fetch per object
+        """
+
     def is_update(self):
         return getattr("_is_update", False)
 
+    @classmethod
+    def get_serialized_mapping(cls, obj, plan, user=None):
+        constructed = {
+            attribute: getattr(obj, attribute) for attribute in plan["attributes"]
+        }
+        meta = getattr(obj, "meta", None) or {}
+        meta_fields = plan["meta_fields"]
+        for field in meta:
+            if field in meta_fields:
+                constructed[field] = meta[field]
+        cls.perform_extra_serialization(constructed, obj)
+        if user:
+            cls.perform_extra_user_serialization(constructed, obj, user=user)
+        return constructed
+
     @classmethod
     def serialize(cls, obj: __model__, user=None):
         """
         Creates a pydantic object from a database object
         """
-        mappings = cls.get_database_mapping()
-        constructed = {}
-        for mapping in mappings:
-            if mapping in cls.model_fields and mapping not in cls.__exclude__:
-                constructed[mapping] = getattr(obj, mapping)
-        for field in getattr(obj, "meta", {}):
-            if field in cls.model_fields:
-                constructed[field] = obj.meta[field]
-        cls.perform_extra_serialization(constructed, obj)
-        if user:
-            cls.perform_extra_user_serialization(constructed, obj, user=user)
+        constructed = cls.get_serialized_mapping(obj, cls.get_serializer_plan(), user)
         return cls.model_construct(**constructed)
 
+    @classmethod
+    def serialize_many(cls, objs, user=None):
+        """
+        Serializes database objects straight to JSON ready dicts,
+        equivalent to serialize(obj, user).to_json() without building pydantic objects
+        """
+        objs = list(objs)
+        cls.prefetch_serialization(objs)
+        plan = cls.get_serializer_plan()
+        output_fields = plan["output_fields"]
+        defaults = plan["defaults"]
+        results = []
+        for obj in objs:
+            constructed = cls.get_serialized_mapping(obj, plan, user)
+            data = {}
+            for field in output_fields:
+                if field in constructed:
+                    data[field] = to_json_value(constructed[field])
+                elif field in defaults:
+                    data[field] = to_json_value(defaults[field]())
+            results.append(data)
+        return results
+
     def perform_extra_deserialization(self, is_update, obj):
         pass
 
@@ -10,6 +10,7 @@ from care.emr.registries.care_valueset.care_valueset import validate_valueset
 from care.emr.resources.base import EMRResource
 from care.emr.resources.condition.valueset import CARE_CODITION_CODE_VALUESET
 from care.emr.resources.user.spec import UserSpec
+from care.emr.utils.preload import get_preloaded_object
 
 
 class ClinicalStatusChoices(str, Enum):
@@ -55,12 +56,11 @@ class BaseConditionSpec(EMRResource):
     id: UUID4 = None
 
 
-class ConditionSpec(BaseConditionSpec):
+class ConditionUpdateSpec(BaseConditionSpec):
     clinical_status: ClinicalStatusChoices | None = None
     verification_status: VerificationStatusChoices
     severity: SeverityChoices | None = None
     code: Coding = Field(json_schema_extra={"slug": CARE_CODITION_CODE_VALUESET.slug})
-    encounter: UUID4
     onset: ConditionOnSetSpec = {}
 
     @field_validator("code")
@@ -70,17 +70,26 @@ class ConditionSpec(BaseConditionSpec):
             "code", cls.model_fields["code"].json_schema_extra["slug"], code
         )
 
+
+class ConditionSpec(ConditionUpdateSpec):
+    encounter: UUID4
+
     @field_validator("encounter")
     @classmethod
     def validate_encounter_exists(cls, encounter):
-        if not Encounter.objects.filter(external_id=encounter).exists():
+        if (
+            get_preloaded_object(Encounter, encounter) is None
+            and not Encounter.objects.filter(external_id=encounter).exists()
+        ):
             err = "Encounter not found"
             raise ValueError(err)
         return encounter
 
     def perform_extra_deserialization(self, is_update, obj):
         if not is_update:
-            obj.encounter = Encounter.objects.get(
+            obj.encounter = get_preloaded_object(
+                Encounter, self.encounter
+            ) or Encounter.objects.get(
                 external_id=self.encounter
             )  # Needs more validation
             obj.patient = obj.encounter.patient
@@ -80,6 +80,10 @@ class FacilityOrganizationReadSpec(FacilityOrganizationBaseSpec):
     level_cache: int = 0
     has_children: bool
 
+    @classmethod
+    def prefetch_serialization(cls, objs):
+        FacilityOrganization.load_ancestors(objs)
+
     @classmethod
     def perform_extra_serialization(cls, mapping, obj):
         mapping["id"] = obj.external_id
@@ -56,18 +56,28 @@ class FileUploadListSpec(FileUploadBaseSpec):
     created_date: datetime.datetime
     extension: str
     uploaded_by: dict
+    read_signed_url: str | None = None
+
+    @classmethod
+    def prefetch_serialization(cls, objs):
+        # Download URLs of a page are presigned together with the shared S3 client
+        files = [obj for obj in objs if obj.upload_completed]
+        urls = FileUpload.files_manager.read_signed_urls(files)
+        for obj, url in zip(files, urls, strict=True):
+            obj._read_signed_url = url  # noqa SLF001
 
     @classmethod
     def perform_extra_serialization(cls, mapping, obj):
         mapping["id"] = obj.external_id
         mapping["extension"] = obj.get_extension()
+        if getattr(obj, "_read_signed_url", None):
+            mapping["read_signed_url"] = obj._read_signed_url  # noqa SLF001
         if obj.created_by:
             mapping["uploaded_by"] = UserSpec.serialize(obj.created_by)
 
 
 class FileUploadRetrieveSpec(FileUploadListSpec):
     signed_url: str | None = None
-    read_signed_url: str | None = None
     internal_name: str  # Not sure if this needs to be returned
 
     @classmethod
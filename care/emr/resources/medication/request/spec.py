@@ -21,6 +21,7 @@ from care.emr.resources.medication.valueset.body_site import CARE_BODY_SITE_VALU
 from care.emr.resources.medication.valueset.medication import CARE_MEDICATION_VALUESET
 from care.emr.resources.medication.valueset.route import CARE_ROUTE_VALUESET
 from care.emr.resources.user.spec import UserSpec
+from care.emr.utils.preload import get_preloaded_object
 
 
 class MedicationRequestStatus(str, Enum):
@@ -242,7 +243,10 @@ class MedicationRequestSpec(BaseMedicationRequestSpec):
     @field_validator("encounter")
     @classmethod
     def validate_encounter_exists(cls, encounter):
-        if not Encounter.objects.filter(external_id=encounter).exists():
+        if (
+            get_preloaded_object(Encounter, encounter) is None
+            and not Encounter.objects.filter(external_id=encounter).exists()
+        ):
             err = "Encounter not found"
             raise ValueError(err)
         return encounter
@@ -258,7 +262,9 @@ class MedicationRequestSpec(BaseMedicationRequestSpec):
 
     def perform_extra_deserialization(self, is_update, obj):
         if not is_update:
-            obj.encounter = Encounter.objects.get(
+            obj.encounter = get_preloaded_object(
+                Encounter, self.encounter
+            ) or Encounter.objects.get(
                 external_id=self.encounter
             )  # Needs more validation
             obj.patient = obj.encounter.patient
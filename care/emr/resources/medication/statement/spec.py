@@ -9,6 +9,7 @@ from care.emr.registries.care_valueset.care_valueset import validate_valueset
 from care.emr.resources.base import EMRResource
 from care.emr.resources.medication.valueset.medication import CARE_MEDICATION_VALUESET
 from care.emr.resources.user.spec import UserSpec
+from care.emr.utils.preload import get_preloaded_object
 
 
 class MedicationStatementStatus(str, Enum):
@@ -76,7 +77,10 @@ class MedicationStatementSpec(BaseMedicationStatementSpec):
     @field_validator("encounter")
     @classmethod
     def validate_encounter_exists(cls, encounter):
-        if not Encounter.objects.filter(external_id=encounter).exists():
+        if (
+            get_preloaded_object(Encounter, encounter) is None
+            and not Encounter.objects.filter(external_id=encounter).exists()
+        ):
             err = "Encounter not found"
             raise ValueError(err)
         return encounter
@@ -92,7 +96,9 @@ class MedicationStatementSpec(BaseMedicationStatementSpec):
 
     def perform_extra_deserialization(self, is_update, obj):
         if not is_update:
-            obj.encounter = Encounter.objects.get(
+            obj.encounter = get_preloaded_object(
+                Encounter, self.encounter
+            ) or Encounter.objects.get(
                 external_id=self.encounter
             )  # Needs more validation
             obj.patient = obj.encounter.patient
@@ -56,6 +56,10 @@ class OrganizationReadSpec(OrganizationBaseSpec):
     has_children: bool
     parent: dict
 
+    @classmethod
+    def prefetch_serialization(cls, objs):
+        Organization.load_ancestors(objs)
+
     @classmethod
     def perform_extra_serialization(cls, mapping, obj):
         mapping["id"] = obj.external_id
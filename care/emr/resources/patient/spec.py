@@ -8,6 +8,7 @@ from pydantic import UUID4, field_validator, model_validator
 from care.emr.models import Organization
 from care.emr.models.patient import Patient
 from care.emr.resources.base import EMRResource
+from care.emr.utils.patient_search import mask_phone_number
 
 
 class BloodGroupChoices(str, Enum):
@@ -103,6 +104,13 @@ class PatientPartialSpec(EMRResource):
         mapping["id"] = str(uuid.uuid4())
 
 
+class PatientMaskedPartialSpec(PatientPartialSpec):
+    @classmethod
+    def perform_extra_serialization(cls, mapping, obj):
+        super().perform_extra_serialization(mapping, obj)
+        mapping["phone_number"] = mask_phone_number(obj.phone_number)
+
+
 class PatientRetrieveSpec(PatientListSpec):
     geo_organization: dict = {}
 
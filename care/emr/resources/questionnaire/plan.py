@@ -0,0 +1,305 @@
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from dateutil import parser
+from django.utils import timezone
+
+from care.emr.resources.common import Coding
+from care.emr.resources.observation.spec import ObservationStatus
+from care.emr.resources.questionnaire.spec import QuestionType
+
+QUESTIONNAIRE_PLAN_CACHE_SIZE = 256
+
+
+class InvalidValueError(ValueError):
+    """
+    Raised by value parsers that report their own message
+    """
+
+
+def parse_boolean(value):
+    if value.lower() not in ["true", "false", "1", "0"]:
+        msg = f"Invalid boolean value: {value}"
+        raise InvalidValueError(msg)
+
+
+def parse_date(value):
+    parser.parse(value).date()
+
+
+def parse_time(value):
+    datetime.strptime(value, "%H:%M:%S")  # noqa DTZ007
+
+
+VALUE_PARSERS = {
+    QuestionType.integer.value: int,
+    QuestionType.decimal.value: float,
+    QuestionType.boolean.value: parse_boolean,
+    QuestionType.date.value: parse_date,
+    QuestionType.datetime.value: parser.parse,
+    QuestionType.time.value: parse_time,
+}
+
+
+class QuestionPlan:
+    """
+    A question with everything needed to validate its answers and build its observations
+    precomputed, the raw questionnaire JSON is never touched after compilation
+    """
+
+    __slots__ = (
+        "answer_value_set",
+        "group",
+        "has_answer_value_set",
+        "id",
+        "observation_template",
+        "repeats",
+        "required",
+        "required_by_parent",
+        "type",
+        "value_parser",
+    )
+
+    def __init__(self, question, group, required_by_parent):
+        self.id = question["id"]
+        self.type = question["type"]
+        self.group = group
+        self.required = question.get("required", False)
+        # Answered questions can't be empty if they or any of their parent groups are required
+        self.required_by_parent = self.required or required_by_parent
+        self.repeats = question.get("repeats", False)
+        self.has_answer_value_set = "answer_value_set" in question
+        self.answer_value_set = question.get("answer_value_set")
+        self.value_parser = VALUE_PARSERS.get(self.type)
+        # Only questions with a code are recorded as observations
+        self.observation_template = (
+            get_observation_template(question) if question.get("code") else None
+        )
+
+    def validate_values(self, values):
+        errors = []
+        if not self.value_parser:
+            return errors
+        for value in values:
+            if value.value is None:
+                continue
+            try:
+                self.value_parser(value.value)
+            except InvalidValueError as e:
+                errors.append(str(e))
+            except ValueError:
+                errors.append(f"Invalid {self.type}")
+            except Exception:
+                errors.append(f"Error validating {self.type}")
+        return errors
+
+
+class GroupPlan:
+    __slots__ = ("id", "observation_template", "parent")
+
+    def __init__(self, question, parent):
+        self.id = question["id"]
+        self.parent = parent
+        self.observation_template = get_observation_template(question)
+
+
+def get_observation_template(question):
+    """
+    Observation fields shared by every answer to the question, codings are validated once here
+    instead of on every submission
+    """
+    template = {
+        "status": ObservationStatus.final.value,
+        "value_type": question["type"],
+    }
+    if question.get("category"):
+        template["category"] = Coding(**question["category"]).model_dump(
+            mode="json", exclude_defaults=True
+        )
+    if question.get("code"):
+        template["main_code"] = Coding(**question["code"]).model_dump(
+            mode="json", exclude_defaults=True
+        )
+    return template
+
+
+class QuestionnairePlan:
+    """
+    Flat, read only form of a questionnaire's question tree.
+
+    Groups are resolved at compile time, every other question is kept in the order it appears along
+    with its enclosing group, so a submission is validated and turned into observations in a single
+    pass over the list without walking or mutating the questionnaire JSON.
+    """
+
+    def __init__(self, questions):
+        self.questions = []
+        self.index = {}
+        self.compile(questions, None, required=False)
+
+    def compile(self, questions, group, required):
+        for question in questions or []:
+            if question["type"] == QuestionType.group.value:
+                group_plan = GroupPlan(question, group)
+                self.index[group_plan.id] = group_plan
+                self.compile(
+                    question.get("questions"),
+                    group_plan,
+                    required or question.get("required", False),
+                )
+                continue
+            plan = QuestionPlan(question, group, required)
+            self.index[plan.id] = plan
+            self.questions.append(plan)
+
+    def process(self, responses, valueset_lookups):
+        """
+        Validate responses (question id -> result) and build the Observation field values of the
+        answered questions, returns (errors, observations). Valueset checks are appended to valueset_lookups
+        as (question id, valueset slug, coding) so they can be validated in one batch.
+        """
+        errors = []
+        observations = []
+        group_ids = {}
+        for question in self.questions:
+            response = responses.get(question.id)
+            if question.type != QuestionType.structured.value:
+                self.validate(question, response, errors, valueset_lookups)
+            if question.observation_template and response and response.values:
+                observation = self.build_observation(
+                    question, response, group_ids, observations
+                )
+                if observation:
+                    observations.append(observation)
+        return errors, observations
+
+    def validate(self, question, response, errors, valueset_lookups):
+        # Case when question is not answered ( Not in response )
+        if response is None:
+            if question.required:
+                errors.append(
+                    {"question_id": question.id, "error": "Question not answered"}
+                )
+            return
+        values = response.values
+        # Case when the question is answered but is empty
+        if not values and question.required_by_parent:
+            errors.append(
+                {
+                    "question_id": question.id,
+                    "type": "values_missing",
+                    "msg": "No value provided for question",
+                }
+            )
+            return
+        if question.repeats:
+            values = values[0:1]
+        errors.extend(
+            {"type": "type_error", "question_id": question.id, "msg": error}
+            for error in question.validate_values(values)
+        )
+        # TODO : Validate for options created by user as well
+        if question.type == QuestionType.choice.value and question.answer_value_set:
+            for value in values:
+                if not value.value_code:
+                    errors.append(
+                        {
+                            "type": "type_error",
+                            "question_id": question.id,
+                            "msg": "Coding is required",
+                        }
+                    )
+                    return
+                valueset_lookups.append(
+                    (question.id, question.answer_value_set, value.value_code)
+                )
+        elif question.type == QuestionType.quantity.value:
+            for value in values:
+                if not value.value_quantity:
+                    errors.append(
+                        {
+                            "type": "type_error",
+                            "question_id": question.id,
+                            "msg": "Quantity is required",
+                        }
+                    )
+                    return
+                if question.has_answer_value_set:
+                    valueset_lookups.append(
+                        (
+                            question.id,
+                            question.answer_value_set,
+                            value.value_quantity.code,
+                        )
+                    )
+
+    def build_observation(self, question, response, group_ids, observations):
+        if not response.values[0]:
+            return None
+        # Groups are only recorded once a question below them is answered
+        parent_id = self.get_group_id(question.group, group_ids, observations)
+        # Only the last value is recorded as the observation value
+        value = response.values[-1]
+        observation = question.observation_template.copy()
+        observation["external_id"] = uuid.uuid4()
+        if question.type == QuestionType.choice.value and value.value_code:
+            observation["value"] = {
+                "value_code": value.value_code.model_dump(
+                    mode="json", exclude_defaults=True
+                )
+            }
+        elif question.type == QuestionType.quantity.value and value.value_quantity:
+            observation["value"] = {
+                "value_quantity": value.value_quantity.model_dump(
+                    mode="json", exclude_defaults=True
+                )
+            }
+        else:
+            observation["value"] = value.model_dump(
+                mode="json", include={"value"}, exclude_defaults=True
+            )
+        if response.note:
+            observation["note"] = response.note
+        if parent_id:
+            observation["parent"] = parent_id
+        observation["effective_datetime"] = timezone.now()
+        return observation
+
+    def get_group_id(self, group, group_ids, observations):
+        if group is None:
+            return None
+        if group.id not in group_ids:
+            # Outer groups are emitted first
+            self.get_group_id(group.parent, group_ids, observations)
+            observation = group.observation_template.copy()
+            observation["external_id"] = uuid.uuid4()
+            observation["effective_datetime"] = timezone.now()
+            observation["value"] = {}
+            observations.append(observation)
+            group_ids[group.id] = observation["external_id"]
+        return group_ids[group.id]
+
+
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def get_questionnaire_plan(questionnaire):
+    """
+    Compiled plan of a questionnaire, cached per process and keyed by the questionnaire id and
+    modified date so that edits compile a new plan
+    """
+    key = (questionnaire.id, questionnaire.modified_date)
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    plan = QuestionnairePlan(questionnaire.questions)
+    with _plans_lock:
+        _plans[key] = plan
+        if len(_plans) > QUESTIONNAIRE_PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from care.emr.models.organization import (
+    ORGANIZATION_ANCESTORS_REQUEST_CACHE_NAMESPACE,
+    FacilityOrganization,
+    Organization,
+)
+from care.emr.models.scheduling.schedule import (
+    Availability,
+    AvailabilityException,
+    Schedule,
+)
+from care.emr.tasks.organization import (
+    rebuild_organization_dependent_caches_task,
+    refresh_organization_parent_json_task,
+)
+from care.emr.tasks.scheduling import materialize_resource_slots_task
+from care.emr.utils.scheduling import clear_materialized_days
+from care.utils.request_cache import RequestCache
+
+# Saves that only touch these fields do not change the ancestry of any organization
+ORGANIZATION_ANCESTRY_IGNORED_FIELDS = {"cached_parent_json", "has_children"}
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_save, sender=FacilityOrganization)
+def refresh_organization_parent_json(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """
+    Schedule a rebuild of the cached parent JSON below an organization once the change is committed,
+    only when a field shown in that JSON changed. New organizations have nothing below them.
+    """
+    if update_fields and set(update_fields) <= ORGANIZATION_ANCESTRY_IGNORED_FIELDS:
+        return
+    changed = set() if created else instance.get_changed_parent_json_fields()
+    instance.mark_parent_json_fields_saved()
+    if not changed:
+        return
+    RequestCache.clear_namespace(ORGANIZATION_ANCESTORS_REQUEST_CACHE_NAMESPACE)
+    transaction.on_commit(
+        lambda: refresh_organization_parent_json_task.delay(
+            sender._meta.label,  # noqa SLF001
+            instance.id,
+        )
+    )
+    if "parent_id" in changed:
+        # Moved with OrganizationCommonBase.move, caches built from the old ancestry are stale
+        transaction.on_commit(
+            lambda: rebuild_organization_dependent_caches_task.delay(
+                sender._meta.label,  # noqa SLF001
+                instance.id,
+            )
+        )
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_save, sender=Availability)
+@receiver(post_save, sender=AvailabilityException)
+def rematerialize_token_slots(sender, instance, **kwargs):
+    """
+    Slots of a resource are created again once its schedules or exceptions change
+    """
+    resource_id = (
+        instance.schedule.resource_id
+        if isinstance(instance, Availability)
+        else instance.resource_id
+    )
+    clear_materialized_days(resource_id)
+    transaction.on_commit(lambda: materialize_resource_slots_task.delay(resource_id))
@@ -0,0 +1,13 @@
+from celery import current_app
+from celery.schedules import crontab
+
+from care.emr.tasks.scheduling import materialize_token_slots_task
+
+
+@current_app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    sender.add_periodic_task(
+        crontab(hour="1", minute="0"),
+        materialize_token_slots_task.s(),
+        name="materialize_token_slots",
+    )
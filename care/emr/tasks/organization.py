@@ -0,0 +1,29 @@
+from logging import Logger
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.apps import apps
+
+from care.emr.utils.organization_hierarchy import rebuild_dependent_caches
+
+logger: Logger = get_task_logger(__name__)
+
+
+@shared_task(expires=10 * 60)
+def refresh_organization_parent_json_task(model_label: str, organization_id: int):
+    """
+    Rebuild the cached parent JSON of an organization and its descendants after it changed
+    """
+    logger.info("Refreshing parent json below %s %s", model_label, organization_id)
+    model = apps.get_model(model_label)
+    model.refresh_descendants_parent_json(organization_id)
+
+
+@shared_task
+def rebuild_organization_dependent_caches_task(model_label: str, organization_id: int):
+    """
+    Rebuild the patient, facility, encounter and questionnaire organization caches after a subtree move
+    """
+    logger.info("Rebuilding caches depending on %s %s", model_label, organization_id)
+    updated = rebuild_dependent_caches(model_label, organization_id)
+    logger.info("Rebuilt organization caches %s", updated)
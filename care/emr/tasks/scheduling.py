@@ -0,0 +1,41 @@
+from logging import Logger
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.utils import timezone
+
+from care.emr.models.scheduling.schedule import SchedulableUserResource
+from care.emr.utils.scheduling import materialize_slots
+
+logger: Logger = get_task_logger(__name__)
+
+
+@shared_task(expires=10 * 60)
+def materialize_resource_slots_task(resource_id: int, days: int | None = None):
+    """
+    Create the upcoming slots of a resource, so that listing slots does not have to create them
+    """
+    resource = SchedulableUserResource.objects.filter(id=resource_id).first()
+    if not resource:
+        return
+    count = materialize_slots(
+        resource, timezone.now().date(), days or settings.SLOT_MATERIALIZATION_DAYS
+    )
+    logger.info("Materialized %s slots for resource %s", count, resource_id)
+
+
+@shared_task
+def materialize_token_slots_task(days: int | None = None):
+    """
+    Create the upcoming slots of every resource with a schedule that is still valid
+    """
+    resource_ids = (
+        SchedulableUserResource.objects.filter(
+            schedule__valid_to__gte=timezone.now(), schedule__deleted=False
+        )
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    for resource_id in resource_ids:
+        materialize_resource_slots_task(resource_id, days)
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from care.emr.benchmark.runner import BenchmarkRunner, compare, percentile
+
+
+class BenchmarkReportTest(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare(self):
+        baseline = {
+            "results": {
+                "10k": {
+                    "patient_list": {"p50_ms": 10, "p99_ms": 20, "queries": 0},
+                    "removed": {"p50_ms": 1},
+                }
+            }
+        }
+        current = {
+            "results": {
+                "10k": {
+                    "patient_list": {"p50_ms": 5, "p99_ms": 30, "queries": 4},
+                    "added": {"p50_ms": 1},
+                },
+                "100k": {"patient_list": {"p50_ms": 1}},
+            }
+        }
+        self.assertEqual(
+            compare(baseline, current),
+            {"10k/patient_list": {"p50_ms": 0.5, "p99_ms": 1.5, "queries": None}},
+        )
+
+
+class BenchmarkRunnerTest(TestCase):
+    def setUp(self):
+        self.runner = BenchmarkRunner(mock.Mock(), iterations=3, warmup=2)
+        self.scenario = {"name": "patient_list", "method": "get", "path": "/api/"}
+
+    def test_run_scenario(self):
+        with mock.patch.object(
+            self.runner.client, "get", return_value=mock.Mock(status_code=200)
+        ) as get:
+            result = self.runner.run_scenario(self.scenario)
+        # Warmup, measured and allocation requests
+        self.assertEqual(get.call_count, 6)
+        self.assertEqual(result["iterations"], 3)
+        self.assertEqual(result["queries"], 0)
+        self.assertLessEqual(result["min_ms"], result["p50_ms"])
+        self.assertLessEqual(result["p50_ms"], result["max_ms"])
+        self.assertGreaterEqual(
+            result["peak_allocated_bytes"], result["allocated_bytes"]
+        )
+
+    def test_failed_request_stops_the_run(self):
+        with (
+            mock.patch.object(
+                self.runner.client,
+                "get",
+                return_value=mock.Mock(status_code=403, content=b"denied"),
+            ),
+            self.assertRaisesMessage(RuntimeError, "patient_list returned 403"),
+        ):
+            self.runner.run([self.scenario])
@@ -0,0 +1,102 @@
+import datetime as dt
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import override_settings
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.exceptions import ValidationError
+
+from care.emr.api.viewsets.scheduling.availability import (
+    LOCK_NOT_AVAILABLE,
+    allocate_slot,
+    lock_create_appointment,
+)
+from care.emr.models import TokenBooking
+from care.emr.models.patient import Patient
+from care.emr.models.scheduling.booking import TokenSlot
+from care.emr.models.scheduling.schedule import (
+    Availability,
+    SchedulableUserResource,
+    Schedule,
+)
+from care.utils.lock import ObjectLocked
+from care.utils.tests.base import CareAPITestBase
+
+
+class LockNotAvailableError(Exception):
+    sqlstate = LOCK_NOT_AVAILABLE
+
+
+def lock_timeout():
+    error = OperationalError("canceling statement due to lock timeout")
+    error.__cause__ = LockNotAvailableError()
+    return error
+
+
+def raise_lock_timeout(*args):
+    raise lock_timeout()
+
+
+class AllocateSlotTest(CareAPITestBase):
+    def setUp(self):
+        self.user = self.create_user()
+        resource = baker.make(
+            SchedulableUserResource,
+            facility=self.create_facility(user=self.user),
+            user=self.user,
+        )
+        schedule = baker.make(Schedule, resource=resource)
+        availability = baker.make(Availability, schedule=schedule, tokens_per_slot=2)
+        start = timezone.now()
+        self.slot = baker.make(
+            TokenSlot,
+            resource=resource,
+            availability=availability,
+            start_datetime=start,
+            end_datetime=start + dt.timedelta(minutes=10),
+        )
+        self.patient = baker.make(Patient, blood_group="unknown")
+
+    def book(self):
+        return lock_create_appointment(self.slot, self.patient, self.user, "Checkup")
+
+    def test_tokens_are_allocated_until_the_slot_is_full(self):
+        self.assertEqual(allocate_slot(self.slot), 1)
+        self.assertEqual(allocate_slot(self.slot), 2)
+        self.assertIsNone(allocate_slot(self.slot))
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.allocated, 2)
+
+    def test_full_slot_is_rejected(self):
+        self.book()
+        self.book()
+        with self.assertRaises(ValidationError):
+            self.book()
+        self.assertEqual(TokenBooking.objects.filter(token_slot=self.slot).count(), 2)
+
+    @mock.patch("care.emr.api.viewsets.scheduling.availability.time.sleep")
+    @mock.patch("care.emr.api.viewsets.scheduling.availability.allocate_slot")
+    def test_lock_timeout_is_retried(self, allocate, sleep):
+        allocate.side_effect = [lock_timeout(), 1]
+        booking = self.book()
+        self.assertEqual(booking.token_slot.allocated, 1)
+        self.assertEqual(allocate.call_count, 2)
+        sleep.assert_called_once()
+
+    @override_settings(BOOKING_MAX_RETRIES=2)
+    @mock.patch("care.emr.api.viewsets.scheduling.availability.time.sleep")
+    @mock.patch("care.emr.api.viewsets.scheduling.availability.allocate_slot")
+    def test_object_locked_after_retries(self, allocate, sleep):
+        allocate.side_effect = raise_lock_timeout
+        with self.assertRaises(ObjectLocked):
+            self.book()
+        self.assertEqual(allocate.call_count, 3)
+        self.assertFalse(TokenBooking.objects.filter(token_slot=self.slot).exists())
+
+    @mock.patch("care.emr.api.viewsets.scheduling.availability.allocate_slot")
+    def test_other_errors_are_not_retried(self, allocate):
+        allocate.side_effect = OperationalError("connection lost")
+        with self.assertRaises(OperationalError):
+            self.book()
+        allocate.assert_called_once()
@@ -0,0 +1,151 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+
+from care.emr.models import Encounter, Patient
+from care.emr.models.condition import Condition
+from care.emr.models.valueset import ValueSet, ValueSetConcept
+from care.emr.resources.condition.valueset import CARE_CODITION_CODE_VALUESET
+from care.emr.utils.preload import get_preloaded_object, preload_objects
+from care.utils.request_cache import RequestCache
+from care.utils.tests.base import CareAPITestBase
+
+SNOMED = "http://snomed.info/sct"
+CODES = [str(code) for code in range(100, 110)]
+
+
+class SymptomBulkUpsertTest(CareAPITestBase):
+    def setUp(self):
+        self.user = self.create_user(is_superuser=True)
+        self.patient = baker.make(Patient, blood_group="unknown")
+        self.encounter = baker.make(
+            Encounter,
+            patient=self.patient,
+            facility=self.create_facility(user=self.user),
+            status="in_progress",
+        )
+        valueset = ValueSet.objects.create(
+            slug=CARE_CODITION_CODE_VALUESET.slug,
+            name="Disease",
+            status="active",
+            compose={
+                "include": [
+                    {"system": SNOMED, "concept": [{"code": code} for code in CODES]}
+                ]
+            },
+        )
+        valueset.local_compose_hash = valueset.compose_hash
+        valueset.save(update_fields=["local_compose_hash"])
+        ValueSetConcept.objects.bulk_create(
+            ValueSetConcept(valueset=valueset, system=SNOMED, code=code)
+            for code in CODES
+        )
+        self.base_url = reverse(
+            "symptom-upsert",
+            kwargs={"patient_external_id": self.patient.external_id},
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def datapoint(self, code, **kwargs):
+        return {
+            "verification_status": "confirmed",
+            "code": {"system": SNOMED, "code": code, "display": code},
+            "encounter": str(self.encounter.external_id),
+            **kwargs,
+        }
+
+    def upsert(self, datapoints):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                self.base_url, {"datapoints": datapoints}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+        return response, len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_datapoints(self):
+        _, few = self.upsert([self.datapoint(code) for code in CODES[:2]])
+        _, many = self.upsert([self.datapoint(code) for code in CODES[2:8]])
+        self.assertEqual(few, many)
+
+    def test_updates_in_bulk(self):
+        response, _ = self.upsert([self.datapoint(code) for code in CODES[:3]])
+        updates = [
+            self.datapoint(item["code"]["code"], id=item["id"], severity="mild")
+            for item in response.json()
+        ]
+        response, _ = self.upsert(updates)
+        self.assertEqual(
+            Condition.objects.filter(patient=self.patient, severity="mild").count(), 3
+        )
+
+    def test_invalid_code_is_rejected(self):
+        response = self.client.post(
+            self.base_url,
+            {"datapoints": [self.datapoint(CODES[0]), self.datapoint("999")]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Condition.objects.filter(patient=self.patient).exists())
+
+    @override_settings(AUDIT_LOG_ENABLED=True)
+    def test_audit_events_recorded(self):
+        with mock.patch("care.audit_log.middleware.audit_buffer") as audit_buffer:
+            response, _ = self.upsert([self.datapoint(code) for code in CODES[:2]])
+            created = response.json()
+            self.upsert(
+                [
+                    self.datapoint(CODES[0], id=created[0]["id"], severity="mild"),
+                    self.datapoint(CODES[2]),
+                ]
+            )
+        events = [
+            event
+            for call in audit_buffer.extend.call_args_list
+            for event in call.args[0]
+        ]
+        conditions = [event for event in events if event.model == "emr.Condition"]
+        self.assertEqual(
+            [event.operation for event in conditions],
+            ["insert", "insert", "insert", "update"],
+        )
+        update = conditions[-1]
+        self.assertEqual(update.changes["severity"], "mild")
+        self.assertEqual(
+            update.entity_id,
+            Condition.objects.get(external_id=created[0]["id"]).id,
+        )
+        self.assertEqual(
+            len([e for e in events if e.model == "emr.QuestionnaireResponse"]), 4
+        )
+
+
+class PreloadedObjectsTest(CareAPITestBase):
+    def setUp(self):
+        self.encounter = baker.make(
+            Encounter,
+            patient=baker.make(Patient, blood_group="unknown"),
+            facility=self.create_facility(),
+            status="in_progress",
+        )
+        patcher = mock.patch.object(RequestCache, "teardown_callbacks", [])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+
+    def test_preloaded_encounter(self):
+        preload_objects([self.encounter])
+        self.assertIs(
+            get_preloaded_object(Encounter, self.encounter.external_id),
+            self.encounter,
+        )
+
+    def test_encounter_change_drops_preloaded_objects(self):
+        preload_objects([self.encounter])
+        Encounter.objects.get(id=self.encounter.id).save()
+        self.assertIsNone(get_preloaded_object(Encounter, self.encounter.external_id))
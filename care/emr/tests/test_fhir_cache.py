@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from care.emr.fhir.cache import FHIRResponseCache, fingerprint
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+PAYLOAD = {
+    "method": "POST",
+    "resource": "ValueSet/$validate-code",
+    "parameters": {"resourceType": "Parameters", "parameter": []},
+}
+
+RESULT = {
+    "resourceType": "Parameters",
+    "parameter": [{"name": "result", "valueBoolean": True}],
+}
+
+ERROR = {
+    "resourceType": "OperationOutcome",
+    "issue": [{"severity": "error", "code": "exception"}],
+}
+
+
+class InlineExecutor:
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FHIRResponseCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = FHIRResponseCache(prefix="test_fhir:")
+
+    def test_fingerprint_ignores_key_order(self):
+        self.assertEqual(
+            fingerprint({"a": 1, "b": {"c": 2, "d": 3}}),
+            fingerprint({"b": {"d": 3, "c": 2}, "a": 1}),
+        )
+
+    def test_responses_are_cached(self):
+        fetch = mock.Mock(return_value=RESULT)
+        self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), RESULT)
+        self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), RESULT)
+        fetch.assert_called_once()
+
+    def test_error_responses_are_not_cached(self):
+        for error in [ERROR, {"error": "Bad Gateway"}]:
+            fetch = mock.Mock(side_effect=[error, RESULT])
+            self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), error)
+            self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), RESULT)
+            self.assertEqual(fetch.call_count, 2)
+            cache.clear()
+
+    @override_settings(FHIR_CACHE_TTL={"validate-code": -1, "default": -1})
+    def test_stale_entry_is_served_and_refreshed(self):
+        self.cache.get_or_fetch(PAYLOAD, mock.Mock(return_value=RESULT))
+        updated = {**RESULT, "id": "updated"}
+        fetch = mock.Mock(return_value=updated)
+        with mock.patch(
+            "care.emr.fhir.cache.get_executor", return_value=InlineExecutor()
+        ):
+            self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), RESULT)
+            self.assertEqual(
+                self.cache.get_or_fetch(PAYLOAD, mock.Mock(return_value=RESULT)),
+                updated,
+            )
+        fetch.assert_called_once()
+
+    @override_settings(FHIR_CACHE_TTL={"validate-code": -1, "default": -1})
+    def test_failed_refresh_is_logged(self):
+        self.cache.get_or_fetch(PAYLOAD, mock.Mock(return_value=RESULT))
+        fetch = mock.Mock(side_effect=ConnectionError)
+        with (
+            mock.patch(
+                "care.emr.fhir.cache.get_executor", return_value=InlineExecutor()
+            ),
+            self.assertLogs("care.emr.fhir.cache", level="ERROR"),
+        ):
+            self.assertEqual(self.cache.get_or_fetch(PAYLOAD, fetch), RESULT)
+        # The refresh lock is released so the next request retries
+        self.assertIsNone(cache.get(f"{self.cache.get_key(PAYLOAD)}:refresh"))
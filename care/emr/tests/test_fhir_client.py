@@ -0,0 +1,90 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from care.emr.fhir.client import FHIRClient, fan_out
+from care.emr.fhir.metrics import FHIRMetrics
+from care.utils.request_cache import RequestCache
+
+
+class FanOutTest(SimpleTestCase):
+    def setUp(self):
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+
+    def test_results_are_returned_in_order(self):
+        self.assertEqual(
+            fan_out([lambda i=i: i * 2 for i in range(5)]), [0, 2, 4, 6, 8]
+        )
+
+    def test_calls_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        # Both calls must be waiting at the same time to pass the barrier
+        self.assertEqual(fan_out([barrier.wait, barrier.wait]).count(0), 1)
+
+    def test_request_cache_is_shared_with_workers(self):
+        RequestCache.get_namespace("test")["key"] = "value"
+        self.assertEqual(
+            fan_out([lambda: RequestCache.get_namespace("test")["key"]] * 2),
+            ["value", "value"],
+        )
+
+    def test_nested_fan_out_runs_in_the_worker(self):
+        def nested():
+            return fan_out([threading.get_ident, threading.get_ident])
+
+        for idents in fan_out([nested, nested]):
+            self.assertEqual(len(set(idents)), 1)
+
+    def test_exceptions_are_raised(self):
+        def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            fan_out([lambda: 1, fail])
+
+
+class FHIRClientTest(SimpleTestCase):
+    def setUp(self):
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+        self.client = FHIRClient("http://terminology")
+
+    def respond(self, ok=True):
+        response = mock.Mock(ok=ok)
+        response.json.return_value = {"resourceType": "Parameters"}
+        return response
+
+    def test_session_is_reused(self):
+        self.assertIs(self.client.session, self.client.session)
+        adapter = self.client.session.get_adapter("http://terminology")
+        self.assertEqual(adapter.max_retries.total, self.client.max_retries)
+
+    def test_queries_are_recorded(self):
+        with mock.patch.object(
+            self.client.session,
+            "request",
+            side_effect=[self.respond(), self.respond(ok=False)],
+        ) as request:
+            self.client.query_many(
+                [
+                    {
+                        "method": "POST",
+                        "resource": "ValueSet",
+                        "operation": "validate-code",
+                        "parameters": {},
+                    }
+                ]
+                * 2
+            )
+        request.assert_called_with(
+            "POST",
+            "http://terminology/ValueSet/$validate-code",
+            json={},
+            timeout=self.client.timeout,
+        )
+        metrics = FHIRMetrics.get_request_metrics()
+        self.assertEqual(metrics["calls"], 2)
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["operations"]["validate-code"]["calls"], 2)
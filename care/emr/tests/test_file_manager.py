@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from care.emr.utils.file_manager import S3FilesManager
+
+
+@mock.patch("care.emr.utils.file_manager.get_s3_client")
+class S3FilesManagerTest(SimpleTestCase):
+    def setUp(self):
+        self.manager = S3FilesManager("patient")
+        self.file = mock.Mock(file_type="patient", internal_name="abc.pdf")
+        self.file.name = "résumé"
+        self.file.get_extension.return_value = ".pdf"
+
+    def test_read_urls_are_downloaded_as_attachments(self, get_s3_client):
+        s3 = mock.Mock()
+        get_s3_client.return_value = (s3, "bucket")
+        self.manager.read_signed_urls([self.file, self.file], duration=60)
+        get_s3_client.assert_called_once_with("patient", external=True)
+        self.assertEqual(s3.generate_presigned_url.call_count, 2)
+        params = s3.generate_presigned_url.call_args.kwargs["Params"]
+        self.assertEqual(params["Key"], "patient/abc.pdf")
+        # Non ASCII names are encoded instead of breaking the header
+        self.assertEqual(
+            params["ResponseContentDisposition"],
+            "attachment; filename*=utf-8''r%C3%A9sum%C3%A9.pdf",
+        )
+        self.assertEqual(s3.generate_presigned_url.call_args.kwargs["ExpiresIn"], 60)
+
+    @override_settings(
+        FILE_MULTIPART_THRESHOLD=1024,
+        FILE_MULTIPART_CHUNK_SIZE=2048,
+        FILE_MULTIPART_MAX_CONCURRENCY=2,
+    )
+    def test_upload_uses_the_transfer_settings(self, get_s3_client):
+        s3 = mock.Mock()
+        get_s3_client.return_value = (s3, "bucket")
+        self.manager.upload_fileobj(self.file, mock.sentinel.file, ContentType="a/b")
+        args, kwargs = s3.upload_fileobj.call_args
+        self.assertEqual(args, (mock.sentinel.file, "bucket", "patient/abc.pdf"))
+        self.assertEqual(kwargs["ExtraArgs"], {"ContentType": "a/b"})
+        self.assertEqual(kwargs["Config"].multipart_threshold, 1024)
+        self.assertEqual(kwargs["Config"].multipart_chunksize, 2048)
+        self.assertEqual(kwargs["Config"].max_concurrency, 2)
+
+    def test_stream_closes_the_body(self, get_s3_client):
+        s3 = mock.Mock()
+        body = mock.Mock(**{"iter_chunks.return_value": iter([b"a", b"b"])})
+        s3.get_object.return_value = {"Body": body, "ContentLength": 2}
+        get_s3_client.return_value = (s3, "bucket")
+        response, chunks = self.manager.open_stream(
+            self.file, byte_range="bytes=0-1", chunk_size=1
+        )
+        self.assertEqual(response["ContentLength"], 2)
+        s3.get_object.assert_called_once_with(
+            Bucket="bucket", Key="patient/abc.pdf", Range="bytes=0-1"
+        )
+        body.close.assert_not_called()
+        self.assertEqual(list(chunks), [b"a", b"b"])
+        body.iter_chunks.assert_called_once_with(1)
+        body.close.assert_called_once()
@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.test import TestCase
+from model_bakery import baker
+
+from care.emr.models import FileUpload
+from care.emr.resources.file_upload.spec import FileUploadListSpec
+
+
+def sign(files):
+    return [f"https://bucket/{file.internal_name}" for file in files]
+
+
+class FileUploadListSpecTest(TestCase):
+    def test_read_urls_are_signed_in_one_batch(self):
+        uploaded = baker.make(
+            FileUpload,
+            file_type="patient",
+            upload_completed=True,
+            _quantity=2,
+        )
+        pending = baker.make(FileUpload, file_type="patient", upload_completed=False)
+        with mock.patch.object(
+            FileUpload.files_manager, "read_signed_urls", side_effect=sign
+        ) as read_signed_urls:
+            data = FileUploadListSpec.serialize_many([*uploaded, pending])
+        read_signed_urls.assert_called_once()
+        self.assertEqual(
+            [item["read_signed_url"] for item in data],
+            [*sign(uploaded), None],
+        )
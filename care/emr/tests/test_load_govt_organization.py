@@ -0,0 +1,75 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from care.emr.models.organization import Organization
+
+STATES = [{"state": "Kerala", "slug": "kl", "districts": "Ernakulam, Thrissur"}]
+LOCAL_BODY = {
+    "name": "Kochi",
+    "state": "Kerala",
+    "district": "Ernakulam",
+    "localbody_code": "C1",
+    "lsg_code": "C1",
+    "wards": [
+        {"name": "Fort", "ward_no": "1"},
+        {"name": "Fort", "ward_no": "2"},
+    ],
+}
+
+
+class LoadGovtOrganizationBulkTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        base_dir = Path(directory.name)
+        lsg_dir = base_dir / "data/india/kl/lsg"
+        lsg_dir.mkdir(parents=True)
+        (base_dir / "data/india/states-and-districts.json").write_text(
+            json.dumps(STATES)
+        )
+        (lsg_dir / "kochi.json").write_text(json.dumps(LOCAL_BODY))
+        settings_override = override_settings(BASE_DIR=base_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def load(self, *args):
+        call_command(
+            "load_govt_organization", "--state", "kl", "--bulk", *args, verbosity=0
+        )
+
+    def test_hierarchy_is_loaded_with_caches(self):
+        self.load("--load-districts", "--load-local-bodies", "--load-wards")
+        state = Organization.objects.get(name="Kerala")
+        district = Organization.objects.get(name="Ernakulam")
+        local_body = Organization.objects.get(name="Kochi")
+        wards = Organization.objects.filter(parent=local_body)
+        self.assertEqual(wards.count(), 2)
+        ward = wards.first()
+        self.assertEqual(ward.parent_cache, [state.id, district.id, local_body.id])
+        self.assertEqual(ward.level_cache, 3)
+        self.assertEqual(ward.root_org_id, state.id)
+        self.assertEqual(ward.cached_parent_json["name"], "Kochi")
+        self.assertEqual(ward.cached_parent_json["parent"]["parent"]["name"], "Kerala")
+        self.assertEqual(local_body.metadata["govt_org_type"], "corporation")
+        self.assertTrue(local_body.has_children)
+        self.assertFalse(Organization.objects.get(name="Thrissur").has_children)
+
+    def test_loading_again_creates_nothing(self):
+        self.load("--load-districts", "--load-local-bodies", "--load-wards")
+        count = Organization.objects.count()
+        self.load("--load-districts", "--load-local-bodies", "--load-wards")
+        self.assertEqual(Organization.objects.count(), count)
+
+    def test_levels_are_added_to_existing_organizations(self):
+        self.load("--load-districts")
+        state = Organization.objects.get(name="Kerala")
+        self.assertFalse(Organization.objects.filter(name="Kochi").exists())
+        self.load("--load-districts", "--load-local-bodies")
+        self.assertEqual(Organization.objects.filter(name="Kerala").count(), 1)
+        local_body = Organization.objects.get(name="Kochi")
+        self.assertEqual(local_body.root_org_id, state.id)
+        self.assertEqual(local_body.parent.name, "Ernakulam")
@@ -0,0 +1,136 @@
+import datetime as dt
+
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework import status
+
+from care.emr.models import Encounter, Patient
+from care.emr.models.observation import Observation
+from care.utils.tests.base import CareAPITestBase
+
+LOINC = "http://loinc.org"
+HEART_RATE = "8867-4"
+TEMPERATURE = "8310-5"
+
+
+class ObservationAnalyseTest(CareAPITestBase):
+    def setUp(self):
+        # Buckets are truncated in the current timezone
+        self.start = timezone.make_aware(dt.datetime(2026, 1, 5, 9))
+        self.user = self.create_user(is_superuser=True)
+        self.patient = baker.make(Patient, blood_group="unknown")
+        facility = self.create_facility(user=self.user)
+        self.encounter = self.create_encounter(facility)
+        self.other_encounter = self.create_encounter(facility)
+        self.url = reverse(
+            "observation-analyse",
+            kwargs={"patient_external_id": self.patient.external_id},
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def create_encounter(self, facility):
+        return baker.make(
+            Encounter,
+            patient=self.patient,
+            facility=facility,
+            status="in_progress",
+        )
+
+    def observe(self, code, value, minutes, encounter=None):
+        return baker.make(
+            Observation,
+            patient=self.patient,
+            encounter=encounter or self.encounter,
+            data_entered_by=self.user,
+            main_code={"system": LOINC, "code": code},
+            value=value,
+            effective_datetime=self.start + dt.timedelta(minutes=minutes),
+        )
+
+    def analyse(self, query="", **data):
+        data.setdefault(
+            "codes",
+            [
+                {"system": LOINC, "code": HEART_RATE},
+                {"system": LOINC, "code": TEMPERATURE},
+            ],
+        )
+        response = self.client.post(f"{self.url}{query}", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.json())
+        return {
+            item["code"]["code"]: item["results"] for item in response.json()["results"]
+        }
+
+    def test_generated_columns(self):
+        quantity = self.observe(HEART_RATE, {"value_quantity": {"value": " 72.5 "}}, 0)
+        plain = self.observe(TEMPERATURE, {"value": "-1"}, 0)
+        text = self.observe(TEMPERATURE, {"value": "normal"}, 0)
+        values = dict(
+            Observation.objects.filter(code_system=LOINC).values_list(
+                "id", "value_numeric"
+            )
+        )
+        self.assertEqual(values[quantity.id], 72.5)
+        self.assertEqual(values[plain.id], -1)
+        self.assertIsNone(values[text.id])
+        self.assertEqual(
+            Observation.objects.get(id=quantity.id).code,
+            HEART_RATE,
+        )
+
+    def test_hourly_buckets(self):
+        for minutes, value in [(0, "60"), (30, "80"), (60, "100")]:
+            self.observe(HEART_RATE, {"value": value}, minutes)
+        self.observe(HEART_RATE, {"value": "irregular"}, 10)
+        self.observe(TEMPERATURE, {"value": "37"}, 5)
+
+        results = self.analyse(aggregate="hour")
+        self.assertEqual(
+            [
+                (bucket["min"], bucket["max"], bucket["avg"], bucket["count"])
+                for bucket in results[HEART_RATE]
+            ],
+            [(60, 80, 70, 2), (100, 100, 100, 1)],
+        )
+        self.assertEqual(
+            dt.datetime.fromisoformat(results[HEART_RATE][0]["start"]),
+            self.start,
+        )
+        self.assertEqual(len(results[TEMPERATURE]), 1)
+
+    def test_time_range_and_encounter_filter(self):
+        for minutes in range(0, 240, 60):
+            self.observe(HEART_RATE, {"value": str(minutes)}, minutes)
+        self.observe(HEART_RATE, {"value": "500"}, 0, encounter=self.other_encounter)
+
+        results = self.analyse(
+            f"?encounter={self.encounter.external_id}",
+            aggregate="hour",
+            start=(self.start + dt.timedelta(hours=1)).isoformat(),
+            end=(self.start + dt.timedelta(hours=3)).isoformat(),
+        )
+        self.assertEqual(
+            [bucket["max"] for bucket in results[HEART_RATE]],
+            [60, 120],
+        )
+
+    def test_latest_observations_per_code(self):
+        for minutes in range(5):
+            self.observe(HEART_RATE, {"value": str(minutes)}, minutes)
+        self.observe(TEMPERATURE, {"value": "37"}, 0)
+
+        results = self.analyse(page_size=3)
+        self.assertEqual(len(results[HEART_RATE]), 3)
+        self.assertEqual(len(results[TEMPERATURE]), 1)
+
+    def test_invalid_interval(self):
+        response = self.client.post(
+            self.url,
+            {
+                "codes": [{"system": LOINC, "code": HEART_RATE}],
+                "aggregate": "fortnight",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
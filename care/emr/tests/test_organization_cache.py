@@ -0,0 +1,141 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from model_bakery import baker
+
+from care.emr.models import Patient
+from care.emr.models.organization import FacilityOrganization, Organization
+from care.utils.tests.base import CareAPITestBase
+
+
+class OrganizationParentJsonTest(TestCase):
+    def setUp(self):
+        self.state = Organization.objects.create(name="State", org_type="govt")
+        self.district = Organization.objects.create(
+            name="District", org_type="govt", parent=self.state
+        )
+        self.ward = Organization.objects.create(
+            name="Ward", org_type="govt", parent=self.district
+        )
+
+    def test_parent_json_set_on_create(self):
+        ward = Organization.objects.get(id=self.ward.id)
+        self.assertEqual(ward.cached_parent_json["name"], "District")
+        self.assertEqual(ward.cached_parent_json["parent"]["name"], "State")
+        self.assertEqual(ward.cached_parent_json["parent"]["parent"], {})
+        self.assertEqual(
+            ward.cached_parent_json,
+            Organization.build_parent_json(
+                ward.parent_cache, Organization.load_ancestors([ward], {})
+            ),
+        )
+
+    def test_legacy_cached_parent_json_is_ignored(self):
+        Organization.objects.filter(id=self.ward.id).update(
+            cached_parent_json={
+                "name": "Old District",
+                "parent": {},
+                "cache_expiry": "2025-01-01 00:00:00+00:00",
+            }
+        )
+        ward = Organization.objects.get(id=self.ward.id)
+        self.assertEqual(ward.get_parent_json()["name"], "District")
+
+    def test_rebuild_command_replaces_legacy_entries(self):
+        Organization.objects.filter(id=self.ward.id).update(
+            cached_parent_json={"name": "Old", "cache_expiry": "2025-01-01"}
+        )
+        call_command("rebuild_organization_caches", stdout=mock.Mock())
+        ward = Organization.objects.get(id=self.ward.id)
+        self.assertEqual(ward.cached_parent_json["name"], "District")
+        self.assertNotIn("cache_expiry", ward.cached_parent_json)
+
+
+@mock.patch("care.emr.signals.rebuild_organization_dependent_caches_task")
+@mock.patch("care.emr.signals.refresh_organization_parent_json_task")
+class OrganizationSignalTest(TestCase):
+    def setUp(self):
+        self.state = Organization.objects.create(name="State", org_type="govt")
+
+    def test_create_does_not_rewrite_subtree(self, refresh_task, rebuild_task):
+        with self.captureOnCommitCallbacks(execute=True):
+            Organization.objects.create(
+                name="District", org_type="govt", parent=self.state
+            )
+        refresh_task.delay.assert_not_called()
+        rebuild_task.delay.assert_not_called()
+
+    def test_unchanged_save_does_not_rewrite_subtree(self, refresh_task, rebuild_task):
+        state = Organization.objects.get(id=self.state.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            state.active = False
+            state.save()
+        refresh_task.delay.assert_not_called()
+
+    def test_rename_rewrites_subtree(self, refresh_task, rebuild_task):
+        state = Organization.objects.get(id=self.state.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            state.name = "New State"
+            state.save()
+        refresh_task.delay.assert_called_once_with("emr.Organization", state.id)
+        rebuild_task.delay.assert_not_called()
+        # A second save without changes does not enqueue again
+        with self.captureOnCommitCallbacks(execute=True):
+            state.save()
+        refresh_task.delay.assert_called_once()
+
+    def test_move_rebuilds_dependent_caches(self, refresh_task, rebuild_task):
+        other = Organization.objects.create(name="Other State", org_type="govt")
+        district = Organization.objects.create(
+            name="District", org_type="govt", parent=self.state
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            district.move(other)
+        refresh_task.delay.assert_called_once_with("emr.Organization", district.id)
+        rebuild_task.delay.assert_called_once_with("emr.Organization", district.id)
+        self.assertEqual(district.parent_cache, [other.id])
+
+
+class OrganizationCacheBackfillTest(CareAPITestBase):
+    def setUp(self):
+        self.state = Organization.objects.create(name="State", org_type="govt")
+        self.district = Organization.objects.create(
+            name="District", org_type="govt", parent=self.state
+        )
+
+    def test_rebuild_command_backfills_patient_cache(self):
+        patient = baker.make(
+            Patient, blood_group="unknown", geo_organization=self.district
+        )
+        Patient.objects.filter(id=patient.id).update(organization_cache=[self.state.id])
+        call_command("rebuild_organization_caches", stdout=mock.Mock())
+        patient.refresh_from_db()
+        self.assertEqual(
+            sorted(patient.organization_cache), [self.state.id, self.district.id]
+        )
+
+    def test_skip_dependent_leaves_patient_cache(self):
+        patient = baker.make(
+            Patient, blood_group="unknown", geo_organization=self.district
+        )
+        Patient.objects.filter(id=patient.id).update(organization_cache=[])
+        call_command(
+            "rebuild_organization_caches", "--skip-dependent", stdout=mock.Mock()
+        )
+        patient.refresh_from_db()
+        self.assertEqual(patient.organization_cache, [])
+
+    def test_facility_organization_cannot_move_across_facilities(self):
+        facility = self.create_facility()
+        other_facility = self.create_facility()
+        department = FacilityOrganization.objects.create(
+            name="Department", org_type="dept", facility=facility
+        )
+        other_root = FacilityOrganization.objects.get(
+            facility=other_facility, org_type="root"
+        )
+        with self.assertRaises(ValueError):
+            department.move(other_root)
+        department.refresh_from_db()
+        self.assertNotEqual(department.parent_id, other_root.id)
@@ -0,0 +1,112 @@
+from django.test import TestCase
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework import status
+
+from care.emr.api.viewsets.encounter import EncounterFilters
+from care.emr.api.viewsets.patient import PatientFilters
+from care.emr.models import Encounter, Patient
+from care.emr.utils.patient_search import (
+    filter_phone_number,
+    mask_phone_number,
+    normalize_phone_number,
+    phonetic_key,
+)
+from care.security.permissions.patient import PatientPermissions
+from care.utils.tests.base import CareAPITestBase
+
+
+def make_patient(**kwargs):
+    return baker.make(Patient, blood_group="unknown", **kwargs)
+
+
+class PatientSearchKeysTest(TestCase):
+    def test_normalize_phone_number(self):
+        self.assertEqual(normalize_phone_number("+91 98765-43210"), "9876543210")
+        self.assertEqual(normalize_phone_number("98765"), "98765")
+        self.assertEqual(normalize_phone_number("abc"), "")
+
+    def test_phonetic_key(self):
+        self.assertEqual(phonetic_key("Preethi"), phonetic_key("Priti"))
+        self.assertEqual(phonetic_key("Shiva"), phonetic_key("Siva"))
+
+    def test_mask_phone_number(self):
+        self.assertEqual(mask_phone_number("+919876543210"), "*********3210")
+        self.assertEqual(mask_phone_number("123"), "123")
+
+
+class PhoneNumberFilterTest(CareAPITestBase):
+    def setUp(self):
+        self.patient = make_patient(phone_number="+919876543210")
+        self.other = make_patient(phone_number="+919123456789")
+
+    def filter_list(self, phone_number):
+        return set(
+            PatientFilters({"phone_number": phone_number}, Patient.objects.all()).qs
+        )
+
+    def test_list_filter_matches_exactly(self):
+        self.assertEqual(self.filter_list("98765 43210"), {self.patient})
+        self.assertEqual(self.filter_list("+91-9876543210"), {self.patient})
+        self.assertEqual(self.filter_list("98765"), set())
+
+    def test_encounter_filter_matches_partial_numbers(self):
+        facility = self.create_facility()
+        encounter = baker.make(Encounter, patient=self.patient, facility=facility)
+        baker.make(Encounter, patient=self.other, facility=facility)
+
+        def filter_encounters(phone_number):
+            return set(
+                EncounterFilters(
+                    {"phone_number": phone_number}, Encounter.objects.all()
+                ).qs
+            )
+
+        self.assertEqual(filter_encounters("+91 98765 43210"), {encounter})
+        self.assertEqual(filter_encounters("65432"), {encounter})
+        self.assertEqual(filter_encounters("210"), {encounter})
+        self.assertEqual(filter_encounters("-"), set())
+
+    def test_input_without_digits_matches_nothing(self):
+        self.assertEqual(self.filter_list("+"), set())
+        self.assertFalse(filter_phone_number(Patient.objects.all(), "-").exists())
+
+    def test_partial_numbers_in_search(self):
+        self.assertEqual(
+            set(filter_phone_number(Patient.objects.all(), "6543")), {self.patient}
+        )
+
+
+class PatientRankedSearchTest(CareAPITestBase):
+    def setUp(self):
+        self.base_url = reverse("patient-search-ranked")
+        self.user = self.create_user()
+        self.organization = self.create_organization(org_type="govt")
+        role = self.create_role_with_permissions(
+            permissions=[PatientPermissions.can_list_patients.name]
+        )
+        self.attach_role_organization_user(self.organization, self.user, role)
+        self.visible = make_patient(
+            name="Preethi",
+            phone_number="+919876543210",
+            geo_organization=self.organization,
+        )
+        self.hidden = make_patient(name="Priti", phone_number="+919876543211")
+
+    def test_results_are_scoped_and_masked(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.base_url, {"name": "Priti", "phone_number": "98765"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["name"], "Preethi")
+        self.assertEqual(results[0]["phone_number"], "*********3210")
+
+    def test_search_terms_required(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.base_url, {"phone_number": "98"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
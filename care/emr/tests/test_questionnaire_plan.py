@@ -0,0 +1,313 @@
+import copy
+import uuid
+from datetime import datetime
+
+from dateutil import parser
+from django.test import TestCase
+
+from care.emr.resources.questionnaire.plan import (
+    QuestionnairePlan,
+    get_questionnaire_plan,
+)
+from care.emr.resources.questionnaire.spec import QuestionType
+from care.emr.resources.questionnaire_response.spec import QuestionnaireSubmitResult
+
+
+# Reference implementation, the recursive walk handle_response used before questionnaires were
+# compiled into plans. The plan must produce the same errors and observations.
+def legacy_check_required(question, mapping):
+    if question.get("required", False):
+        return True
+    if question.get("parent"):
+        return legacy_check_required(mapping[question["parent"]], mapping)
+    return False
+
+
+def legacy_validate_data(values, value_type):
+    errors = []
+    for value in values:
+        if value.value is None:
+            continue
+        try:
+            if value_type == QuestionType.integer.value:
+                int(value.value)
+            elif value_type == QuestionType.decimal.value:
+                float(value.value)
+            elif value_type == QuestionType.boolean.value:
+                if value.value.lower() not in ["true", "false", "1", "0"]:
+                    errors.append(f"Invalid boolean value: {value.value}")
+            elif value_type == QuestionType.date.value:
+                parser.parse(value.value).date()
+            elif value_type == QuestionType.datetime.value:
+                parser.parse(value.value)
+            elif value_type == QuestionType.time.value:
+                datetime.strptime(value.value, "%H:%M:%S")  # noqa DTZ007
+        except ValueError:
+            errors.append(f"Invalid {value_type}")
+        except Exception:
+            errors.append(f"Error validating {value_type}")
+    return errors
+
+
+def legacy_validate(question, responses, errors, parent, mapping, lookups):  # noqa PLR0912
+    question["parent"] = parent
+    if question["type"] == QuestionType.structured.value:
+        return
+    if question["type"] == QuestionType.group.value:
+        mapping[question["id"]] = question
+        for child in question["questions"] or []:
+            legacy_validate(child, responses, errors, question["id"], mapping, lookups)
+        return
+    if question["id"] not in responses:
+        if question.get("required", False):
+            errors.append(
+                {"question_id": question["id"], "error": "Question not answered"}
+            )
+        return
+    values = responses[question["id"]].values
+    if not values and legacy_check_required(question, mapping):
+        errors.append(
+            {
+                "question_id": question["id"],
+                "type": "values_missing",
+                "msg": "No value provided for question",
+            }
+        )
+        return
+    if question.get("repeats", False):
+        values = values[0:1]
+    errors.extend(
+        {"type": "type_error", "question_id": question["id"], "msg": error}
+        for error in legacy_validate_data(values, question["type"])
+    )
+    if question["type"] == QuestionType.choice.value and question.get(
+        "answer_value_set"
+    ):
+        for value in values:
+            if not value.value_code:
+                errors.append(
+                    {
+                        "type": "type_error",
+                        "question_id": question["id"],
+                        "msg": "Coding is required",
+                    }
+                )
+                return
+            lookups.append(
+                (question["id"], question["answer_value_set"], value.value_code)
+            )
+    if question["type"] == QuestionType.quantity.value:
+        for value in values:
+            if not value.value_quantity:
+                errors.append(
+                    {
+                        "type": "type_error",
+                        "question_id": question["id"],
+                        "msg": "Quantity is required",
+                    }
+                )
+                return
+            if "answer_value_set" in question:
+                lookups.append(
+                    (
+                        question["id"],
+                        question["answer_value_set"],
+                        value.value_quantity.code,
+                    )
+                )
+
+
+def legacy_observation(question, responses, parent_id=None):
+    spec = {"value_type": question["type"]}
+    if "code" in question:
+        spec["main_code"] = question["code"]
+    if question["type"] == QuestionType.group.value:
+        spec["id"] = str(uuid.uuid4())
+        spec["value"] = {}
+        return [spec]
+    response = responses.get(question["id"])
+    if not (response and response.values and response.values[0]):
+        return []
+    value = response.values[-1]
+    observation = spec.copy()
+    observation["id"] = str(uuid.uuid4())
+    if question["type"] == QuestionType.choice.value and value.value_code:
+        observation["value"] = {
+            "value_code": value.value_code.model_dump(
+                mode="json", exclude_defaults=True
+            )
+        }
+    elif question["type"] == QuestionType.quantity.value and value.value_quantity:
+        observation["value"] = {
+            "value_quantity": value.value_quantity.model_dump(
+                mode="json", exclude_defaults=True
+            )
+        }
+    else:
+        observation["value"] = {"value": value.value}
+    if response.note:
+        observation["note"] = response.note
+    if parent_id:
+        observation["parent"] = parent_id
+    return [observation]
+
+
+def legacy_observations(questionnaire, responses, parent_id=None):
+    observations = []
+    for question in questionnaire.get("questions", []):
+        if question["type"] == QuestionType.group.value:
+            group = legacy_observation(question, responses, parent_id)
+            children = legacy_observations(question, responses, group[0]["id"])
+            if children:
+                observations.extend(group)
+                observations.extend(children)
+        elif question.get("code"):
+            observations.extend(legacy_observation(question, responses, parent_id))
+    return observations
+
+
+def normalize(observations, id_key):
+    """
+    Observations with the generated ids replaced by positions so that both outputs can be compared
+    """
+    positions = {str(obs[id_key]): index for index, obs in enumerate(observations)}
+    normalized = []
+    for obs in observations:
+        item = {
+            "value_type": obs["value_type"],
+            "main_code": obs.get("main_code"),
+            "value": {k: v for k, v in obs["value"].items() if v is not None},
+            "note": obs.get("note"),
+            "parent": positions[str(obs["parent"])] if obs.get("parent") else None,
+        }
+        normalized.append(item)
+    return normalized
+
+
+def coding(code):
+    return {"system": "http://loinc.org", "code": code, "display": code}
+
+
+def question(question_type, **kwargs):
+    return {"id": str(uuid.uuid4()), "type": question_type, **kwargs}
+
+
+class QuestionnairePlanTest(TestCase):
+    def setUp(self):
+        self.temperature = question("decimal", code=coding("8310-5"), required=True)
+        self.pulse = question("integer", code=coding("8867-4"), repeats=True)
+        self.notes = question("string")
+        self.inner_rate = question("integer", code=coding("9279-1"))
+        self.inner_flag = question("boolean", code=coding("1111-1"))
+        self.inner_group = question(
+            "group", required=True, questions=[self.inner_rate, self.inner_flag]
+        )
+        self.vitals = question(
+            "group",
+            code=coding("85353-1"),
+            questions=[self.temperature, self.pulse, self.notes, self.inner_group],
+        )
+        self.unit = question(
+            "quantity", code=coding("29463-7"), answer_value_set="unit"
+        )
+        self.structured = question("structured")
+        self.time = question("time", code=coding("2222-2"))
+        self.questions = [self.vitals, self.unit, self.structured, self.time]
+
+    def result(self, q, values, note=None):
+        return QuestionnaireSubmitResult(question_id=q["id"], values=values, note=note)
+
+    def compare(self, results):
+        responses = {str(r.question_id): r for r in results}
+
+        legacy_errors = []
+        legacy_lookups = []
+        legacy_questions = copy.deepcopy(self.questions)
+        for q in legacy_questions:
+            legacy_validate(q, responses, legacy_errors, None, {}, legacy_lookups)
+
+        lookups = []
+        errors, observations = QuestionnairePlan(self.questions).process(
+            responses, lookups
+        )
+        self.assertEqual(errors, legacy_errors)
+        self.assertEqual(
+            [(qid, slug) for qid, slug, _ in lookups],
+            [(qid, slug) for qid, slug, _ in legacy_lookups],
+        )
+        self.assertEqual(
+            normalize(observations, "external_id"),
+            normalize(
+                legacy_observations({"questions": legacy_questions}, responses), "id"
+            ),
+        )
+        return errors, observations
+
+    def test_valid_submission(self):
+        errors, observations = self.compare(
+            [
+                self.result(self.temperature, [{"value": "98.6"}], note="oral"),
+                self.result(self.pulse, [{"value": "72"}, {"value": "75"}]),
+                self.result(self.inner_rate, [{"value": "18"}]),
+                self.result(
+                    self.unit,
+                    [{"value_quantity": {"value": 60, "code": coding("kg")}}],
+                ),
+                self.result(self.time, [{"value": "10:30:00"}]),
+            ]
+        )
+        self.assertEqual(errors, [])
+        # vitals group, temperature, pulse, inner group, inner rate, unit, time
+        self.assertEqual(len(observations), 7)
+
+    def test_required_and_type_errors(self):
+        errors, _ = self.compare(
+            [
+                self.result(self.pulse, [{"value": "fast"}, {"value": "also bad"}]),
+                self.result(self.inner_rate, []),
+                self.result(self.inner_flag, [{"value": "maybe"}]),
+                self.result(self.unit, [{"value": "60"}]),
+                self.result(self.time, [{"value": "25:99"}]),
+            ]
+        )
+        self.assertEqual(
+            [(e["question_id"], e.get("msg", e.get("error"))) for e in errors],
+            [
+                (self.temperature["id"], "Question not answered"),
+                (self.pulse["id"], "Invalid integer"),
+                (self.inner_rate["id"], "No value provided for question"),
+                (self.inner_flag["id"], "Invalid boolean value: maybe"),
+                (self.unit["id"], "Quantity is required"),
+                (self.time["id"], "Invalid time"),
+            ],
+        )
+
+    def test_unanswered_groups_are_skipped(self):
+        _, observations = self.compare(
+            [
+                self.result(self.temperature, [{"value": "98.6"}]),
+                self.result(self.time, [{"value": "10:30:00"}]),
+            ]
+        )
+        # The inner group has no answered question and is not recorded
+        self.assertEqual(len(observations), 3)
+
+    def test_questionnaire_json_is_not_mutated(self):
+        questions = copy.deepcopy(self.questions)
+        QuestionnairePlan(self.questions).process(
+            {self.temperature["id"]: self.result(self.temperature, [{"value": "1"}])},
+            [],
+        )
+        self.assertEqual(self.questions, questions)
+
+    def test_plan_cached_per_version(self):
+        class Questionnaire:
+            id = 1
+            modified_date = datetime(2025, 1, 1)
+            questions = self.questions
+
+        questionnaire = Questionnaire()
+        plan = get_questionnaire_plan(questionnaire)
+        self.assertIs(get_questionnaire_plan(questionnaire), plan)
+        questionnaire.modified_date = datetime(2025, 1, 2)
+        self.assertIsNot(get_questionnaire_plan(questionnaire), plan)
@@ -0,0 +1,119 @@
+import uuid
+
+from model_bakery import baker
+
+from care.emr.models import Encounter, Observation, Patient, Questionnaire
+from care.emr.resources.questionnaire.utils import handle_response
+from care.emr.resources.questionnaire_response.spec import QuestionnaireSubmitRequest
+from care.utils.tests.base import CareAPITestBase
+
+
+def coding(code):
+    return {"system": "http://loinc.org", "code": code, "display": code}
+
+
+class QuestionnaireSubmitTest(CareAPITestBase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.patient = baker.make(Patient, name="Test Patient", blood_group="unknown")
+        self.encounter = baker.make(
+            Encounter,
+            patient=self.patient,
+            facility=self.create_facility(user=self.user),
+        )
+        self.temperature_id = str(uuid.uuid4())
+        self.pulse_id = str(uuid.uuid4())
+        self.rate_id = str(uuid.uuid4())
+        self.comment_id = str(uuid.uuid4())
+        self.questionnaire = baker.make(
+            Questionnaire,
+            subject_type="encounter",
+            questions=[
+                {
+                    "id": str(uuid.uuid4()),
+                    "type": "group",
+                    "questions": [
+                        {
+                            "id": self.temperature_id,
+                            "type": "decimal",
+                            "code": coding("8310-5"),
+                        },
+                        {
+                            "id": str(uuid.uuid4()),
+                            "type": "group",
+                            "questions": [
+                                {
+                                    "id": self.pulse_id,
+                                    "type": "integer",
+                                    "code": coding("8867-4"),
+                                }
+                            ],
+                        },
+                    ],
+                },
+                {"id": self.rate_id, "type": "integer", "code": coding("9279-1")},
+                {"id": self.comment_id, "type": "string"},
+            ],
+        )
+
+    def submit(self, results):
+        request = QuestionnaireSubmitRequest(
+            resource_id=self.encounter.external_id,
+            encounter=self.encounter.external_id,
+            patient=self.patient.external_id,
+            results=results,
+        )
+        timings = {}
+        response = handle_response(self.questionnaire, request, self.user, timings)
+        return response, timings
+
+    def test_observations_created_with_parents(self):
+        response, timings = self.submit(
+            [
+                {"question_id": self.temperature_id, "values": [{"value": "98.6"}]},
+                {"question_id": self.pulse_id, "values": [{"value": "72"}]},
+                {"question_id": self.rate_id, "values": [{"value": "18"}]},
+                {"question_id": self.comment_id, "values": [{"value": "ok"}]},
+            ]
+        )
+        observations = {
+            obs.external_id: obs
+            for obs in Observation.objects.filter(questionnaire_response=response)
+        }
+        # Outer group, temperature, inner group, pulse and rate, the comment has no code
+        self.assertEqual(len(observations), 5)
+        by_code = {
+            obs.main_code.get("code"): obs
+            for obs in observations.values()
+            if obs.main_code
+        }
+        groups = [obs for obs in observations.values() if obs.value_type == "group"]
+        self.assertEqual(len(groups), 2)
+
+        temperature = by_code["8310-5"]
+        pulse = by_code["8867-4"]
+        rate = by_code["9279-1"]
+        self.assertEqual(temperature.value, {"value": "98.6"})
+        outer = observations[temperature.parent]
+        inner = observations[pulse.parent]
+        self.assertEqual(outer.value_type, "group")
+        self.assertEqual(inner.value_type, "group")
+        self.assertNotEqual(outer.id, inner.id)
+        self.assertIsNone(rate.parent)
+        for obs in observations.values():
+            self.assertEqual(obs.patient_id, self.patient.id)
+            self.assertEqual(obs.encounter_id, self.encounter.id)
+            self.assertEqual(obs.data_entered_by_id, self.user.id)
+            self.assertEqual(obs.subject_id, self.encounter.external_id)
+        self.assertEqual(
+            set(timings),
+            {"lookup", "validate", "valuesets", "response", "observations"},
+        )
+
+    def test_unanswered_group_is_not_recorded(self):
+        response, _ = self.submit(
+            [{"question_id": self.rate_id, "values": [{"value": "18"}]}]
+        )
+        observations = Observation.objects.filter(questionnaire_response=response)
+        self.assertEqual(observations.count(), 1)
+        self.assertEqual(observations.get().main_code["code"], "9279-1")
@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from care.emr.models.organization import Organization
+from care.emr.resources.organization.spec import (
+    OrganizationBaseSpec,
+    OrganizationReadSpec,
+)
+
+
+class SerializerPlanTest(TestCase):
+    def test_plan_is_computed_once_per_class(self):
+        base = OrganizationBaseSpec.get_serializer_plan()
+        read = OrganizationReadSpec.get_serializer_plan()
+        self.assertIsNot(base, read)
+        self.assertIs(read, OrganizationReadSpec.get_serializer_plan())
+        self.assertIn("has_children", read["attributes"])
+        self.assertNotIn("has_children", base["attributes"])
+        # Excluded fields are left to perform_extra_serialization
+        self.assertNotIn("parent", read["attributes"])
+        self.assertNotIn("meta", read["output_fields"])
+
+    def test_serialize_many_matches_serialize(self):
+        state = Organization.objects.create(name="State", org_type="govt")
+        Organization.objects.create(
+            name="District",
+            org_type="govt",
+            parent=state,
+            metadata={"code": "D1"},
+        )
+        organizations = list(Organization.objects.order_by("id"))
+        self.assertEqual(
+            OrganizationReadSpec.serialize_many(organizations),
+            [
+                OrganizationReadSpec.serialize(organization).to_json()
+                for organization in organizations
+            ],
+        )
+
+    def test_values_are_json_ready(self):
+        organization = Organization.objects.create(name="State", org_type="govt")
+        data = OrganizationReadSpec.serialize_many([organization])[0]
+        self.assertEqual(data["level_cache"], 0)
+        self.assertEqual(data["parent"], {})
+        self.assertEqual(data["id"], str(organization.external_id))
@@ -0,0 +1,149 @@
+import datetime as dt
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from care.emr.utils.scheduling import (
+    SlotCalculator,
+    SlotWindow,
+    clear_materialized_days,
+    ensure_slots,
+    get_materialized_day_cache_key,
+    get_materialized_generation,
+    materialize_slots,
+    merge_intervals,
+)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+MONDAY = dt.date(2026, 1, 5)
+
+
+def at(hour, minute=0):
+    return hour * 60 + minute
+
+
+class SlotWindowTest(SimpleTestCase):
+    def test_merge_intervals(self):
+        self.assertEqual(
+            merge_intervals([(30, 40), (0, 10), (5, 20), (20, 25)]),
+            [(0, 25), (30, 40)],
+        )
+
+    def test_slots_start_before_the_end(self):
+        self.assertEqual(SlotWindow(1, at(9), at(10), 20, 1).slot_count, 3)
+        self.assertEqual(SlotWindow(1, at(9), at(10, 10), 20, 1).slot_count, 4)
+        self.assertEqual(SlotWindow(1, at(10), at(9), 20, 1).slot_count, 0)
+        self.assertEqual(SlotWindow(1, at(9), at(10), 0, 1).slot_count, 0)
+
+    def test_only_overlapping_slots_are_blocked(self):
+        window = SlotWindow(1, at(9), at(10), 20, 1)
+        exceptions = [(at(9, 30), at(9, 45))]
+        self.assertEqual(list(window.available_slots(exceptions)), [(at(9), at(9, 20))])
+        self.assertEqual(window.available_slot_count(exceptions), 1)
+        # Exceptions touching a slot boundary do not block it
+        self.assertEqual(
+            list(window.available_slots([(at(9, 20), at(9, 40))])),
+            [(at(9), at(9, 20)), (at(9, 40), at(10))],
+        )
+
+
+class SlotCalculatorTest(SimpleTestCase):
+    def setUp(self):
+        schedules = [
+            {
+                "id": 1,
+                "valid_from": dt.datetime.combine(MONDAY, dt.time.min),
+                "valid_to": dt.datetime.combine(
+                    MONDAY + dt.timedelta(days=13), dt.time.max
+                ),
+            }
+        ]
+        availabilities = [
+            {
+                "id": 10,
+                "schedule_id": 1,
+                "slot_size_in_minutes": 30,
+                "tokens_per_slot": 2,
+                "availability": [
+                    {"day_of_week": day, "start_time": "09:00", "end_time": "12:00"}
+                    for day in range(5)
+                ],
+            }
+        ]
+        exceptions = [
+            {
+                "valid_from": MONDAY + dt.timedelta(days=1),
+                "valid_to": MONDAY + dt.timedelta(days=1),
+                "start_time": dt.time(10),
+                "end_time": dt.time(11),
+            }
+        ]
+        self.calculator = SlotCalculator(schedules, availabilities, exceptions)
+
+    def test_daily_totals(self):
+        totals = self.calculator.daily_totals(MONDAY, MONDAY + dt.timedelta(days=15))
+        self.assertEqual(totals[MONDAY], 12)
+        # Two slots are blocked by the exception
+        self.assertEqual(totals[MONDAY + dt.timedelta(days=1)], 8)
+        # Weekends have no availability, days after the schedule ends have no slots
+        self.assertEqual(totals[MONDAY + dt.timedelta(days=5)], 0)
+        self.assertEqual(totals[MONDAY + dt.timedelta(days=14)], 0)
+
+    def test_totals_match_the_slots(self):
+        for offset in range(15):
+            day = MONDAY + dt.timedelta(days=offset)
+            self.assertEqual(
+                self.calculator.total_tokens(day),
+                sum(
+                    window.tokens_per_slot
+                    for window, _, _ in self.calculator.slots_for_day(day)
+                ),
+            )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@mock.patch("care.emr.utils.scheduling.TokenSlot.objects.bulk_create")
+@mock.patch(
+    "care.emr.utils.scheduling.get_slot_calculator",
+    **{"return_value.slots_for_day.return_value": []},
+)
+class MaterializedDaysTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.resource = mock.Mock(id=1)
+        self.day = dt.date(2026, 1, 1)
+
+    def test_materialized_day_is_skipped(self, get_slot_calculator, bulk_create):
+        ensure_slots(self.resource, self.day)
+        ensure_slots(self.resource, self.day)
+        get_slot_calculator.assert_called_once()
+
+    def test_days_are_marked_separately(self, get_slot_calculator, bulk_create):
+        materialize_slots(self.resource, self.day, days=2)
+        generation = get_materialized_generation(self.resource.id)
+        for offset in range(3):
+            day = self.day + dt.timedelta(days=offset)
+            self.assertEqual(
+                cache.get(
+                    get_materialized_day_cache_key(self.resource.id, generation, day)
+                ),
+                1 if offset < 2 else None,  # noqa PLR2004
+            )
+
+    def test_schedule_change_materializes_again(self, get_slot_calculator, bulk_create):
+        ensure_slots(self.resource, self.day)
+        clear_materialized_days(self.resource.id)
+        ensure_slots(self.resource, self.day)
+        self.assertEqual(get_slot_calculator.call_count, 2)
+
+    def test_change_during_materialization_is_not_lost(
+        self, get_slot_calculator, bulk_create
+    ):
+        # The schedules change after the slots were computed but before the day is marked
+        bulk_create.side_effect = lambda *args, **kwargs: clear_materialized_days(
+            self.resource.id
+        )
+        ensure_slots(self.resource, self.day)
+        ensure_slots(self.resource, self.day)
+        self.assertEqual(get_slot_calculator.call_count, 2)
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from care.emr.fhir.resources.code_concept import MinimalCodeConcept
+from care.emr.fhir.schema.base import Coding
+from care.emr.models.valueset import ValueSet, ValueSetConcept, ValueSetTooLargeError
+
+SNOMED = "http://snomed.info/sct"
+FILTERED_COMPOSE = {
+    "include": [
+        {
+            "system": SNOMED,
+            "filter": [{"property": "concept", "op": "is-a", "value": "404684003"}],
+        }
+    ]
+}
+
+
+def concept(code, display):
+    return MinimalCodeConcept(system=SNOMED, code=code, display=display)
+
+
+def coding(code):
+    return Coding(system=SNOMED, code=code)
+
+
+class ValueSetLocalConceptsTest(TestCase):
+    def setUp(self):
+        self.valueset = ValueSet.objects.create(
+            slug="findings", name="Findings", status="active", compose=FILTERED_COMPOSE
+        )
+        patcher = mock.patch("care.emr.models.valueset.ValueSetResource")
+        self.resource = patcher.start().return_value.filter.return_value
+        self.addCleanup(patcher.stop)
+
+    def test_sync_pages_through_expansion(self):
+        self.resource.search.side_effect = [
+            [concept("1", "Fever"), concept("2", "Cough")],
+            [concept("3", "Dry cough")],
+        ]
+        self.assertEqual(self.valueset.sync_local_concepts(page_size=2), 3)
+        self.assertEqual(self.resource.search.call_count, 2)
+        self.assertEqual(
+            ValueSetConcept.objects.filter(valueset=self.valueset).count(), 3
+        )
+        self.assertTrue(self.valueset.has_local_concepts)
+
+    def test_local_concepts_answer_lookups_and_searches(self):
+        self.resource.search.return_value = [
+            concept("1", "Fever"),
+            concept("2", "Dry cough"),
+            concept("3", "Cough"),
+        ]
+        self.valueset.sync_local_concepts()
+        self.resource.reset_mock()
+        self.assertTrue(self.valueset.lookup(coding("1")))
+        self.assertFalse(self.valueset.lookup(coding("4")))
+        self.assertEqual(
+            [result.code for result in self.valueset.search("cough")], ["3", "2"]
+        )
+        self.resource.lookup.assert_not_called()
+        self.resource.search.assert_not_called()
+
+    def test_changed_compose_falls_back_to_remote(self):
+        self.resource.search.return_value = [concept("1", "Fever")]
+        self.valueset.sync_local_concepts()
+        self.valueset.compose = {
+            "include": [{"system": SNOMED, "concept": [{"code": "2"}]}]
+        }
+        self.valueset.save()
+        self.assertFalse(self.valueset.has_local_concepts)
+        # Enumerated compositions are answered without the terminology server
+        self.assertTrue(self.valueset.lookup(coding("2")))
+        self.assertFalse(self.valueset.lookup(coding("1")))
+        self.resource.lookup.assert_not_called()
+
+    def test_large_valuesets_are_not_synced(self):
+        self.resource.search.return_value = [concept("1", "Fever")] * 2 + [
+            concept("2", "Cough")
+        ]
+        with self.assertRaises(ValueSetTooLargeError):
+            self.valueset.sync_local_concepts(max_concepts=1)
+        self.assertFalse(self.valueset.has_local_concepts)
+
+
+class LookupEnumeratedTest(TestCase):
+    def test_enumerated_compositions(self):
+        composition = {
+            "include": [{"system": SNOMED, "concept": [{"code": "1"}, {"code": "2"}]}],
+            "exclude": [{"system": SNOMED, "concept": [{"code": "2"}]}],
+        }
+        self.assertTrue(ValueSet.lookup_enumerated(composition, "1"))
+        self.assertFalse(ValueSet.lookup_enumerated(composition, "2"))
+        self.assertFalse(ValueSet.lookup_enumerated(composition, "3"))
+
+    def test_filtered_compositions_need_the_server(self):
+        self.assertIsNone(ValueSet.lookup_enumerated(FILTERED_COMPOSE, "1"))
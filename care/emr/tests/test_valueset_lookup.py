@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from care.emr.fhir.schema.base import Coding
+from care.emr.models.valueset import ValueSet, ValueSetConcept
+from care.emr.registries.care_valueset.care_valueset import (
+    lookup_valuesets,
+    validate_valueset,
+)
+from care.utils.request_cache import RequestCache
+
+SNOMED = "http://snomed.info/sct"
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def coding(code):
+    return Coding(system=SNOMED, code=code)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ValuesetLookupTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.local = ValueSet.objects.create(
+            slug="local-valueset",
+            name="Local",
+            status="active",
+            compose={"include": [{"system": SNOMED, "filter": []}]},
+        )
+        self.local.local_compose_hash = self.local.compose_hash
+        self.local.save(update_fields=["local_compose_hash"])
+        ValueSetConcept.objects.create(valueset=self.local, system=SNOMED, code="1")
+        self.remote = ValueSet.objects.create(
+            slug="remote-valueset",
+            name="Remote",
+            status="active",
+            compose={"include": [{"system": SNOMED, "filter": []}]},
+        )
+
+    def test_local_lookups_batched_and_cached(self):
+        lookups = [("local-valueset", coding(code)) for code in ["1", "2", "1"]]
+        # Valuesets and concepts are fetched with one query each
+        with self.assertNumQueries(2):
+            results = lookup_valuesets(lookups)
+        self.assertEqual(
+            results,
+            {
+                ("local-valueset", SNOMED, "1"): True,
+                ("local-valueset", SNOMED, "2"): False,
+            },
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(lookup_valuesets(lookups), results)
+
+    def test_missing_valueset(self):
+        self.assertEqual(
+            lookup_valuesets([("missing", coding("1"))]),
+            {("missing", SNOMED, "1"): None},
+        )
+        with self.assertRaisesMessage(ValueError, "Valueset does not exist"):
+            validate_valueset("code", "missing", coding("1"))
+
+    def test_undetermined_remote_results_are_not_cached(self):
+        key = ("remote-valueset", SNOMED, "5")
+        with mock.patch.object(
+            ValueSet, "lookup_remote", side_effect=[None, True]
+        ) as lookup_remote:
+            self.assertEqual(
+                lookup_valuesets([("remote-valueset", coding("5"))]), {key: False}
+            )
+            self.assertEqual(
+                lookup_valuesets([("remote-valueset", coding("5"))]), {key: True}
+            )
+            self.assertEqual(
+                lookup_valuesets([("remote-valueset", coding("5"))]), {key: True}
+            )
+        self.assertEqual(lookup_remote.call_count, 2)
+
+    def test_request_memo_answers_validators(self):
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+        lookup_valuesets(
+            [("local-valueset", coding("1")), ("local-valueset", coding("2"))]
+        )
+        with self.assertNumQueries(0):
+            validate_valueset("code", "local-valueset", coding("1"))
+            with self.assertRaisesMessage(ValueError, "Code does not exist"):
+                validate_valueset("code", "local-valueset", coding("2"))
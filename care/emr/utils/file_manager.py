@@ -1,6 +1,16 @@
-import boto3
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from django.utils.http import content_disposition_header
 
-from care.utils.csp.config import get_client_config
+from care.utils.csp.client import get_s3_client
+
+
+def get_transfer_config():
+    return TransferConfig(
+        multipart_threshold=settings.FILE_MULTIPART_THRESHOLD,
+        multipart_chunksize=settings.FILE_MULTIPART_CHUNK_SIZE,
+        max_concurrency=settings.FILE_MULTIPART_MAX_CONCURRENCY,
+    )
 
 
 class FileManger:
@@ -15,12 +25,14 @@ class S3FilesManager(FileManger):
     def __init__(self, bucket_type):
         self.bucket_type = bucket_type
 
+    def get_key(self, file_obj):
+        return f"{file_obj.file_type}/{file_obj.internal_name}"
+
     def signed_url(self, file_obj, duration=60 * 60, mime_type=None):
-        config, bucket_name = get_client_config(self.bucket_type, external=True)
-        s3 = boto3.client("s3", **config)
+        s3, bucket_name = get_s3_client(self.bucket_type, external=True)
         params = {
             "Bucket": bucket_name,
-            "Key": f"{file_obj.file_type}/{file_obj.internal_name}",
+            "Key": self.get_key(file_obj),
         }
         if mime_type:
             params["ContentType"] = mime_type
@@ -31,34 +43,44 @@ class S3FilesManager(FileManger):
         )
 
     def read_signed_url(self, file_obj, duration=60 * 60):
-        config, bucket_name = get_client_config(self.bucket_type, external=True)
-        s3 = boto3.client("s3", **config)
-        return s3.generate_presigned_url(
-            "get_object",
-            Params={
-                "Bucket": bucket_name,
-                "Key": f"{file_obj.file_type}/{file_obj.internal_name}",
-                "ResponseContentDisposition": f"attachment; filename={file_obj.name}{file_obj.get_extension()}",
-            },
-            ExpiresIn=duration,  # seconds
-        )
+        return self.read_signed_urls([file_obj], duration=duration)[0]
+
+    def read_signed_urls(self, file_objs, duration=60 * 60):
+        """
+        Presign download URLs for many files, presigning is done locally with a shared client
+        so no network calls are made
+        """
+        s3, bucket_name = get_s3_client(self.bucket_type, external=True)
+        return [
+            s3.generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": bucket_name,
+                    "Key": self.get_key(file_obj),
+                    "ResponseContentDisposition": content_disposition_header(
+                        as_attachment=True,
+                        filename=f"{file_obj.name}{file_obj.get_extension()}",
+                    ),
+                },
+                ExpiresIn=duration,  # seconds
+            )
+            for file_obj in file_objs
+        ]
 
     def put_object(self, file_obj, file, **kwargs):
-        config, bucket_name = get_client_config(self.bucket_type)
-        s3 = boto3.client("s3", **config)
+        s3, bucket_name = get_s3_client(self.bucket_type)
         return s3.put_object(
             Body=file,
             Bucket=bucket_name,
-            Key=f"{file_obj.file_type}/{file_obj.internal_name}",
+            Key=self.get_key(file_obj),
             **kwargs,
         )
 
     def get_object(self, file_obj, **kwargs):
-        config, bucket_name = get_client_config(self.bucket_type)
-        s3 = boto3.client("s3", **config)
+        s3, bucket_name = get_s3_client(self.bucket_type)
         return s3.get_object(
             Bucket=bucket_name,
-            Key=f"{file_obj.file_type}/{file_obj.internal_name}",
+            Key=self.get_key(file_obj),
             **kwargs,
         )
 
@@ -67,3 +89,41 @@ class S3FilesManager(FileManger):
         content_type = response["ContentType"]
         content = response["Body"].read()
         return content_type, content
+
+    def head_object(self, file_obj):
+        s3, bucket_name = get_s3_client(self.bucket_type)
+        return s3.head_object(Bucket=bucket_name, Key=self.get_key(file_obj))
+
+    def upload_fileobj(self, file_obj, file, **kwargs):
+        """
+        Uploads a file like object, files larger than FILE_MULTIPART_THRESHOLD are sent as
+        a multipart upload, so at most FILE_MULTIPART_MAX_CONCURRENCY parts are held in memory at a time
+        """
+        s3, bucket_name = get_s3_client(self.bucket_type)
+        s3.upload_fileobj(
+            file,
+            bucket_name,
+            self.get_key(file_obj),
+            ExtraArgs=kwargs or None,
+            Config=get_transfer_config(),
+        )
+
+    def open_stream(self, file_obj, byte_range=None, chunk_size=None):
+        """
+        Returns the S3 response metadata and an iterator over the object body in chunks,
+        byte_range is an HTTP range ("bytes=0-1023") and is passed through to S3.
+        The body is closed once the iterator is exhausted or closed.
+        """
+        kwargs = {"Range": byte_range} if byte_range else {}
+        response = self.get_object(file_obj, **kwargs)
+        body = response["Body"]
+
+        def iterator():
+            try:
+                yield from body.iter_chunks(
+                    chunk_size or settings.FILE_STREAM_CHUNK_SIZE
+                )
+            finally:
+                body.close()
+
+        return response, iterator()
@@ -0,0 +1,182 @@
+from django.apps import apps
+from django.db import connection, transaction
+
+ORGANIZATION_CACHE_BATCH_SIZE = 5000
+
+# Tables referenced by the cache expressions, resolved from the models so renames are picked up
+CACHE_TABLES = {
+    "organization": "emr.Organization",
+    "facility_organization": "emr.FacilityOrganization",
+    "patient_organization": "emr.PatientOrganization",
+    "encounter_organization": "emr.EncounterOrganization",
+    "questionnaire_organization": "emr.QuestionnaireOrganization",
+    "questionnaire_facility_organization": "emr.QuestionnaireFacilityOrganization",
+}
+
+# Set based equivalents of Patient.rebuild_organization_cache, Facility.sync_cache,
+# Encounter.sync_organization_cache and the questionnaire cache syncs, `t` is the row being updated
+PATIENT_ORGANIZATION_CACHE = """
+ARRAY(
+    SELECT DISTINCT unnest(o.parent_cache || o.id)
+    FROM {organization} o
+    WHERE o.id = t.geo_organization_id
+    OR o.id IN (
+        SELECT po.organization_id FROM {patient_organization} po
+        WHERE po.patient_id = t.id AND NOT po.deleted
+    )
+)
+"""
+
+FACILITY_GEO_ORGANIZATION_CACHE = """
+COALESCE(
+    (SELECT o.parent_cache || o.id FROM {organization} o WHERE o.id = t.geo_organization_id),
+    '{{}}'::integer[]
+)
+"""
+
+FACILITY_INTERNAL_ORGANIZATION_CACHE = """
+ARRAY(
+    SELECT DISTINCT unnest(o.parent_cache || o.id)
+    FROM {facility_organization} o
+    WHERE o.facility_id = t.id AND NOT o.deleted
+)
+"""
+
+ENCOUNTER_FACILITY_ORGANIZATION_CACHE = """
+ARRAY(
+    SELECT DISTINCT unnest(o.parent_cache || o.id)
+    FROM {facility_organization} o
+    WHERE o.id IN (
+        SELECT eo.organization_id FROM {encounter_organization} eo
+        WHERE eo.encounter_id = t.id AND NOT eo.deleted
+    )
+    OR (o.facility_id = t.facility_id AND o.org_type = 'root' AND NOT o.deleted)
+)
+"""
+
+QUESTIONNAIRE_ORGANIZATION_CACHE = """
+ARRAY(
+    SELECT DISTINCT unnest(o.parent_cache || o.id)
+    FROM {organization} o
+    WHERE o.id IN (
+        SELECT qo.organization_id FROM {questionnaire_organization} qo
+        WHERE qo.questionnaire_id = t.id AND NOT qo.deleted
+    )
+)
+"""
+
+QUESTIONNAIRE_INTERNAL_ORGANIZATION_CACHE = """
+ARRAY(
+    SELECT DISTINCT unnest(o.parent_cache || o.id)
+    FROM {facility_organization} o
+    WHERE o.id IN (
+        SELECT qo.organization_id FROM {questionnaire_facility_organization} qo
+        WHERE qo.questionnaire_id = t.id AND NOT qo.deleted
+    )
+)
+"""
+
+# Organization model -> (model, array column, expression) of every cache built from its parent_cache
+DEPENDENT_ORGANIZATION_CACHES = {
+    "emr.Organization": [
+        ("emr.Patient", "organization_cache", PATIENT_ORGANIZATION_CACHE),
+        (
+            "facility.Facility",
+            "geo_organization_cache",
+            FACILITY_GEO_ORGANIZATION_CACHE,
+        ),
+        ("emr.Questionnaire", "organization_cache", QUESTIONNAIRE_ORGANIZATION_CACHE),
+    ],
+    "emr.FacilityOrganization": [
+        (
+            "emr.Encounter",
+            "facility_organization_cache",
+            ENCOUNTER_FACILITY_ORGANIZATION_CACHE,
+        ),
+        (
+            "facility.Facility",
+            "internal_organization_cache",
+            FACILITY_INTERNAL_ORGANIZATION_CACHE,
+        ),
+        (
+            "emr.Questionnaire",
+            "internal_organization_cache",
+            QUESTIONNAIRE_INTERNAL_ORGANIZATION_CACHE,
+        ),
+    ],
+}
+
+
+def get_table(label):
+    return connection.ops.quote_name(apps.get_model(label)._meta.db_table)  # noqa SLF001
+
+
+def rebuild_cache(label, column, expression, organization_id=None, batch_size=None):
+    """
+    Rebuild an organization array column from the membership tables in keyset batches, each batch is
+    a single UPDATE in its own transaction so locks are held briefly. Only rows whose array includes
+    organization_id are rebuilt when it is given. Returns the number of rows rebuilt.
+    """
+    tables = {name: get_table(label) for name, label in CACHE_TABLES.items()}
+    table = get_table(label)
+    quoted_column = connection.ops.quote_name(column)
+    condition = f"{quoted_column} @> %(organization)s AND" if organization_id else ""
+    query = f"""
+        UPDATE {table} t
+        SET {quoted_column} = {expression.format(**tables)}
+        FROM (
+            SELECT id FROM {table}
+            WHERE {condition} id > %(last_id)s
+            ORDER BY id
+            LIMIT %(batch_size)s
+        ) batch
+        WHERE t.id = batch.id
+        RETURNING t.id
+    """  # noqa S608
+    count = 0
+    last_id = 0
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                query,
+                {
+                    "organization": [organization_id],
+                    "last_id": last_id,
+                    "batch_size": batch_size or ORGANIZATION_CACHE_BATCH_SIZE,
+                },
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+        count += len(ids)
+        last_id = max(ids)
+    return count
+
+
+def rebuild_dependent_caches(
+    model_label, organization_id, batch_size=ORGANIZATION_CACHE_BATCH_SIZE
+):
+    """
+    Rebuild every denormalized organization array that includes the organization after its subtree
+    was moved. Returns the number of rows rebuilt per cache.
+    """
+    return {
+        f"{label}.{column}": rebuild_cache(
+            label, column, expression, organization_id, batch_size
+        )
+        for label, column, expression in DEPENDENT_ORGANIZATION_CACHES[model_label]
+    }
+
+
+def rebuild_all_dependent_caches(batch_size=ORGANIZATION_CACHE_BATCH_SIZE):
+    """
+    Rebuild every denormalized organization array of every row, used to backfill caches
+    that were computed differently in the past. Returns the number of rows rebuilt per cache.
+    """
+    return {
+        f"{label}.{column}": rebuild_cache(
+            label, column, expression, batch_size=batch_size
+        )
+        for caches in DEPENDENT_ORGANIZATION_CACHES.values()
+        for label, column, expression in caches
+    }
@@ -0,0 +1,152 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import OperationalError, connection, models, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Greatest, Lower, Right, Upper
+from rest_framework.exceptions import ValidationError
+
+QUERY_CANCELED = "57014"
+
+PHONE_NUMBER_DIGITS = 10
+
+# Rewrites applied in order to a lower cased name so that common transliteration variants of Indian
+# names share a key (Preethi / Priti, Mohammed / Muhamad, Shiva / Siva ...). The same rules build
+# the generated column on Patient and the key of a search term, so they must use the regex syntax
+# common to Python and Postgres.
+PHONETIC_RULES = [
+    ("[^a-z ]", ""),
+    ("ee|ea|ie", "i"),
+    ("oo|ou", "u"),
+    ("w", "v"),
+    ("z", "j"),
+    ("x", "ks"),
+    ("ck|q", "k"),
+    ("ph", "f"),
+    ("([bcdgkpst])h", "\\1"),
+    ("y( |$)", "i\\1"),
+    ("([a-z])\\1+", "\\1"),
+    ("a( |$)", "\\1"),
+    (" +", " "),
+    ("^ | $", ""),
+]
+
+
+def phonetic_key(name: str) -> str:
+    key = name.lower()
+    for pattern, replacement in PHONETIC_RULES:
+        key = re.sub(pattern, replacement, key)
+    return key
+
+
+def phonetic_key_expression(field):
+    """
+    Database expression equivalent to phonetic_key
+    """
+    expression = Lower(field)
+    for pattern, replacement in PHONETIC_RULES:
+        expression = models.Func(
+            expression,
+            Value(pattern),
+            Value(replacement),
+            Value("g"),
+            function="REGEXP_REPLACE",
+            output_field=models.CharField(),
+        )
+    return expression
+
+
+def normalize_phone_number(phone_number: str) -> str:
+    """
+    Last ten digits of a phone number, country code and formatting are dropped
+    """
+    return re.sub("[^0-9]", "", phone_number)[-PHONE_NUMBER_DIGITS:]
+
+
+def normalized_phone_number_expression(field):
+    """
+    Database expression equivalent to normalize_phone_number
+    """
+    return Right(
+        models.Func(
+            field,
+            Value("[^0-9]"),
+            Value(""),
+            Value("g"),
+            function="REGEXP_REPLACE",
+            output_field=models.CharField(),
+        ),
+        PHONE_NUMBER_DIGITS,
+    )
+
+
+def filter_phone_number(queryset, phone_number, field="phone_number_normalized"):
+    """
+    Complete numbers are matched exactly, partial numbers by their digits anywhere in the number.
+    Input without any digit matches no patient.
+    """
+    digits = normalize_phone_number(phone_number)
+    if not digits:
+        return queryset.none()
+    if len(digits) == PHONE_NUMBER_DIGITS:
+        return queryset.filter(**{field: digits})
+    return queryset.filter(**{f"{field}__contains": digits})
+
+
+def mask_phone_number(phone_number: str, visible=4) -> str:
+    """
+    Phone number with all but the last few digits replaced
+    """
+    if len(phone_number) <= visible:
+        return phone_number
+    return "*" * (len(phone_number) - visible) + phone_number[-visible:]
+
+
+def search_patients(queryset, name="", phone_number="", year_of_birth=None, limit=20):
+    """
+    Patients matching the phone number and year of birth whose name is similar to, contains or sounds
+    like the name, best matches first. The query is cancelled after PATIENT_SEARCH_TIMEOUT so that
+    a vague search cannot hold a connection, a ValidationError asks for a more specific search then.
+    """
+    if phone_number:
+        queryset = filter_phone_number(queryset, phone_number)
+    if year_of_birth:
+        queryset = queryset.filter(year_of_birth=year_of_birth)
+    name = name.strip()
+    if name:
+        # Compared in upper case to use the same trigram index as the icontains filters
+        term = name.upper()
+        key = phonetic_key(name)
+        queryset = queryset.annotate(name_upper=Upper("name"))
+        matches = Q(name_upper__trigram_similar=term) | Q(name_upper__contains=term)
+        similarity = TrigramSimilarity("name_upper", term)
+        if key:
+            matches |= Q(name_phonetic__trigram_similar=key)
+            similarity = Greatest(similarity, TrigramSimilarity("name_phonetic", key))
+        queryset = (
+            queryset.filter(matches)
+            .annotate(rank=similarity)
+            .order_by("-rank", "-modified_date")
+        )
+    else:
+        queryset = queryset.order_by("-modified_date")
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('statement_timeout'), set_config('statement_timeout', %s, true)",
+                [f"{settings.PATIENT_SEARCH_TIMEOUT}ms"],
+            )
+            statement_timeout = cursor.fetchone()[0]
+            results = list(queryset[:limit])
+            # The timeout would otherwise apply to the rest of the request's transaction
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)", [statement_timeout]
+            )
+            return results
+    except OperationalError as e:
+        if getattr(e.__cause__, "sqlstate", None) != QUERY_CANCELED:
+            raise
+        raise ValidationError(
+            {"type": "search_timeout", "msg": "Search took too long, add more details"}
+        ) from e
@@ -0,0 +1,25 @@
+from care.utils.request_cache import RequestCache
+
+PRELOADED_OBJECTS_REQUEST_CACHE_NAMESPACE = "preloaded_objects"
+
+
+def preload_objects(objs):
+    """
+    Make objects fetched in bulk available to code that looks them up one at a time by external id,
+    the objects are only kept for the duration of the request
+    """
+    preloaded = RequestCache.get_namespace(PRELOADED_OBJECTS_REQUEST_CACHE_NAMESPACE)
+    if preloaded is None:
+        return
+    for obj in objs:
+        preloaded[(obj._meta.label, str(obj.external_id))] = obj  # noqa SLF001
+
+
+def get_preloaded_object(model, external_id):
+    """
+    Returns the preloaded object of the model with the given external id, or None if it was not preloaded
+    """
+    preloaded = RequestCache.get_namespace(PRELOADED_OBJECTS_REQUEST_CACHE_NAMESPACE)
+    if not preloaded:
+        return None
+    return preloaded.get((model._meta.label, str(external_id)))  # noqa SLF001
@@ -0,0 +1,293 @@
+import datetime as dt
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from care.emr.models.scheduling.booking import TokenSlot
+from care.emr.models.scheduling.schedule import (
+    Availability,
+    AvailabilityException,
+    Schedule,
+)
+from care.emr.resources.scheduling.schedule.spec import SlotTypeOptions
+
+TOKEN_SLOT_BATCH_SIZE = 1000
+# Days are marked materialized for a limited time, longer than the interval of the daily job.
+# An expired mark only costs an insert of slots that already exist
+MATERIALIZED_DAY_TIMEOUT = 2 * 24 * 60 * 60
+
+
+def to_minutes(value: dt.time | str) -> int:
+    """
+    Minutes since midnight of a time or an ISO formatted time string
+    """
+    if isinstance(value, str):
+        value = dt.time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+
+def from_minutes(minutes: int) -> dt.time:
+    return dt.time(minutes // 60, minutes % 60)
+
+
+def merge_intervals(intervals):
+    """
+    Sorted, non overlapping union of half open (start, end) intervals
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+class SlotWindow:
+    """
+    An availability on a day of week, slots start every `slot_size` minutes from `start`
+    while they start before `end`
+    """
+
+    __slots__ = ("availability_id", "end", "slot_size", "start", "tokens_per_slot")
+
+    def __init__(self, availability_id, start, end, slot_size, tokens_per_slot):
+        self.availability_id = availability_id
+        self.start = start
+        self.end = end
+        self.slot_size = slot_size
+        self.tokens_per_slot = tokens_per_slot
+
+    @property
+    def slot_count(self):
+        if self.slot_size <= 0 or self.end <= self.start:
+            return 0
+        return -((self.start - self.end) // self.slot_size)
+
+    def blocked_ranges(self, exceptions):
+        """
+        Ranges of slot indices overlapping the merged exception intervals, the ranges are merged as well
+        since two exceptions can overlap the same slot
+        """
+        count = self.slot_count
+        ranges = []
+        for exception_start, exception_end in exceptions:
+            first = max((exception_start - self.start) // self.slot_size, 0)
+            last = min(-((self.start - exception_end) // self.slot_size), count)
+            if first >= last:
+                continue
+            if ranges and first <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], last)
+            else:
+                ranges.append([first, last])
+        return ranges
+
+    def available_slot_count(self, exceptions):
+        return self.slot_count - sum(
+            last - first for first, last in self.blocked_ranges(exceptions)
+        )
+
+    def available_slots(self, exceptions):
+        """
+        (start, end) minute offsets of the slots that do not overlap any exception
+        """
+        index = 0
+        count = self.slot_count
+        for first, last in [*self.blocked_ranges(exceptions), [count, count]]:
+            for slot in range(index, first):
+                start = self.start + slot * self.slot_size
+                yield start, start + self.slot_size
+            index = last
+
+
+class SlotCalculator:
+    """
+    Interval based slot calculation for a resource.
+
+    Availabilities are expanded once into slot windows per schedule and day of week, exceptions are
+    merged into disjoint minute intervals per day and subtracted from the windows arithmetically,
+    so the cost depends on the number of windows and exceptions rather than the number of slots.
+    Days sharing a day of week, schedules and exceptions are only computed once.
+
+    `schedules` and `exceptions` are dicts as returned by `.values()` on Schedule and AvailabilityException,
+    `availabilities` is an iterable of Availability values.
+    """
+
+    def __init__(self, schedules, availabilities, exceptions):
+        self.schedules = list(schedules)
+        self.exceptions = list(exceptions)
+        self.windows = defaultdict(list)
+        for availability in availabilities:
+            for available_slot in availability["availability"]:
+                self.windows[
+                    (availability["schedule_id"], available_slot["day_of_week"])
+                ].append(
+                    SlotWindow(
+                        availability["id"],
+                        to_minutes(available_slot["start_time"]),
+                        to_minutes(available_slot["end_time"]),
+                        availability["slot_size_in_minutes"],
+                        availability["tokens_per_slot"],
+                    )
+                )
+        self._totals = {}
+
+    def get_windows(self, day: dt.date):
+        day_of_week = day.weekday()
+        return [
+            window
+            for schedule in self.schedules
+            if schedule["valid_from"].date() <= day <= schedule["valid_to"].date()
+            for window in self.windows[(schedule["id"], day_of_week)]
+        ]
+
+    def get_exceptions(self, day: dt.date):
+        return merge_intervals(
+            (to_minutes(exception["start_time"]), to_minutes(exception["end_time"]))
+            for exception in self.exceptions
+            if exception["valid_from"] <= day <= exception["valid_to"]
+        )
+
+    def slots_for_day(self, day: dt.date):
+        """
+        (window, start, end) of every available slot on the day, start and end are minute offsets
+        """
+        exceptions = self.get_exceptions(day)
+        for window in self.get_windows(day):
+            for start, end in window.available_slots(exceptions):
+                yield window, start, end
+
+    def total_tokens(self, day: dt.date):
+        windows = self.get_windows(day)
+        exceptions = self.get_exceptions(day)
+        key = (
+            day.weekday(),
+            tuple(id(window) for window in windows),
+            tuple(exceptions),
+        )
+        if key not in self._totals:
+            self._totals[key] = sum(
+                window.available_slot_count(exceptions) * window.tokens_per_slot
+                for window in windows
+            )
+        return self._totals[key]
+
+    def daily_totals(self, from_date: dt.date, to_date: dt.date):
+        """
+        Available tokens for each day from from_date up to (excluding) to_date
+        """
+        totals = {}
+        day = from_date
+        while day < to_date:
+            totals[day] = self.total_tokens(day)
+            day += dt.timedelta(days=1)
+        return totals
+
+
+def get_slot_calculator(resource, from_date, to_date):
+    """
+    Slot calculator for the appointment availabilities of a resource over a period,
+    schedules, availabilities and exceptions are loaded with one query each
+    """
+    schedules = Schedule.objects.filter(
+        valid_from__lte=to_date,
+        valid_to__gte=from_date,
+        resource=resource,
+    ).values("id", "valid_from", "valid_to")
+    availabilities = Availability.objects.filter(
+        schedule__in=schedules.values("id"),
+        slot_type=SlotTypeOptions.appointment.value,
+    ).values(
+        "id",
+        "schedule_id",
+        "availability",
+        "slot_size_in_minutes",
+        "tokens_per_slot",
+    )
+    exceptions = AvailabilityException.objects.filter(
+        valid_from__lte=to_date,
+        valid_to__gte=from_date,
+        resource=resource,
+    ).values("valid_from", "valid_to", "start_time", "end_time")
+    return SlotCalculator(schedules, availabilities, exceptions)
+
+
+def get_materialized_generation_cache_key(resource_id):
+    return f"token_slots:materialized:{resource_id}"
+
+
+def get_materialized_generation(resource_id):
+    """
+    Materialized days are recorded under a generation that changes whenever the schedules
+    of the resource change, so marks made before the change are ignored
+    """
+    return cache.get_or_set(
+        get_materialized_generation_cache_key(resource_id),
+        uuid.uuid4().hex,
+        timeout=None,
+    )
+
+
+def get_materialized_day_cache_key(resource_id, generation, day):
+    return f"token_slots:materialized:{resource_id}:{generation}:{day}"
+
+
+def clear_materialized_days(resource_id):
+    """
+    Called when the schedules of a resource change so that slots are computed again
+    """
+    cache.set(
+        get_materialized_generation_cache_key(resource_id),
+        uuid.uuid4().hex,
+        timeout=None,
+    )
+
+
+def materialize_slots(resource, from_date, days=1):
+    """
+    Create the missing slots of a resource for `days` days starting at from_date with a single insert,
+    slots that already exist are skipped through the unique constraint on TokenSlot
+    """
+    to_date = from_date + dt.timedelta(days=days)
+    # Read before the schedules so a concurrent change invalidates the marks made below
+    generation = get_materialized_generation(resource.id)
+    calculator = get_slot_calculator(resource, from_date, to_date)
+    tzinfo = timezone.now().tzinfo
+    slots = []
+    day = from_date
+    while day < to_date:
+        midnight = dt.datetime.combine(day, dt.time.min, tzinfo=tzinfo)
+        slots.extend(
+            TokenSlot(
+                resource=resource,
+                availability_id=window.availability_id,
+                start_datetime=midnight + dt.timedelta(minutes=start),
+                end_datetime=midnight + dt.timedelta(minutes=end),
+            )
+            for window, start, end in calculator.slots_for_day(day)
+        )
+        day += dt.timedelta(days=1)
+    TokenSlot.objects.bulk_create(
+        slots, ignore_conflicts=True, batch_size=TOKEN_SLOT_BATCH_SIZE
+    )
+    for offset in range(days):
+        cache.add(
+            get_materialized_day_cache_key(
+                resource.id, generation, from_date + dt.timedelta(days=offset)
+            ),
+            1,
+            timeout=MATERIALIZED_DAY_TIMEOUT,
+        )
+    return len(slots)
+
+
+def ensure_slots(resource, day):
+    """
+    Materialize the slots of a day unless it was done already, usually by the background job,
+    in which case no writes are made
+    """
+    generation = get_materialized_generation(resource.id)
+    if not cache.get(get_materialized_day_cache_key(resource.id, generation, day)):
+        materialize_slots(resource, day)
@@ -1,7 +1,9 @@
 import inspect
 
-from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
-from care.security.models import RolePermission
+from django.db.models import Model
+
+from care.security.authorization.permission_index import PermissionIndex
+from care.utils.request_cache import RequestCache
 
 
 class PermissionDeniedError(Exception):
@@ -27,39 +29,73 @@ class AuthorizationHandler:
     def check_permission_in_organization(self, permissions, user, orgs=None):
         if user.is_superuser:
             return True
-        roles = self.get_role_from_permissions(permissions)
-        filters = {"role_id__in": roles, "user": user}
-        if orgs:
-            filters["organization_id__in"] = orgs
-        return OrganizationUser.objects.filter(**filters).exists()
+        return PermissionIndex.has_permission_in_organization(permissions, user, orgs)
 
     def check_permission_in_facility_organization(
         self, permissions, user, orgs=None, facility=None
     ):
         if user.is_superuser:
             return True
-        roles = self.get_role_from_permissions(permissions)
-        filters = {"role_id__in": roles, "user": user}
-        if orgs:
-            filters["organization_id__in"] = orgs
-        if facility:
-            filters["organization__facility"] = facility
-        return FacilityOrganizationUser.objects.filter(**filters).exists()
+        return PermissionIndex.has_permission_in_facility_organization(
+            permissions, user, orgs, facility
+        )
 
-    def get_role_from_permissions(self, permissions):
-        # TODO Cache this endpoint
-        return list(
-            set(
-                RolePermission.objects.filter(
-                    permission__slug__in=permissions
-                ).values_list("role_id", flat=True)
-            )
+    def check_permission_in_organization_many(self, permissions, user, orgs_list):
+        if user.is_superuser:
+            return [True] * len(orgs_list)
+        return PermissionIndex.has_permission_in_organization_many(
+            permissions, user, orgs_list
         )
 
+    def check_permission_in_facility_organization_many(
+        self, permissions, user, orgs_list, facility=None
+    ):
+        if user.is_superuser:
+            return [True] * len(orgs_list)
+        return PermissionIndex.has_permission_in_facility_organization_many(
+            permissions, user, orgs_list, facility
+        )
+
+    def get_role_from_permissions(self, permissions):
+        return list(PermissionIndex.get_roles_for_permissions(permissions))
+
+
+AUTHORIZATION_REQUEST_CACHE_NAMESPACE = "authorization"
+BATCH_ACTION_SUFFIX = "_many"
+
+
+def _memo_key_part(value):
+    """
+    Convert an authorization argument into a hashable memo key part,
+    returns None when the argument cannot be keyed safely
+    """
+    if value is None or isinstance(value, int | str | bool):
+        return value
+    if isinstance(value, Model):
+        if value.pk is None:
+            return None
+        return (value._meta.label, value.pk)  # noqa SLF001
+    return None
+
+
+def _memo_key(item, user, args, kwargs):
+    parts = [item, getattr(user, "pk", None)]
+    for name, value in [*enumerate(args), *sorted(kwargs.items())]:
+        key_part = _memo_key_part(value)
+        if key_part is None and value is not None:
+            return None
+        parts.append((name, key_part))
+    return tuple(parts)
+
 
 class AuthorizationController:
     """
-    Someone please write this because i honestly forgot what this does
+    Routes `can_*` actions and `get_*` queries to the handler that implements them.
+
+    Decisions for `can_*` actions are memoized for the duration of the request, keyed by
+    (action, user, object keys). `can_*_many(user, objs, ...)` answers an action for a list of objects,
+    handlers may implement it to resolve all of them at once, otherwise it falls back to the single action.
+    Batch answers are written back to the memo so later single checks on the same objects are free.
     """
 
     override_authz_controllers: list[
@@ -86,8 +122,10 @@ class AuthorizationController:
         if not cls.cache["actions"]:
             cls.build_cache()
         if item.startswith("can_"):
+            if item.endswith(BATCH_ACTION_SUFFIX):
+                return cls.call_many(item, *args, **kwargs)
             if item in cls.cache["actions"]:
-                return getattr(cls.cache["actions"][item](), item)(*args, **kwargs)
+                return cls.call_action(item, *args, **kwargs)
             raise ValueError("Invalid Action")
         if item.startswith("get_"):
             if item in cls.cache["queries"]:
@@ -95,6 +133,60 @@ class AuthorizationController:
             raise ValueError("Invalid Query")
         raise ValueError("Invalid Item")
 
+    @classmethod
+    def call_action(cls, item, user, *args, **kwargs):
+        memo = RequestCache.get_namespace(AUTHORIZATION_REQUEST_CACHE_NAMESPACE)
+        key = _memo_key(item, user, args, kwargs) if memo is not None else None
+        if key is not None and key in memo:
+            return memo[key]
+        result = getattr(cls.cache["actions"][item](), item)(user, *args, **kwargs)
+        if key is not None and isinstance(result, bool):
+            memo[key] = result
+        return result
+
+    @classmethod
+    def call_many(cls, item, user, objs, *args, **kwargs):
+        """
+        Answer an action for every object in objs, returns a dict of object pk -> decision
+        """
+        single_item = item.removesuffix(BATCH_ACTION_SUFFIX)
+        if single_item not in cls.cache["actions"]:
+            raise ValueError("Invalid Action")
+        memo = RequestCache.get_namespace(AUTHORIZATION_REQUEST_CACHE_NAMESPACE)
+        results = {}
+        pending = []
+        for obj in objs:
+            key = (
+                _memo_key(single_item, user, (obj, *args), kwargs)
+                if memo is not None
+                else None
+            )
+            if key is not None and key in memo:
+                results[obj.pk] = memo[key]
+            else:
+                pending.append((obj, key))
+        if not pending:
+            return results
+        if item in cls.cache["actions"]:
+            decisions = getattr(cls.cache["actions"][item](), item)(
+                user, [obj for obj, _ in pending], *args, **kwargs
+            )
+        else:
+            handler = cls.cache["actions"][single_item]()
+            decisions = {
+                obj.pk: getattr(handler, single_item)(user, obj, *args, **kwargs)
+                for obj, _ in pending
+            }
+        for obj, key in pending:
+            results[obj.pk] = decisions[obj.pk]
+            if key is not None:
+                memo[key] = decisions[obj.pk]
+        return results
+
+    @classmethod
+    def clear_memo(cls):
+        RequestCache.clear_namespace(AUTHORIZATION_REQUEST_CACHE_NAMESPACE)
+
     @classmethod
     def register_internal_controller(cls, controller):
         # TODO : Do some deduplication Logic
@@ -52,6 +52,48 @@ class EncounterAccess(AuthorizationHandler):
             orgs=encounter.facility_organization_cache,
         )
 
+    def can_view_encounter_obj_many(self, user, encounters):
+        """
+        Batch variant of can_view_encounter_obj, returns a dict of encounter pk -> decision
+        """
+        decisions = self.check_permission_in_facility_organization_many(
+            [EncounterPermissions.can_read_encounter.name],
+            user,
+            [encounter.facility_organization_cache for encounter in encounters],
+        )
+        return {
+            encounter.pk: decision
+            for encounter, decision in zip(encounters, decisions, strict=True)
+        }
+
+    def can_submit_encounter_questionnaire_obj_many(self, user, encounters):
+        """
+        Batch variant of can_submit_encounter_questionnaire_obj, returns a dict of encounter pk -> decision
+        """
+        decisions = self.check_permission_in_facility_organization_many(
+            [EncounterPermissions.can_submit_encounter_questionnaire.name],
+            user,
+            [encounter.facility_organization_cache for encounter in encounters],
+        )
+        return {
+            encounter.pk: decision and encounter.status not in COMPLETED_CHOICES
+            for encounter, decision in zip(encounters, decisions, strict=True)
+        }
+
+    def can_update_encounter_obj_many(self, user, encounters):
+        """
+        Batch variant of can_update_encounter_obj, returns a dict of encounter pk -> decision
+        """
+        decisions = self.check_permission_in_facility_organization_many(
+            [EncounterPermissions.can_write_encounter.name],
+            user,
+            [encounter.facility_organization_cache for encounter in encounters],
+        )
+        return {
+            encounter.pk: decision and encounter.status not in COMPLETED_CHOICES
+            for encounter, decision in zip(encounters, decisions, strict=True)
+        }
+
     def get_filtered_encounters(self, qs, user, facility):
         if user.is_superuser:
             return qs
@@ -1,4 +1,4 @@
-from django.db.models import Q
+from django.db.models import F, Func, IntegerField, Q
 
 from care.emr.models import Encounter, PatientUser
 from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
@@ -9,63 +9,85 @@ from care.security.authorization.base import (
 )
 from care.security.models import RolePermission
 from care.security.permissions.patient import PatientPermissions
+from care.utils.request_cache import RequestCache
+
+PATIENT_ACCESS_REQUEST_CACHE_NAMESPACE = "patient_access"
 
 
 class PatientAccess(AuthorizationHandler):
-    def find_roles_on_patient(self, user, patient):
-        role_ids = set()
-        # Through Encounter
-        encounters = (
+    def patient_roles_filter(self, user, patient):
+        """
+        Returns a filter matching the roles the user holds on the patient,
+        through the patient's active encounters, the patient's organizations or a direct association
+        """
+        encounter_organizations = (
             Encounter.objects.filter(patient=patient)
             .exclude(status__in=COMPLETED_CHOICES)
-            .values_list("facility_organization_cache", flat=True)
+            .annotate(
+                organization_id=Func(
+                    F("facility_organization_cache"),
+                    function="unnest",
+                    output_field=IntegerField(),
+                )
+            )
+            .values("organization_id")
         )
-        encounter_set = set()
-        for encounter in encounters:
-            encounter_set = encounter_set.union(set(encounter))
-        roles = FacilityOrganizationUser.objects.filter(
-            organization_id__in=encounter_set, user=user
-        ).values_list("role_id", flat=True)
-        role_ids = role_ids.union(set(roles))
-        # Through Organization
-        roles = OrganizationUser.objects.filter(
-            organization_id__in=patient.organization_cache, user=user
-        ).values_list("role_id", flat=True)
-        role_ids = role_ids.union(set(roles))
-        # Through Direct association
-        roles = PatientUser.objects.filter(patient=patient, user=user).values_list(
-            "role_id", flat=True
+        return (
+            Q(
+                role_id__in=FacilityOrganizationUser.objects.filter(
+                    organization_id__in=encounter_organizations, user=user
+                ).values("role_id")
+            )
+            | Q(
+                role_id__in=OrganizationUser.objects.filter(
+                    organization_id__in=patient.organization_cache, user=user
+                ).values("role_id")
+            )
+            | Q(
+                role_id__in=PatientUser.objects.filter(
+                    patient=patient, user=user
+                ).values("role_id")
+            )
         )
-        return role_ids.union(set(roles))
 
-    def can_view_patient_obj(self, user, patient):
+    def find_permissions_on_patient(self, user, patient):
+        """
+        Returns the set of permission slugs the user has on the patient.
+        Roles and their permissions are resolved in a single query,
+        the result is memoized per (user, patient) for the rest of the request.
+        """
+        memo = RequestCache.get_namespace(PATIENT_ACCESS_REQUEST_CACHE_NAMESPACE)
+        key = (user.id, patient.id)
+        if memo is not None and key in memo:
+            return memo[key]
+        permissions = set(
+            RolePermission.objects.filter(self.patient_roles_filter(user, patient))
+            .values_list("permission__slug", flat=True)
+            .distinct()
+        )
+        if memo is not None:
+            memo[key] = permissions
+        return permissions
+
+    def has_permission_on_patient(self, permission, user, patient):
         if user.is_superuser:
             return True
-        user_roles = self.find_roles_on_patient(user, patient)
-        return RolePermission.objects.filter(
-            permission__slug__in=[PatientPermissions.can_list_patients.name],
-            role__in=user_roles,
-        ).exists()
+        return permission in self.find_permissions_on_patient(user, patient)
+
+    def can_view_patient_obj(self, user, patient):
+        return self.has_permission_on_patient(
+            PatientPermissions.can_list_patients.name, user, patient
+        )
 
     def can_write_patient_obj(self, user, patient):
-        if user.is_superuser:
-            return True
-        user_roles = self.find_roles_on_patient(user, patient)
-        return RolePermission.objects.filter(
-            permission__slug__in=[PatientPermissions.can_write_patient.name],
-            role__in=user_roles,
-        ).exists()
+        return self.has_permission_on_patient(
+            PatientPermissions.can_write_patient.name, user, patient
+        )
 
     def can_submit_questionnaire_patient_obj(self, user, patient):
-        if user.is_superuser:
-            return True
-        user_roles = self.find_roles_on_patient(user, patient)
-        return RolePermission.objects.filter(
-            permission__slug__in=[
-                PatientPermissions.can_submit_patient_questionnaire.name
-            ],
-            role__in=user_roles,
-        ).exists()
+        return self.has_permission_on_patient(
+            PatientPermissions.can_submit_patient_questionnaire.name, user, patient
+        )
 
     def can_create_patient(self, user):
         return self.check_permission_in_facility_organization(
@@ -73,24 +95,14 @@ class PatientAccess(AuthorizationHandler):
         )
 
     def can_view_clinical_data(self, user, patient):
-        if user.is_superuser:
-            return True
-        user_roles = self.find_roles_on_patient(user, patient)
-        return RolePermission.objects.filter(
-            permission__slug__in=[PatientPermissions.can_view_clinical_data.name],
-            role__in=user_roles,
-        ).exists()
+        return self.has_permission_on_patient(
+            PatientPermissions.can_view_clinical_data.name, user, patient
+        )
 
     def can_view_patient_questionnaire_responses(self, user, patient):
-        if user.is_superuser:
-            return True
-        user_roles = self.find_roles_on_patient(user, patient)
-        return RolePermission.objects.filter(
-            permission__slug__in=[
-                PatientPermissions.can_view_questionnaire_responses.name
-            ],
-            role__in=user_roles,
-        ).exists()
+        return self.has_permission_on_patient(
+            PatientPermissions.can_view_questionnaire_responses.name, user, patient
+        )
 
     def get_filtered_patients(self, qs, user):
         if user.is_superuser:
@@ -0,0 +1,253 @@
+import threading
+from collections import OrderedDict
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+
+from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
+from care.security.models import RolePermission
+
+PERMISSION_INDEX_VERSION_KEY = "permission_index:version"
+PERMISSION_INDEX_USER_VERSION_KEY = "permission_index:user_version:{}"
+PERMISSION_INDEX_ROLES_KEY = "permission_index:roles:{}"
+PERMISSION_INDEX_USER_KEY = "permission_index:user:{}:{}"
+PERMISSION_INDEX_CACHE_TIMEOUT = 60 * 60 * 24  # 1 Day
+PERMISSION_INDEX_MAX_LOCAL_USERS = 2048
+
+
+class PermissionIndex:
+    """
+    Materialized index of the role/permission graph used by the authorization handlers.
+
+    Two structures are maintained,
+    - permission slug -> role ids, shared by every user
+    - user -> {organization id -> role ids}, for organizations and facility organizations
+
+    Both are held in process memory and in the shared cache, each copy is tagged with a version token
+    stored in the shared cache. Signals on RolePermission, OrganizationUser and FacilityOrganizationUser
+    rotate the tokens, so stale copies in other processes are discarded on their next lookup.
+    When the index is warm, a permission check costs one cache round trip and no database queries.
+    """
+
+    _lock = threading.Lock()
+    _roles = (None, {})
+    _users = OrderedDict()
+
+    # Versioning
+
+    @classmethod
+    def _get_versions(cls, user_id):
+        user_version_key = PERMISSION_INDEX_USER_VERSION_KEY.format(user_id)
+        versions = cache.get_many([PERMISSION_INDEX_VERSION_KEY, user_version_key])
+        roles_version = versions.get(PERMISSION_INDEX_VERSION_KEY)
+        if roles_version is None:
+            roles_version = cls._rotate_version(PERMISSION_INDEX_VERSION_KEY, nx=True)
+        user_version = versions.get(user_version_key)
+        if user_version is None:
+            user_version = cls._rotate_version(user_version_key, nx=True)
+        return roles_version, user_version
+
+    @classmethod
+    def _get_roles_version(cls):
+        version = cache.get(PERMISSION_INDEX_VERSION_KEY)
+        if version is None:
+            version = cls._rotate_version(PERMISSION_INDEX_VERSION_KEY, nx=True)
+        return version
+
+    @staticmethod
+    def _rotate_version(key, nx=False):
+        version = uuid4().hex
+        if nx:
+            # Another process may have set the version in the meantime, prefer that one
+            if not cache.add(key, version, timeout=None):
+                return cache.get(key) or version
+            return version
+        cache.set(key, version, timeout=None)
+        return version
+
+    # Builders
+
+    @staticmethod
+    def _build_roles():
+        roles = {}
+        for slug, role_id in RolePermission.objects.values_list(
+            "permission__slug", "role_id"
+        ):
+            roles.setdefault(slug, set()).add(role_id)
+        return roles
+
+    @staticmethod
+    def _build_user(user_id):
+        organizations = {}
+        for organization_id, role_id in OrganizationUser.objects.filter(
+            user_id=user_id
+        ).values_list("organization_id", "role_id"):
+            organizations.setdefault(organization_id, set()).add(role_id)
+        facility_organizations = {}
+        rows = FacilityOrganizationUser.objects.filter(user_id=user_id).values_list(
+            "organization_id", "organization__facility_id", "role_id"
+        )
+        for organization_id, facility_id, role_id in rows:
+            _, role_ids = facility_organizations.setdefault(
+                organization_id, (facility_id, set())
+            )
+            role_ids.add(role_id)
+        return {
+            "organizations": organizations,
+            "facility_organizations": facility_organizations,
+        }
+
+    # Accessors
+
+    @classmethod
+    def _get_roles_map(cls, version):
+        local_version, roles = cls._roles
+        if local_version == version:
+            return roles
+        cache_key = PERMISSION_INDEX_ROLES_KEY.format(version)
+        roles = cache.get(cache_key)
+        if roles is None:
+            roles = cls._build_roles()
+            cache.set(cache_key, roles, PERMISSION_INDEX_CACHE_TIMEOUT)
+        with cls._lock:
+            cls._roles = (version, roles)
+        return roles
+
+    @classmethod
+    def _get_user_map(cls, user_id, version):
+        local = cls._users.get(user_id)
+        if local and local[0] == version:
+            return local[1]
+        cache_key = PERMISSION_INDEX_USER_KEY.format(user_id, version)
+        user_map = cache.get(cache_key)
+        if user_map is None:
+            user_map = cls._build_user(user_id)
+            cache.set(cache_key, user_map, PERMISSION_INDEX_CACHE_TIMEOUT)
+        with cls._lock:
+            cls._users[user_id] = (version, user_map)
+            cls._users.move_to_end(user_id)
+            while len(cls._users) > PERMISSION_INDEX_MAX_LOCAL_USERS:
+                cls._users.popitem(last=False)
+        return user_map
+
+    @classmethod
+    def get_roles_for_permissions(cls, permissions):
+        """
+        Returns the set of role ids that grant any of the given permissions
+        """
+        roles = cls._get_roles_map(cls._get_roles_version())
+        role_ids = set()
+        for permission in permissions:
+            role_ids |= roles.get(permission, set())
+        return role_ids
+
+    @classmethod
+    def get_user_roles(cls, user):
+        """
+        Returns the organization and facility organization role mapping for the user
+        """
+        _, user_version = cls._get_versions(user.id)
+        return cls._get_user_map(user.id, user_version)
+
+    @classmethod
+    def _resolve(cls, permissions, user):
+        roles_version, user_version = cls._get_versions(user.id)
+        roles = cls._get_roles_map(roles_version)
+        role_ids = set()
+        for permission in permissions:
+            role_ids |= roles.get(permission, set())
+        if not role_ids:
+            return role_ids, {"organizations": {}, "facility_organizations": {}}
+        return role_ids, cls._get_user_map(user.id, user_version)
+
+    @staticmethod
+    def _match_organization(role_ids, organizations, orgs):
+        if orgs:
+            return any(
+                not role_ids.isdisjoint(organizations[org])
+                for org in orgs
+                if org in organizations
+            )
+        return any(
+            not role_ids.isdisjoint(org_roles) for org_roles in organizations.values()
+        )
+
+    @staticmethod
+    def _match_facility_organization(role_ids, organizations, orgs, facility):
+        facility_id = getattr(facility, "id", facility)
+        if orgs:
+            candidates = (organizations[org] for org in orgs if org in organizations)
+        else:
+            candidates = organizations.values()
+        return any(
+            not role_ids.isdisjoint(org_roles)
+            for org_facility_id, org_roles in candidates
+            if not facility_id or org_facility_id == facility_id
+        )
+
+    @classmethod
+    def has_permission_in_organization(cls, permissions, user, orgs=None):
+        role_ids, user_map = cls._resolve(permissions, user)
+        return cls._match_organization(role_ids, user_map["organizations"], orgs)
+
+    @classmethod
+    def has_permission_in_organization_many(cls, permissions, user, orgs_list):
+        """
+        Same as has_permission_in_organization for a list of organization sets,
+        the index is resolved once for all of them
+        """
+        role_ids, user_map = cls._resolve(permissions, user)
+        return [
+            cls._match_organization(role_ids, user_map["organizations"], orgs)
+            for orgs in orgs_list
+        ]
+
+    @classmethod
+    def has_permission_in_facility_organization(
+        cls, permissions, user, orgs=None, facility=None
+    ):
+        role_ids, user_map = cls._resolve(permissions, user)
+        return cls._match_facility_organization(
+            role_ids, user_map["facility_organizations"], orgs, facility
+        )
+
+    @classmethod
+    def has_permission_in_facility_organization_many(
+        cls, permissions, user, orgs_list, facility=None
+    ):
+        """
+        Same as has_permission_in_facility_organization for a list of organization sets,
+        the index is resolved once for all of them
+        """
+        role_ids, user_map = cls._resolve(permissions, user)
+        return [
+            cls._match_facility_organization(
+                role_ids, user_map["facility_organizations"], orgs, facility
+            )
+            for orgs in orgs_list
+        ]
+
+    # Invalidation
+
+    @classmethod
+    def invalidate_roles(cls):
+        def _invalidate():
+            cls._rotate_version(PERMISSION_INDEX_VERSION_KEY)
+            with cls._lock:
+                cls._roles = (None, {})
+
+        _invalidate()
+        # Rotate again once the transaction is visible to other processes,
+        # otherwise they could rebuild the index from uncommitted state
+        transaction.on_commit(_invalidate)
+
+    @classmethod
+    def invalidate_user(cls, user_id):
+        def _invalidate():
+            cls._rotate_version(PERMISSION_INDEX_USER_VERSION_KEY.format(user_id))
+            with cls._lock:
+                cls._users.pop(user_id, None)
+
+        _invalidate()
+        transaction.on_commit(_invalidate)
@@ -1,4 +1,3 @@
-from care.emr.models.organization import FacilityOrganizationUser, OrganizationUser
 from care.security.authorization.base import (
     AuthorizationController,
     AuthorizationHandler,
@@ -13,12 +12,10 @@ class UserAccess(AuthorizationHandler):
         """
         if user.is_superuser:
             return True
-        roles = self.get_role_from_permissions([UserPermissions.can_create_user.name])
-        return (
-            OrganizationUser.objects.filter(user=user, role_id__in=roles).exists()
-            or FacilityOrganizationUser.objects.filter(
-                user=user, role_id__in=roles
-            ).exists()
+        return self.check_permission_in_organization(
+            [UserPermissions.can_create_user.name], user
+        ) or self.check_permission_in_facility_organization(
+            [UserPermissions.can_create_user.name], user
         )
 
 
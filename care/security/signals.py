@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from care.emr.models import Encounter, Patient, PatientUser
+from care.emr.models.organization import (
+    FacilityOrganization,
+    FacilityOrganizationUser,
+    Organization,
+    OrganizationUser,
+)
+from care.emr.utils.preload import PRELOADED_OBJECTS_REQUEST_CACHE_NAMESPACE
+from care.security.authorization.base import AuthorizationController
+from care.security.authorization.patient import PATIENT_ACCESS_REQUEST_CACHE_NAMESPACE
+from care.security.authorization.permission_index import PermissionIndex
+from care.security.models import RolePermission
+from care.utils.request_cache import RequestCache
+
+
+def clear_request_authorization_memo():
+    AuthorizationController.clear_memo()
+    RequestCache.clear_namespace(PATIENT_ACCESS_REQUEST_CACHE_NAMESPACE)
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def invalidate_permission_index_roles(sender, instance, **kwargs):
+    """
+    Invalidate the permission -> role index when a RolePermission is created, updated, or deleted
+    """
+    PermissionIndex.invalidate_roles()
+    clear_request_authorization_memo()
+
+
+@receiver([post_save, post_delete], sender=OrganizationUser)
+@receiver([post_save, post_delete], sender=FacilityOrganizationUser)
+def invalidate_permission_index_user(sender, instance, **kwargs):
+    """
+    Invalidate the user's organization -> role index when a membership is created, updated, or deleted
+    """
+    PermissionIndex.invalidate_user(instance.user_id)
+    clear_request_authorization_memo()
+
+
+@receiver([post_save, post_delete], sender=Encounter)
+@receiver([post_save, post_delete], sender=Patient)
+@receiver([post_save, post_delete], sender=PatientUser)
+@receiver([post_save, post_delete], sender=Organization)
+@receiver([post_save, post_delete], sender=FacilityOrganization)
+def invalidate_request_authorization_memo(sender, instance, **kwargs):
+    """
+    Authorization decisions are derived from the state of these objects,
+    drop the request memo and the preloaded encounters if any of them change mid request
+    """
+    clear_request_authorization_memo()
+    RequestCache.clear_namespace(PRELOADED_OBJECTS_REQUEST_CACHE_NAMESPACE)
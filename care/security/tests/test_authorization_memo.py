@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from care.emr.models.organization import Organization
+from care.security.authorization.base import (
+    AuthorizationController,
+    AuthorizationHandler,
+)
+from care.users.models import User
+from care.utils.request_cache import RequestCache
+
+
+class CountingHandler(AuthorizationHandler):
+    calls = []
+
+    def can_view_thing(self, user, obj, **kwargs):
+        self.calls.append(obj.pk)
+        return obj.pk % 2 == 0
+
+
+class BatchHandler(CountingHandler):
+    batches = []
+
+    def can_view_thing_many(self, user, objs):
+        self.batches.append([obj.pk for obj in objs])
+        return {obj.pk: obj.pk % 2 == 0 for obj in objs}
+
+
+class AuthorizationMemoTest(SimpleTestCase):
+    handler = CountingHandler
+
+    def setUp(self):
+        CountingHandler.calls = []
+        BatchHandler.batches = []
+        actions = {
+            name: self.handler
+            for name in dir(self.handler)
+            if name.startswith("can_view_thing")
+        }
+        patcher = mock.patch.object(
+            AuthorizationController, "cache", {"actions": actions, "queries": {}}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+        self.user = User(id=1)
+        self.things = [Organization(id=i) for i in range(1, 5)]
+
+    def call(self, obj, **kwargs):
+        return AuthorizationController.call("can_view_thing", self.user, obj, **kwargs)
+
+    def test_decisions_are_memoized_per_request(self):
+        self.assertFalse(self.call(self.things[0]))
+        self.assertFalse(self.call(self.things[0]))
+        self.assertTrue(self.call(self.things[1]))
+        self.assertEqual(CountingHandler.calls, [1, 2])
+
+    def test_memo_is_dropped_after_the_request(self):
+        self.call(self.things[0])
+        RequestCache.disable()
+        self.call(self.things[0])
+        self.call(self.things[0])
+        self.assertEqual(CountingHandler.calls, [1, 1, 1])
+
+    def test_memo_is_cleared(self):
+        self.call(self.things[0])
+        AuthorizationController.clear_memo()
+        self.call(self.things[0])
+        self.assertEqual(CountingHandler.calls, [1, 1])
+
+    def test_unkeyable_arguments_are_not_memoized(self):
+        self.call(self.things[0], context={"a": 1})
+        self.call(self.things[0], context={"a": 1})
+        self.assertEqual(CountingHandler.calls, [1, 1])
+
+    def test_batch_falls_back_to_single_action(self):
+        self.call(self.things[0])
+        results = AuthorizationController.call(
+            "can_view_thing_many", self.user, self.things
+        )
+        self.assertEqual(results, {1: False, 2: True, 3: False, 4: True})
+        self.assertEqual(CountingHandler.calls, [1, 2, 3, 4])
+        # Batch answers are written back to the memo
+        self.assertTrue(self.call(self.things[3]))
+        self.assertEqual(CountingHandler.calls, [1, 2, 3, 4])
+
+    def test_invalid_action(self):
+        with self.assertRaises(ValueError):
+            AuthorizationController.call("can_fly_many", self.user, self.things)
+
+
+class AuthorizationBatchTest(AuthorizationMemoTest):
+    handler = BatchHandler
+
+    def test_batch_falls_back_to_single_action(self):
+        self.call(self.things[0])
+        results = AuthorizationController.call(
+            "can_view_thing_many", self.user, self.things
+        )
+        self.assertEqual(results, {1: False, 2: True, 3: False, 4: True})
+        # Only the objects missing from the memo are sent to the batch action
+        self.assertEqual(BatchHandler.batches, [[2, 3, 4]])
+        self.assertEqual(CountingHandler.calls, [1])
+
+
+class RequestCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.callback = mock.Mock()
+        patcher = mock.patch.object(RequestCache, "teardown_callbacks", [self.callback])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(RequestCache.disable)
+
+    def test_namespaces_only_exist_within_a_request(self):
+        self.assertIsNone(RequestCache.get_namespace("test"))
+        RequestCache.enable()
+        RequestCache.get_namespace("test")["key"] = 1
+        self.assertEqual(RequestCache.get_namespace("test"), {"key": 1})
+        RequestCache.clear_namespace("test")
+        self.assertEqual(RequestCache.get_namespace("test"), {})
+        RequestCache.disable()
+        self.assertIsNone(RequestCache.get_namespace("test"))
+
+    def test_teardown_callbacks_receive_the_store(self):
+        RequestCache.enable()
+        RequestCache.get_namespace("test")["key"] = 1
+        RequestCache.disable()
+        self.callback.assert_called_once_with({"test": {"key": 1}})
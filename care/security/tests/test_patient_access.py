@@ -0,0 +1,70 @@
+from model_bakery import baker
+
+from care.emr.models import Encounter, Patient, PatientUser
+from care.emr.models.organization import FacilityOrganization, FacilityOrganizationUser
+from care.security.authorization.patient import PatientAccess
+from care.security.permissions.patient import PatientPermissions
+from care.utils.request_cache import RequestCache
+from care.utils.tests.base import CareAPITestBase
+
+CAN_LIST = PatientPermissions.can_list_patients.name
+CAN_WRITE = PatientPermissions.can_write_patient.name
+
+
+class PatientAccessTest(CareAPITestBase):
+    def setUp(self):
+        self.user = self.create_user()
+        self.organization = self.create_organization(org_type="govt")
+        self.patient = baker.make(
+            Patient, blood_group="unknown", geo_organization=self.organization
+        )
+        self.access = PatientAccess()
+
+    def find_permissions(self):
+        return self.access.find_permissions_on_patient(self.user, self.patient)
+
+    def test_no_roles(self):
+        self.assertEqual(self.find_permissions(), set())
+
+    def test_roles_are_resolved_in_one_query(self):
+        self.attach_role_organization_user(
+            self.organization,
+            self.user,
+            self.create_role_with_permissions(permissions=[CAN_LIST]),
+        )
+        PatientUser.objects.create(
+            patient=self.patient,
+            user=self.user,
+            role=self.create_role_with_permissions(permissions=[CAN_WRITE]),
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(self.find_permissions(), {CAN_LIST, CAN_WRITE})
+
+    def test_roles_through_active_encounters(self):
+        facility = self.create_facility()
+        FacilityOrganizationUser.objects.create(
+            organization=FacilityOrganization.objects.get(
+                facility=facility, org_type="root"
+            ),
+            user=self.user,
+            role=self.create_role_with_permissions(permissions=[CAN_LIST]),
+        )
+        encounter = baker.make(
+            Encounter, patient=self.patient, facility=facility, status="in_progress"
+        )
+        encounter.sync_organization_cache()
+        self.assertEqual(self.find_permissions(), {CAN_LIST})
+        Encounter.objects.filter(id=encounter.id).update(status="completed")
+        self.assertEqual(self.find_permissions(), set())
+
+    def test_permissions_are_memoized_per_request(self):
+        self.attach_role_organization_user(
+            self.organization,
+            self.user,
+            self.create_role_with_permissions(permissions=[CAN_LIST]),
+        )
+        RequestCache.enable()
+        self.addCleanup(RequestCache.disable)
+        self.assertTrue(self.access.can_view_patient_obj(self.user, self.patient))
+        with self.assertNumQueries(0):
+            self.assertFalse(self.access.can_write_patient_obj(self.user, self.patient))
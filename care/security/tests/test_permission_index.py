@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.test import override_settings
+from model_bakery import baker
+
+from care.emr.models.organization import (
+    FacilityOrganization,
+    FacilityOrganizationUser,
+    OrganizationUser,
+)
+from care.security.authorization.permission_index import PermissionIndex
+from care.security.models import PermissionModel, RolePermission
+from care.utils.tests.base import CareAPITestBase
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+PERMISSION = "can_view_organization"
+
+
+# ruff: noqa: SLF001
+@override_settings(CACHES=LOCMEM_CACHE)
+class PermissionIndexTest(CareAPITestBase):
+    def setUp(self):
+        cache.clear()
+        PermissionIndex._roles = (None, {})
+        PermissionIndex._users = OrderedDict()
+        self.user = self.create_user()
+        self.organization = self.create_organization(org_type="govt")
+        self.other_organization = self.create_organization(org_type="govt")
+        self.role = self.create_role_with_permissions(permissions=[PERMISSION])
+        self.attach_role_organization_user(self.organization, self.user, self.role)
+
+    def has_permission(self, orgs=None, permission=PERMISSION):
+        return PermissionIndex.has_permission_in_organization(
+            [permission], self.user, orgs
+        )
+
+    def test_permission_in_organization(self):
+        self.assertTrue(self.has_permission())
+        self.assertTrue(self.has_permission([self.organization.id]))
+        self.assertFalse(self.has_permission([self.other_organization.id]))
+        self.assertFalse(self.has_permission(permission="can_create_organization"))
+        self.assertEqual(
+            PermissionIndex.has_permission_in_organization_many(
+                [PERMISSION],
+                self.user,
+                [[self.organization.id], [self.other_organization.id]],
+            ),
+            [True, False],
+        )
+
+    def test_warm_checks_do_not_query(self):
+        self.has_permission()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.has_permission([self.organization.id]))
+
+    def test_shared_cache_is_used_by_other_processes(self):
+        self.has_permission()
+        # A process with an empty local index reads the shared copy
+        PermissionIndex._roles = (None, {})
+        PermissionIndex._users = OrderedDict()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.has_permission([self.organization.id]))
+
+    def test_membership_changes_are_visible(self):
+        self.assertFalse(self.has_permission([self.other_organization.id]))
+        self.attach_role_organization_user(
+            self.other_organization, self.user, self.role
+        )
+        self.assertTrue(self.has_permission([self.other_organization.id]))
+        OrganizationUser.objects.filter(user=self.user).delete()
+        self.assertFalse(self.has_permission())
+
+    def test_role_permission_changes_are_visible(self):
+        permission = "can_create_organization"
+        self.assertFalse(self.has_permission(permission=permission))
+        grant = RolePermission.objects.create(
+            role=self.role, permission=baker.make(PermissionModel, slug=permission)
+        )
+        self.assertTrue(self.has_permission(permission=permission))
+        grant.delete()
+        self.assertFalse(self.has_permission(permission=permission))
+
+    def test_permission_in_facility_organization(self):
+        facility = self.create_facility()
+        other_facility = self.create_facility()
+        organization = FacilityOrganization.objects.get(
+            facility=facility, org_type="root"
+        )
+        FacilityOrganizationUser.objects.create(
+            organization=organization, user=self.user, role=self.role
+        )
+        self.assertTrue(
+            PermissionIndex.has_permission_in_facility_organization(
+                [PERMISSION], self.user, [organization.id]
+            )
+        )
+        self.assertTrue(
+            PermissionIndex.has_permission_in_facility_organization(
+                [PERMISSION], self.user, facility=facility
+            )
+        )
+        self.assertFalse(
+            PermissionIndex.has_permission_in_facility_organization(
+                [PERMISSION], self.user, facility=other_facility
+            )
+        )
@@ -298,7 +298,7 @@ class UserSerializer(SignUpSerializer):
                     "organization_id", flat=True
                 )
             )
-        return [OrganizationReadSpec.serialize(obj).to_json() for obj in organizations]
+        return OrganizationReadSpec.serialize_many(organizations)
 
     def get_permissions(self, user):
         permissions = RolePermission.objects.filter(
@@ -0,0 +1,43 @@
+import threading
+
+import boto3
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from care.utils.csp.config import BucketName, BucketType, get_client_config
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_s3_client(bucket_type: BucketType, external=False) -> tuple[object, BucketName]:
+    """
+    Returns a process wide S3 client for the bucket along with the bucket name.
+
+    Creating a client resolves endpoints, credentials and loads the botocore service model,
+    so clients are built once per (bucket type, internal/external) and shared between threads,
+    boto3 clients are thread safe once created.
+    """
+    key = (bucket_type, external)
+    cached = _clients.get(key)
+    if cached is None:
+        with _clients_lock:
+            cached = _clients.get(key)
+            if cached is None:
+                config, bucket_name = get_client_config(bucket_type, external=external)
+                # Sessions are not thread safe, build each client from its own session
+                client = boto3.session.Session().client("s3", **config)
+                cached = (client, bucket_name)
+                _clients[key] = cached
+    return cached
+
+
+def clear_s3_clients():
+    with _clients_lock:
+        _clients.clear()
+
+
+@receiver(setting_changed)
+def clear_s3_clients_on_setting_change(setting, **kwargs):
+    if setting.startswith(("FACILITY_S3_", "FILE_UPLOAD_BUCKET", "BUCKET_")):
+        clear_s3_clients()
@@ -2,18 +2,17 @@ import logging
 import secrets
 from typing import Literal
 
-import boto3
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 
-from care.utils.csp.config import BucketType, get_client_config
+from care.utils.csp.client import get_s3_client
+from care.utils.csp.config import BucketType
 
 logger = logging.getLogger(__name__)
 
 
 def delete_cover_image(image_key: str, folder: Literal["cover_images", "avatars"]):
-    config, bucket_name = get_client_config(BucketType.FACILITY)
-    s3 = boto3.client("s3", **config)
+    s3, bucket_name = get_s3_client(BucketType.FACILITY)
 
     try:
         s3.delete_object(Bucket=bucket_name, Key=image_key)
@@ -27,8 +26,7 @@ def upload_cover_image(
     folder: Literal["cover_images", "avatars"],
     old_key: str | None = None,
 ) -> str:
-    config, bucket_name = get_client_config(BucketType.FACILITY)
-    s3 = boto3.client("s3", **config)
+    s3, bucket_name = get_s3_client(BucketType.FACILITY)
 
     if old_key:
         try:
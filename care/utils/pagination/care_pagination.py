@@ -1,5 +1,14 @@
-from rest_framework.pagination import LimitOffsetPagination
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 
 class CareLimitOffsetPagination(LimitOffsetPagination):
@@ -7,3 +16,172 @@ class CareLimitOffsetPagination(LimitOffsetPagination):
 
     def get_paginated_response(self, data):
         return Response({"count": self.count, "results": data})
+
+
+def estimate_count(queryset):
+    """
+    Row count estimated by the query planner, avoids scanning the whole result like COUNT(*)
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CareCursorPagination(BasePagination):
+    """
+    Keyset pagination on (ordering column, id) with opaque cursors.
+
+    Each page is a single range query, so later pages are as fast as the first and no
+    COUNT(*) is needed. The ordering column is the first ordering of the queryset, or default_ordering
+    when it is not ordered. Orderings that are not a column of the model fall back to id.
+    NULLs of a nullable column sort after every value, and before them when descending.
+
+    Requests opt in by sending `cursor` (empty for the first page), the `next` and `previous` cursors
+    of a page are then returned. `count=exact` or `count=estimate` adds a count, it is omitted otherwise.
+    Requests without `cursor` are paginated with limit and offset as before.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    count_query_param = "count"
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = 200
+    default_ordering = "-created_date"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.offset_paginator = CareLimitOffsetPagination()
+            return self.offset_paginator.paginate_queryset(queryset, request, view)
+        self.offset_paginator = None
+        self.limit = self.get_limit(request)
+        self.count = self.get_count(queryset, request)
+
+        field, self.descending = self.get_ordering(queryset)
+        self.field = field.name
+        cursor = self.decode_cursor(request.query_params[self.cursor_query_param])
+        reverse = cursor.get("reverse", False) if cursor else False
+
+        descending = self.descending != reverse
+        if descending:
+            ordering = F(self.field).desc(nulls_first=True)
+        else:
+            ordering = F(self.field).asc(nulls_last=True)
+        queryset = queryset.order_by(ordering, "-id" if descending else "id")
+        if cursor:
+            queryset = queryset.filter(
+                self.get_cursor_filter(field, cursor, descending)
+            )
+
+        results = list(queryset[: self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[: self.limit]
+        if reverse:
+            results.reverse()
+        self.next_cursor = None
+        self.previous_cursor = None
+        if results:
+            if has_more or reverse:
+                self.next_cursor = self.encode_cursor(results[-1], reverse=False)
+            if cursor and (has_more or not reverse):
+                self.previous_cursor = self.encode_cursor(results[0], reverse=True)
+        return results
+
+    def get_ordering(self, queryset):
+        """
+        Field the pages are keyed on and whether it is descending
+        """
+        ordering = next(iter(queryset.query.order_by), None)
+        if not isinstance(ordering, str):
+            ordering = self.default_ordering
+        descending = ordering.startswith("-")
+        opts = queryset.model._meta  # noqa SLF001
+        try:
+            field = opts.get_field(ordering.lstrip("-"))
+        except FieldDoesNotExist:
+            return opts.pk, descending
+        if not field.concrete or field.is_relation:
+            # Relations are ordered by the ordering of the related model
+            return opts.pk, descending
+        return field, descending
+
+    def get_cursor_filter(self, field, cursor, descending):
+        """
+        Rows after the cursor in the page ordering, NULLs are the largest values
+        """
+        lookup = "lt" if descending else "gt"
+        after_id = Q(**{f"id__{lookup}": cursor["id"]})
+        if cursor["value"] is None:
+            after = Q(**{f"{self.field}__isnull": True}) & after_id
+            if descending:
+                after |= Q(**{f"{self.field}__isnull": False})
+            return after
+        try:
+            value = field.to_python(cursor["value"])
+        except (DjangoValidationError, TypeError, ValueError) as e:
+            raise ValidationError({"cursor": "Invalid cursor"}) from e
+        if value is None:
+            raise ValidationError({"cursor": "Invalid cursor"})
+        after = Q(**{f"{self.field}__{lookup}": value}) | (
+            Q(**{self.field: value}) & after_id
+        )
+        if field.null and not descending:
+            after |= Q(**{f"{self.field}__isnull": True})
+        return after
+
+    def get_paginated_response(self, data):
+        if self.offset_paginator:
+            return self.offset_paginator.get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "next": self.next_cursor,
+                "previous": self.previous_cursor,
+                "results": data,
+            }
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params.get(self.limit_query_param, ""))
+        except ValueError:
+            return self.default_limit
+        return min(max(limit, 1), self.max_limit)
+
+    def get_count(self, queryset, request):
+        count = request.query_params.get(self.count_query_param)
+        if count == "exact":
+            return queryset.count()
+        if count == "estimate":
+            return estimate_count(queryset)
+        return None
+
+    def encode_cursor(self, obj, reverse):
+        value = self.get_field_value(obj)
+        cursor = {"value": value, "id": obj.id, "reverse": reverse}
+        return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+
+    def get_field_value(self, obj):
+        field = obj._meta.get_field(self.field)  # noqa SLF001
+        if field.value_from_object(obj) is None:
+            return None
+        return field.value_to_string(obj)
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except ValueError as e:
+            raise ValidationError({"cursor": "Invalid cursor"}) from e
+        if not (
+            isinstance(cursor, dict)
+            and isinstance(cursor.get("id"), int)
+            and "value" in cursor
+            and (cursor["value"] is None or isinstance(cursor["value"], str))
+        ):
+            raise ValidationError({"cursor": "Invalid cursor"})
+        return cursor
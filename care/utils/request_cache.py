@@ -0,0 +1,56 @@
+import threading
+
+
+class RequestCache:
+    """
+    Thread local store that lives for the duration of a single request.
+
+    The store is enabled by RequestCacheMiddleware, outside a request (celery tasks, management commands)
+    `get_namespace` returns None and callers are expected to skip memoization.
+    """
+
+    thread = threading.local()
+    teardown_callbacks = []
+
+    @classmethod
+    def enable(cls):
+        cls.thread.store = {}
+
+    @classmethod
+    def disable(cls):
+        store = getattr(cls.thread, "store", None)
+        if store:
+            for callback in cls.teardown_callbacks:
+                callback(store)
+        cls.thread.store = None
+
+    @classmethod
+    def register_teardown(cls, callback):
+        """
+        Register a callback that receives the store when a request finishes
+        """
+        cls.teardown_callbacks.append(callback)
+
+    @classmethod
+    def get_store(cls):
+        return getattr(cls.thread, "store", None)
+
+    @classmethod
+    def set_store(cls, store):
+        """
+        Share the store of a request with a worker thread acting on its behalf
+        """
+        cls.thread.store = store
+
+    @classmethod
+    def get_namespace(cls, namespace):
+        store = getattr(cls.thread, "store", None)
+        if store is None:
+            return None
+        return store.setdefault(namespace, {})
+
+    @classmethod
+    def clear_namespace(cls, namespace):
+        store = getattr(cls.thread, "store", None)
+        if store is not None:
+            store.pop(namespace, None)
@@ -3,6 +3,8 @@ from model_bakery import baker
 from rest_framework.test import APITestCase
 
 from care.emr.models.organization import OrganizationUser
+from care.facility.models import Facility
+from care.security.roles.role import FACILITY_ADMIN_ROLE
 
 
 class CareAPITestBase(APITestCase):
@@ -13,8 +15,10 @@ class CareAPITestBase(APITestCase):
 
         return baker.make(User, **kwargs)
 
-    def create_facility(self):
-        pass
+    def create_facility(self, user=None, **kwargs):
+        # The creator of a facility is made its administrator
+        self.create_role(name=FACILITY_ADMIN_ROLE.name, is_system=True)
+        return baker.make(Facility, created_by=user or self.create_user(), **kwargs)
 
     def create_organization(self, **kwargs):
         from care.emr.models import Organization
@@ -0,0 +1,99 @@
+import base64
+import json
+
+from django.db.models import F
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from care.emr.models.organization import Organization
+from care.utils.pagination.care_pagination import CareCursorPagination
+
+
+class CareCursorPaginationTest(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Organization.objects.create(name=f"Organization {i}", org_type="govt")
+        self.factory = APIRequestFactory()
+
+    def paginate(self, queryset, **params):
+        request = Request(self.factory.get("/", params))
+        paginator = CareCursorPagination()
+        results = paginator.paginate_queryset(queryset, request)
+        return paginator, [obj.id for obj in results]
+
+    def walk(self, queryset, limit=2):
+        ids = []
+        paginator, page = self.paginate(queryset, cursor="", limit=limit)
+        ids.extend(page)
+        while paginator.next_cursor:
+            paginator, page = self.paginate(
+                queryset, cursor=paginator.next_cursor, limit=limit
+            )
+            ids.extend(page)
+        return ids, paginator
+
+    def expected(self, *ordering):
+        return list(
+            Organization.objects.order_by(*ordering).values_list("id", flat=True)
+        )
+
+    def test_pages_cover_every_row_once(self):
+        ids, _ = self.walk(Organization.objects.all())
+        self.assertEqual(ids, self.expected("-created_date", "-id"))
+
+    def test_previous_pages(self):
+        queryset = Organization.objects.all()
+        _, last = self.walk(queryset)
+        ids = []
+        paginator = last
+        while paginator.previous_cursor:
+            paginator, page = self.paginate(
+                queryset, cursor=paginator.previous_cursor, limit=2
+            )
+            ids = page + ids
+        self.assertEqual(ids, self.expected("-created_date", "-id")[:-1])
+
+    def test_null_values_are_paginated(self):
+        nulls = self.expected("id")[:2]
+        Organization.objects.filter(id__in=nulls).update(created_date=None)
+        ids, _ = self.walk(Organization.objects.all())
+        self.assertEqual(
+            ids, self.expected(F("created_date").desc(nulls_first=True), "-id")
+        )
+        self.assertEqual(set(ids[:2]), set(nulls))
+
+        ids, _ = self.walk(Organization.objects.order_by("created_date"))
+        self.assertEqual(
+            ids, self.expected(F("created_date").asc(nulls_last=True), "id")
+        )
+
+    def test_unknown_ordering_falls_back_to_id(self):
+        ids, _ = self.walk(Organization.objects.order_by("-parent__name"))
+        self.assertEqual(ids, self.expected("-id"))
+
+    def test_invalid_cursor(self):
+        cursors = [
+            base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+            for cursor in [
+                {"value": ["2025-01-01"], "id": 1},
+                {"value": "yesterday", "id": 1},
+                {"id": 1},
+            ]
+        ]
+        for cursor in ["not a cursor", *cursors]:
+            with self.assertRaises(ValidationError):
+                self.paginate(Organization.objects.all(), cursor=cursor)
+
+    def test_count(self):
+        paginator, _ = self.paginate(Organization.objects.all(), cursor="")
+        self.assertIsNone(paginator.count)
+        paginator, _ = self.paginate(
+            Organization.objects.all(), cursor="", count="exact"
+        )
+        self.assertEqual(paginator.count, 5)
+        paginator, _ = self.paginate(
+            Organization.objects.all(), cursor="", count="estimate"
+        )
+        self.assertIsInstance(paginator.count, int)
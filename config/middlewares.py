@@ -1,6 +1,8 @@
 import logging
 import time
 
+from care.utils.request_cache import RequestCache
+
 
 class RequestTimeLoggingMiddleware:
     def __init__(self, get_response):
@@ -13,3 +15,15 @@ class RequestTimeLoggingMiddleware:
         duration = time.time() - request.start_time
         self.logger.info("Request to %s took %.4f seconds", request.path, duration)
         return response
+
+
+class RequestCacheMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        RequestCache.enable()
+        try:
+            return self.get_response(request)
+        finally:
+            RequestCache.disable()
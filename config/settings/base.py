@@ -194,6 +194,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.middlewares.RequestCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.common.BrokenLinkEmailsMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -467,6 +468,22 @@ HEALTHY_DJANGO = [
 # Audit logs
 # ------------------------------------------------------------------------------
 AUDIT_LOG_ENABLED = env.bool("AUDIT_LOG_ENABLED", default=False)
+# Where audit events are written, one of logger, jsonl, database or a dotted path to an AuditSink
+AUDIT_LOG_SINK = env("AUDIT_LOG_SINK", default="logger")
+# Every process writes to its own file next to this path, audit_log.<pid>.jsonl
+AUDIT_LOG_JSONL_PATH = env(
+    "AUDIT_LOG_JSONL_PATH", default=str(BASE_DIR / "audit_log.jsonl")
+)
+AUDIT_LOG_JSONL_MAX_BYTES = env.int(
+    "AUDIT_LOG_JSONL_MAX_BYTES", default=100 * 1024 * 1024
+)
+AUDIT_LOG_JSONL_BACKUP_COUNT = env.int("AUDIT_LOG_JSONL_BACKUP_COUNT", default=10)
+# Pending events kept in memory, events are written in batches or after the flush interval (in seconds)
+AUDIT_LOG_BUFFER_SIZE = env.int("AUDIT_LOG_BUFFER_SIZE", default=10000)
+AUDIT_LOG_BATCH_SIZE = env.int("AUDIT_LOG_BATCH_SIZE", default=500)
+AUDIT_LOG_FLUSH_INTERVAL = env.float("AUDIT_LOG_FLUSH_INTERVAL", default=2)
+# Attempts to write a batch again before its events are dropped
+AUDIT_LOG_WRITE_RETRIES = env.int("AUDIT_LOG_WRITE_RETRIES", default=3)
 AUDIT_LOG = {
     "globals": {
         "exclude": {
@@ -566,6 +583,20 @@ FILE_UPLOAD_BUCKET_EXTERNAL_ENDPOINT = env(
     ),
 )
 
+# Streaming file I/O, sizes in bytes
+FILE_STREAM_CHUNK_SIZE = env.int("FILE_STREAM_CHUNK_SIZE", default=1024 * 1024)
+FILE_MULTIPART_THRESHOLD = env.int("FILE_MULTIPART_THRESHOLD", default=8 * 1024 * 1024)
+FILE_MULTIPART_CHUNK_SIZE = env.int(
+    "FILE_MULTIPART_CHUNK_SIZE", default=8 * 1024 * 1024
+)
+FILE_MULTIPART_MAX_CONCURRENCY = env.int("FILE_MULTIPART_MAX_CONCURRENCY", default=4)
+# Larger files are emailed as a download link instead of an attachment
+FILE_MAX_EMAIL_ATTACHMENT_SIZE = env.int(
+    "FILE_MAX_EMAIL_ATTACHMENT_SIZE", default=10 * 1024 * 1024
+)
+# Seconds the emailed download links stay valid
+FILE_EMAIL_LINK_EXPIRY = env.int("FILE_EMAIL_LINK_EXPIRY", default=60 * 60)
+
 ALLOWED_MIME_TYPES = env.list(
     "ALLOWED_MIME_TYPES",
     default=[
@@ -651,3 +682,27 @@ MIDDLEWARE_REQUEST_TIMEOUT = env.int("MIDDLEWARE_REQUEST_TIMEOUT", 20)
 SNOWSTORM_DEPLOYMENT_URL = env(
     "SNOWSTORM_DEPLOYMENT_URL", default="http://165.22.211.144/fhir"
 )
+# Connection pool size, retries and timeouts (in seconds) for the terminology server
+SNOWSTORM_POOL_SIZE = env.int("SNOWSTORM_POOL_SIZE", default=20)
+SNOWSTORM_MAX_RETRIES = env.int("SNOWSTORM_MAX_RETRIES", default=2)
+SNOWSTORM_CONNECT_TIMEOUT = env.float("SNOWSTORM_CONNECT_TIMEOUT", default=5)
+SNOWSTORM_READ_TIMEOUT = env.float("SNOWSTORM_READ_TIMEOUT", default=60)
+# Maximum number of concurrent queries when fanning out to the terminology server
+SNOWSTORM_MAX_CONCURRENCY = env.int("SNOWSTORM_MAX_CONCURRENCY", default=8)
+# Terminology server response cache, TTLs (in seconds) per FHIR operation
+FHIR_CACHE_TTL = {
+    "expand": env.int("FHIR_CACHE_TTL_EXPAND", default=60 * 60),
+    "validate-code": env.int("FHIR_CACHE_TTL_VALIDATE", default=60 * 60 * 24),
+    "lookup": env.int("FHIR_CACHE_TTL_LOOKUP", default=60 * 60 * 24),
+    "default": env.int("FHIR_CACHE_TTL_DEFAULT", default=60 * 10),
+}
+# Expired responses are served for this long while they are refreshed in the background
+FHIR_CACHE_STALE_TTL = env.int("FHIR_CACHE_STALE_TTL", default=60 * 60 * 24)
+
+# Number of days ahead for which appointment slots are created by the background job
+SLOT_MATERIALIZATION_DAYS = env.int("SLOT_MATERIALIZATION_DAYS", default=14)
+# Maximum time (in milliseconds) a booking waits for another booking of the same slot, and retries after that
+BOOKING_LOCK_TIMEOUT = env.int("BOOKING_LOCK_TIMEOUT", default=2000)
+BOOKING_MAX_RETRIES = env.int("BOOKING_MAX_RETRIES", default=2)
+# Maximum time (in milliseconds) the ranked patient search may run before it is cancelled
+PATIENT_SEARCH_TIMEOUT = env.int("PATIENT_SEARCH_TIMEOUT", default=1000)